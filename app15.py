@@ -20,35 +20,114 @@ import csv
 import sqlite3
 import argparse
 import datetime
+import functools
+import json
 import threading
+import time
 import logging
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, List, Callable
 
 import pandas as pd
 import numpy as np 
-import yfinance as yf
-from flask import Flask, render_template_string, request, redirect, url_for, flash, session
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, abort, stream_with_context, g
+from jinja2 import DictLoader
 
 # V2 İndikatör Modülünü import et
 try:
     from indicators_v2 import calculate_rsi, calculate_macd, calculate_atr, calculate_volume_zscore, calculate_ma_slope
-except ImportError:
-    print("HATA: indicators_v2.py dosyası bulunamadı. Lütfen app15.py ve indicators_v2.py'nin aynı klasörde olduğundan emin olun.")
+except ImportError as e:
+    print(f"HATA: indicators_v2.py yüklenemedi ({e}). Lütfen app15.py, indicators_v2.py ve indicator_kernels.py'nin aynı klasörde olduğundan emin olun.")
     exit()
 
+from price_store import PriceWriter, WriteStats, apply_pragmas, connect, read_windows
+from fetch_pipeline import DataProvider, FetchPipeline, FetchRequest, FetchResult, make_provider
+from jobs import Job, JobManager
+from panel_engine import (MIN_BARS, STATUS_MEDIUM, build_panel, compute_indicators, compute_signals,
+                          apply_position_sizing, scratch_nbytes, thread_scratch)
+from scan_cache import SignalCache, stamp_version, data_version, symbol_version
+from compact_cache import CompactCache, StagedCache, quantize_prices
+from shared_cache import SharedCacheStore
+from indicator_state import SEED_OUTPUTS, StateStore, compare_state, verify_incremental
+from snapshot_store import db_stamp, load_snapshot, write_snapshot
+from scan_executor import BACKENDS as SCAN_BACKENDS, ScanExecutor, panel_signals
+from backtest import BacktestConfig, BacktestResult, prepare_backtest, run_backtest
+from optimizer import DEFAULT_GRID, RANK_METRICS, check_grid, grid_size, parameter_grid, run_sweep, sample_grid
+from signal_index import SignalIndex
+from signal_history import diff_signals, init_history, record_scan, signal_counts, symbol_history
+from scan_api import RowCache, apply_query, build_rows, dumps, make_etag, ndjson_lines, parse_query, summarize
+from scan_events import EventChannel, EventHub, sse_stream
+from timeframes import TIMEFRAMES, TimeframeStore, verify_timeframes
+from screener_rules import (BUILTIN_SCREEN, RuleError, Screen, ScreenData, ScreenResult, builtin_screens,
+                            compile_screen, delete_screen, init_screens, list_screens, load_screen, run_screens,
+                            save_screen)
+from metrics import (REGISTRY, RECENT_PROFILES, counter, end_profile, gauge, histogram, process_rss_bytes,
+                     start_profile, timed, timed_symbol)
+
 # ---------- AYARLAR ----------
 DB_FILE = "prices.db"
+SNAPSHOT_DIR = "prices_snapshot" # Cache penceresinin sütunsal (mmap) kopyası; kaynak her zaman DB_FILE
 SYMBOLS_CSV = "hisseler.csv"
 AUTO_ADJUST = True
+DATA_PROVIDER = "yfinance" # yfinance | csv | fake (offline/test)
+DATA_DIR = "data" # csv sağlayıcısı için <SEMBOL>.IS.csv klasörü
+FETCH_WORKERS = 4 # Paralel indirme thread sayısı
 VOLUME_ZSCORE_THRESHOLD = 1.0 # Yüksek hacim için minimum Z-Score
 MA_SLOPE_PERIOD = 5 # MA eğimi için 5 günlük değişim
+BENCHMARK_SYMBOL = "XU100" # Göreli güç (rs_rank) karşılaştırma endeksi; diğer semboller gibi indirilir ("" kapatır)
+INCREMENTAL_VERIFY = False # True: artımlı gösterge durumları her taramada toplu hesaplamayla karşılaştırılır
+SCAN_BACKEND = "serial" # serial | thread | process (çok çekirdekli sunucular için)
+SCAN_WORKERS = os.cpu_count() or 1 # thread/process arka ucunda worker sayısı
+REQUEST_PROFILING = False # True: ?profile=1 ile istenen isteklerin en yavaş aşama/sembolleri loglanır (--profile-requests)
+PROFILE_TOP = 10 # Profil raporunda gösterilen aşama / sembol sayısı
+WRITE_BATCH_ROWS = 50000 # Toplu yazmada tek transaction'a giren azami satır sayısı
+# Çok süreçli (gunicorn -w N app15:app) kurulum: tek yükleyici cache'i paylaşılan klasöre yayınlar,
+# worker'lar salt okunur eşler. WSGI altında main bloğu çalışmadığından ortam değişkenleriyle de ayarlanır.
+CACHE_ROLES = ("local", "loader", "worker")
+CACHE_ROLE = os.environ.get("SWING_CACHE_ROLE", "local") # local: süreç kendi cache'ini tutar | loader: yükler, günceller, yayınlar | worker: eşler
+SHARED_CACHE_DIR = os.environ.get("SWING_SHARED_CACHE", "prices_shared") # /dev/shm altında bir klasör: disk yazımı yok
+SHARED_CACHE_POLL = 1.0 # worker'ın yeni sürümü yoklama aralığı (sn)
+READ_ONLY_MESSAGE = "Bu süreç paylaşılan cache'i salt okunur kullanıyor (worker); veri güncellemesi yükleyici (loader) süreçte yapılır."
 
 # Yeni Risk Yönetimi Ayarları (Başlangıç Değerleri)
 DEFAULT_RISK_PER_TRADE = 0.025  # %2.5 sermaye riski
 DEFAULT_PORTFOLIO_SIZE = 50000.00 # Örnek Portföy Büyüklüğü (TL)
 
-# RAM Cache için global değişken
-DATA_CACHE: Dict[str, pd.DataFrame] = {}
+# Backtest Ayarları
+BACKTEST_YEARS = 10 # Varsayılan test süresi (yıl)
+BACKTEST_TARGET_R = 2.0 # Hedef: giriş + R x (giriş - stop)
+BACKTEST_MAX_HOLD = 20 # Zaman stopu (bar)
+
+# Geçmiş tarihli (as_of) tarama indeksi: son SIGNAL_INDEX_YEARS yıl önceden hesaplanır;
+# daha eski tarihler için o güne kadarki son CACHE_WINDOW bar DB'den okunur
+SIGNAL_INDEX_YEARS = 3
+_SIGNAL_INDEX: Optional[SignalIndex] = None
+_SIGNAL_INDEX_LOCK = threading.Lock()
+
+# Canlı tarama (SSE): sonuçlar bu büyüklükte parçalar hâlinde akıtılır; kanal başına olay tamponu sınırlıdır
+LIVE_SCAN_CHUNK = 50
+LIVE_EVENT_BUFFER = 2000 # Yavaş istemci bu kadar olayın gerisine düşerse atlanan olaylar "gap" ile bildirilir
+SCAN_EVENTS = EventHub(buffer=LIVE_EVENT_BUFFER)
+
+# Sinyal geçmişi: aynı cache nesli için tekrar yazılmaz (sıralama/filtre tıklamaları yeni satır üretmez)
+_HISTORY_RECORDED: Optional[Tuple[int, Tuple[str, ...]]] = None
+_HISTORY_LOCK = threading.Lock()
+
+# Aktif veri sağlayıcısı (ilk kullanımda oluşturulur)
+_PROVIDER: Optional[DataProvider] = None
+
+# RAM Cache için global değişken (kompakt diziler; cache[s] sembolün DataFrame kopyasını verir)
+DATA_CACHE: CompactCache = CompactCache.empty()
+CACHE_GENERATION = 0 # Her publish_cache'te artar (sonuç önbelleği anahtarı)
+WARMUP_BARS = 100 # EWM tabanlı göstergelerin (MACD/ATR/RSI) pencere başında oturması için ek bar
+CACHE_WINDOW = MIN_BARS + WARMUP_BARS # Cache'te sembol başına tutulan son bar sayısı (MA200 + ısınma = 300)
+_CACHE_LOCK = threading.Lock()
+SHARED_STORE: Optional[SharedCacheStore] = None
+_SHARED_LOCK = threading.Lock()
+_SHARED_POLLED = 0.0
+
+# Arka plan işleri (bootstrap/update aynı DB'ye yazdığı için tek grupta, aynı anda tek iş)
+JOBS = JobManager()
+INGEST_GROUP = "ingest"
 
 # ---------- LOGLAMA AYARLARI ----------
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(name)s - %(message)s')
@@ -61,11 +140,12 @@ app.secret_key = os.urandom(24)
 # ---------- CLI UTILITIES (KRİTİK HATA DÜZELTME) ----------
 # CLI fonksiyonları, NameError hatasını önlemek için main bloğundan önce tanımlanmalıdır.
 
-def load_symbols_from_csv() -> list:
-    if not os.path.exists(SYMBOLS_CSV):
+def load_symbols_from_csv(path: Optional[str] = None) -> list:
+    path = path or SYMBOLS_CSV
+    if not os.path.exists(path):
         return []
     syms = []
-    with open(SYMBOLS_CSV, newline='', encoding='utf-8') as f:
+    with open(path, newline='', encoding='utf-8') as f:
         reader = csv.reader(f)
         for row in reader:
             if not row: continue
@@ -73,11 +153,12 @@ def load_symbols_from_csv() -> list:
             if s == "": continue
             if s.endswith(".IS"): s = s[:-3]
             syms.append(s)
-    # Tekrar eden sembolleri kaldırma
-    return list(set(syms))
+    # Tekrar eden sembolleri kaldırma (dosya sırası korunur: tarama çıktısı deterministik)
+    return list(dict.fromkeys(syms))
 
 def init_db():
     conn = sqlite3.connect(DB_FILE, check_same_thread=False)
+    apply_pragmas(conn) # WAL kalıcıdır, bir kez ayarlamak yeterli
     cur = conn.cursor()
     cur.execute("""
         CREATE TABLE IF NOT EXISTS prices (
@@ -91,141 +172,324 @@ def init_db():
             UNIQUE(symbol, date)
         );
     """)
+    init_history(conn) # signal_history tablosu (tarama geçmişi)
+    init_screens(conn) # screens tablosu (kayıtlı tarama kuralları)
     conn.commit()
     conn.close()
 
-def get_historical_data_from_db(symbol: str) -> Optional[pd.DataFrame]:
-    """Veriyi doğrudan DB'den çeker."""
+def get_historical_data_from_db(symbol: str, bars: Optional[int] = CACHE_WINDOW) -> Optional[pd.DataFrame]:
+    """Sembolün son `bars` barını doğrudan DB'den çeker (bars=None: tüm geçmiş)."""
     conn = sqlite3.connect(DB_FILE, check_same_thread=False)
     try:
-        df = pd.read_sql_query(
-            "SELECT date, close, high, low, volume FROM prices WHERE symbol=? ORDER BY date ASC",
-            conn,
-            params=(symbol + ".IS",),
-            index_col='date',
-            parse_dates=['date']
-        )
-        if df.empty:
-            return None
-        return df.sort_index()
+        if bars is None:
+            df = pd.read_sql_query(
+                "SELECT date, close, high, low, volume FROM prices WHERE symbol=? ORDER BY date ASC",
+                conn,
+                params=(symbol + ".IS",),
+                index_col='date',
+                parse_dates=['date']
+            )
+            return None if df.empty else df
+        return read_windows(conn, [symbol + ".IS"], bars).get(symbol + ".IS")
     finally:
         conn.close()
 
-def load_all_data_to_cache():
-    """Tüm sembol verilerini DB'den RAM'deki DATA_CACHE'e yükler (Performans için kritik)."""
-    global DATA_CACHE
+def load_windows_from_db(syms: List[str], bars: int = CACHE_WINDOW, end: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+    """Birden çok sembolün son `bars` barını tek bağlantı ve sembol grubu başına tek sorguyla yükler.
+    end (YYYY-MM-DD) verilirse o güne kadarki son `bars` bar okunur."""
+    conn = connect(DB_FILE)
+    try:
+        with timed("db_read_windows"):
+            windows = read_windows(conn, [s + ".IS" for s in syms], bars, end=end)
+    finally:
+        conn.close()
+    return {t[:-3]: df for t, df in windows.items()}
+
+def data_symbols() -> list:
+    """Cache'e yüklenen ve güncellenen semboller: hisseler.csv + karşılaştırma endeksi (taranmaz)."""
     syms = load_symbols_from_csv()
+    if BENCHMARK_SYMBOL and BENCHMARK_SYMBOL not in syms:
+        syms.append(BENCHMARK_SYMBOL)
+    return syms
+
+@timed("cache_load")
+def load_all_data_to_cache(use_snapshot: bool = True, syms: Optional[List[str]] = None):
+    """Tüm sembol verilerini RAM'deki DATA_CACHE'e yükler (Performans için kritik).
+    Güncel bir snapshot varsa diziler mmap ile eşlenir (parse yok); yoksa DB'den okunur ve snapshot yazılır.
+    syms verilmezse hisseler.csv'deki semboller ve karşılaştırma endeksi yüklenir."""
+    if CACHE_ROLE == "worker":
+        # Worker DB'den yüklemez; yükleyicinin yayınladığı son sürümü eşler
+        if not refresh_shared_cache(force=True) and not DATA_CACHE:
+            logger.warning(f"Paylaşılan cache henüz yayınlanmamış ({SHARED_CACHE_DIR}); yükleyici bekleniyor.")
+        return
+    syms = data_symbols() if syms is None else syms
     logger.info("RAM Cache yükleniyor...")
-    
-    new_cache = {}
-    for s in syms:
-        df = get_historical_data_from_db(s)
-        if df is not None:
-            # Sadece analiz için gerekli olan son 250 günü tutabiliriz (isteğe bağlı)
-            new_cache[s] = df.tail(300) 
-            
-    DATA_CACHE = new_cache
-    logger.info(f"RAM Cache yüklendi. {len(DATA_CACHE)} sembol hazır.")
-
-def fetch_and_store(symbol: str, start: Optional[str] = None, end: Optional[str] = None) -> Tuple[bool, str]:
-    # (Önceki versiyondan alınmıştır, toplu ekleme içerir)
-    ticker = symbol + ".IS"
-    df = pd.DataFrame() 
+
+    new_cache = CompactCache.empty().stage()
+    snap = load_snapshot(SNAPSHOT_DIR) if use_snapshot else None
+    stamp = db_stamp(DB_FILE)
+    if snap is not None and snap.source_stamp == stamp and snap.window >= CACHE_WINDOW:
+        with timed("snapshot_map"):
+            new_cache = CompactCache.from_snapshot(snap, syms).stage() # DataFrame kurulmadan diziler kopyalanır
+        in_snapshot = set(snap.symbols)
+        missing = [s for s in syms if s not in in_snapshot]
+        logger.info(f"Snapshot eşlendi: {len(new_cache)} sembol ({len(missing)} sembol DB'den okunacak).")
+    else:
+        if snap is not None:
+            logger.info("Snapshot DB'ye göre eski, DB'den yeniden kuruluyor...")
+        missing = syms
+
+    # Sadece analiz için gerekli olan son CACHE_WINDOW bar okunur (tam geçmiş hiç yüklenmez)
+    loaded = 0
+    if missing:
+        for s, df in load_windows_from_db(missing).items():
+            new_cache[s] = stamp_version(df)
+            loaded += 1
+
+    published = publish_cache(new_cache)
+    if loaded or snap is None or snap.source_stamp != stamp:
+        save_cache_snapshot(published, stamp)
+    else:
+        SCAN_EXECUTOR.share(published, SNAPSHOT_DIR, snap.meta) # process worker'ları aynı snapshot'ı eşler
+    report = published.memory_report()
+    logger.info(f"RAM Cache yüklendi. {len(published)} sembol, {report['bars']} bar, "
+                f"{report['total_bytes'] / 2**20:.1f} MB ({report['bytes_per_bar']} bayt/bar).")
+
+def save_cache_snapshot(cache: CompactCache, stamp: Optional[int] = None):
+    """Yayınlanan cache'i snapshot'a yazar. Hata tarama/ingest akışını durdurmaz; bir sonraki
+    başlangıçta snapshot eski görünür ve DB'den yeniden kurulur."""
     try:
-        if start and end:
-            df = yf.download(ticker, start=start, end=end, auto_adjust=AUTO_ADJUST, progress=False)
-        else:
-            df = yf.download(ticker, period="max", interval="1d", auto_adjust=AUTO_ADJUST, progress=False)
+        with timed("snapshot_write"):
+            meta = write_snapshot(SNAPSHOT_DIR, cache, CACHE_WINDOW, db_stamp(DB_FILE) if stamp is None else stamp)
+        SCAN_EXECUTOR.share(cache, SNAPSHOT_DIR, meta)
     except Exception as e:
-        logger.error(f"Symbol {symbol}: yf download error: {e}")
-        return False, f"yf download error: {e}"
+        logger.error(f"Snapshot yazılamadı: {e}")
+
+def rebuild_snapshot():
+    """Snapshot'ı yok sayıp cache'i DB'den kurar ve snapshot'ı yeniden yazar (--rebuild-snapshot)."""
+    load_all_data_to_cache(use_snapshot=False)
 
-    if df.empty:
-        return False, "No data returned from yfinance."
+def publish_cache(new_cache: Dict[str, pd.DataFrame]) -> CompactCache:
+    """Hazırlanan cache'i (StagedCache veya sembol -> DataFrame) kompakt dizilere çevirip tek seferde
+    (atomik referans değişimi) yayınlar. Yayınlanan CompactCache'i döner.
+    loader rolünde cache önce paylaşılan klasöre yazılır; nesil worker'larla aynı olur."""
+    global DATA_CACHE, CACHE_GENERATION
+    compact = new_cache if isinstance(new_cache, CompactCache) else CompactCache.build(new_cache, CACHE_WINDOW)
+    with _CACHE_LOCK:
+        generation = CACHE_GENERATION + 1
+    if CACHE_ROLE == "loader":
+        try:
+            generation = get_shared_store().publish(compact, generation)
+        except OSError as e:
+            logger.error(f"Paylaşılan cache yayınlanamadı (worker'lar önceki sürümde kalır): {e}")
+    with _CACHE_LOCK:
+        DATA_CACHE = compact
+        CACHE_GENERATION = max(generation, CACHE_GENERATION + 1)
+    return compact
+
+def get_shared_store() -> SharedCacheStore:
+    global SHARED_STORE
+    if SHARED_STORE is None or SHARED_STORE.path != SHARED_CACHE_DIR:
+        SHARED_STORE = SharedCacheStore(SHARED_CACHE_DIR)
+    return SHARED_STORE
 
+def refresh_shared_cache(force: bool = False) -> bool:
+    """worker rolünde yükleyicinin yayınladığı yeni sürüme geçer (atomik referans değişimi).
+    En fazla SHARED_CACHE_POLL saniyede bir yoklanır; geçiş yapıldıysa True döner."""
+    global DATA_CACHE, CACHE_GENERATION, _SHARED_POLLED
+    if CACHE_ROLE != "worker":
+        return False
+    now = time.monotonic()
+    if not force and now - _SHARED_POLLED < SHARED_CACHE_POLL:
+        return False
+    if not _SHARED_LOCK.acquire(blocking=force): # Başka bir istek thread'i zaten yokluyor
+        return False
     try:
-        if isinstance(df.columns, pd.MultiIndex):
-            df.columns = df.columns.droplevel(1)
-        
-        df2 = df.reset_index() 
-        required_cols = ["Date", "Close", "Volume", "High", "Low"] 
-        df2 = df2[required_cols].rename(
-            columns={"Date": "date", "Close": "close", "Volume": "volume", "High": "high", "Low": "low"}
-        )
-        df2.dropna(subset=['date', 'close', 'high', 'low'], inplace=True) 
-        df2['date'] = df2['date'].dt.strftime("%Y-%m-%d")
-        df2['symbol'] = ticker
-        
-    except Exception as e:
-        logger.error(f"Symbol {symbol}: Data processing error: {e}")
-        return False, f"Data processing failed: {e}"
+        _SHARED_POLLED = now
+        attached = get_shared_store().poll(CACHE_GENERATION)
+        if attached is None:
+            return False
+        cache, generation = attached
+        with _CACHE_LOCK:
+            DATA_CACHE, CACHE_GENERATION = cache, generation
+    finally:
+        _SHARED_LOCK.release()
+    logger.info(f"Paylaşılan cache nesil {generation} eşlendi: {len(cache)} sembol, {cache.nbytes / 2**20:.1f} MB.")
+    return True
+
+def get_cache_snapshot() -> Tuple[CompactCache, int]:
+    """Yayınlanmış cache ve nesil numarasını tutarlı bir çift olarak döner."""
+    with _CACHE_LOCK:
+        return DATA_CACHE, CACHE_GENERATION
 
+def stage_cache() -> StagedCache:
+    """Toplu işlemler için mevcut cache üzerinde yazılabilir bir katman döner.
+    Batch boyunca birleştirmeler bu katmana yapılır, sonunda publish_cache() ile yayınlanır."""
+    with _CACHE_LOCK:
+        return DATA_CACHE.stage()
+
+def merge_into_cache(cache: Dict[str, pd.DataFrame], symbol: str, new_rows: pd.DataFrame):
+    """Sadece yeni indirilen satırları sembolün cache girdisine ekler (DB'yi tekrar okumaz).
+    new_rows: 'date' (YYYY-MM-DD) ve close/high/low/volume sütunlarını içerir."""
+    if new_rows.empty:
+        return
+    new_rows = new_rows.tail(CACHE_WINDOW) # Tarih sıralı gelir; pencere dışı satırları hiç parse etme
+    rows = new_rows.set_index(pd.to_datetime(new_rows['date']))[['close', 'high', 'low', 'volume']]
+    rows.index.name = 'date'
+    rows = quantize_prices(rows) # Artımlı durum cache'teki (float32) değerlerle ilerlesin
+    existing = cache.get(symbol)
+    appended = rows
+    if existing is not None and not existing.empty:
+        if rows.index.min() <= existing.index.max():
+            appended = None # Geçmiş barlar da değişmiş olabilir; artımlı durum kullanılamaz
+        rows = pd.concat([existing, rows])
+        # Aynı tarih tekrar indirildiyse son gelen değer geçerlidir
+        rows = rows[~rows.index.duplicated(keep='last')].sort_index()
+    merged = stamp_version(rows.tail(CACHE_WINDOW).copy()) # Barlar değişti: yeni veri sürümü
+    cache[symbol] = merged
+    # Sadece sona bar eklendiyse gösterge durumu O(1) ilerletilir, haftalık/aylık barların sadece son dönemi değişir
+    STATE_STORE.on_merge(symbol, data_version(existing), data_version(merged), appended)
+    TIMEFRAME_STORE.on_merge(symbol, data_version(existing), merged, appended)
+
+def get_data_provider() -> DataProvider:
+    global _PROVIDER
+    if _PROVIDER is None:
+        _PROVIDER = make_provider(DATA_PROVIDER, data_dir=DATA_DIR, auto_adjust=AUTO_ADJUST)
+    return _PROVIDER
+
+def set_data_provider(provider: DataProvider):
+    """Veri kaynağını değiştirir (test / offline çalışma için CsvDirProvider, FakeProvider)."""
+    global _PROVIDER
+    _PROVIDER = provider
+
+@timed_symbol("store_rows")
+def store_rows(symbol: str, df2: pd.DataFrame, cache: Dict[str, pd.DataFrame], writer: PriceWriter) -> Tuple[bool, str]:
+    """Normalize edilmiş satırları (date, close, high, low, volume) writer'a kuyruklar ve staged cache'e birleştirir.
+    Flush ve yayınlama çağırana (ingest_batch) kalır."""
+    writer.add(symbol + ".IS", df2)
+    merge_into_cache(cache, symbol, df2)
+    return True, f"queued: {len(df2)} rows"
+
+def get_last_db_dates(syms: list) -> Dict[str, Optional[str]]:
+    """Her sembolün DB'deki son tarihini tek bağlantıyla çeker (MAX, (symbol, date) indeksini kullanır)."""
     conn = sqlite3.connect(DB_FILE, check_same_thread=False)
     try:
-        inserted_rows = len(df2)
-        # Toplu Ekleme (method='multi') kullanıldı
-        df2.to_sql('prices', conn, if_exists='append', index=False, method='multi')
-        
-        # Güncel veriyi ön belleğe de ekle
-        load_all_data_to_cache() 
-        return True, f"ok inserted: {inserted_rows} rows attempted" 
-    except Exception as e:
-        if "UNIQUE constraint failed" not in str(e):
-             logger.error(f"Symbol {symbol}: to_sql error: {e}")
-             return False, f"to_sql error: {e}"
-        load_all_data_to_cache() 
-        return True, "ok (some were already there or failed unique constraint)" 
+        cur = conn.cursor()
+        out = {}
+        for s in syms:
+            cur.execute("SELECT MAX(date) FROM prices WHERE symbol=?", (s + ".IS",))
+            out[s] = cur.fetchone()[0]
+        return out
     finally:
         conn.close()
 
-def get_last_db_date(symbol: str) -> Optional[str]:
-    conn = sqlite3.connect(DB_FILE, check_same_thread=False)
-    cur = conn.cursor()
-    cur.execute("SELECT date FROM prices WHERE symbol=? ORDER BY date DESC LIMIT 1", (symbol + ".IS",))
-    row = cur.fetchone()
-    conn.close()
-    if not row:
+def compute_update_range(last: str, today: str) -> Optional[Tuple[str, str]]:
+    """Son DB tarihinden bugüne eksik aralığı (start, end) döner; güncelse None. end hariçtir."""
+    if last >= today:
         return None
-    return row[0]
+    start_dt = (datetime.datetime.strptime(last, "%Y-%m-%d") + datetime.timedelta(days=1)).strftime("%Y-%m-%d")
+    end_dt = (datetime.datetime.strptime(today, "%Y-%m-%d") + datetime.timedelta(days=1)).strftime("%Y-%m-%d")
+    return start_dt, end_dt
+
+def _flush_writer(writer: PriceWriter, label: str) -> bool:
+    try:
+        stats = writer.flush()
+        if stats.attempted:
+            logger.info(f"{label} DB yazma: {stats}")
+        return True
+    except Exception as e:
+        logger.error(f"{label} DB yazma hatası (batch geri alındı): {e}")
+        return False
 
-def update_symbol_prices(symbol: str):
-    last = get_last_db_date(symbol)
+def plan_fetch_requests(syms: list, bootstrap: bool = False) -> Tuple[list, int]:
+    """İndirilecek istek listesini ve zaten güncel olan sembol sayısını döner."""
+    if bootstrap:
+        return [FetchRequest(s + ".IS") for s in syms], 0
     today = datetime.date.today().strftime("%Y-%m-%d")
-    
-    if last is None:
-        logger.info(f"Symbol {symbol}: Full bootstrap needed.")
-        return fetch_and_store(symbol)
-        
-    if last >= today:
-        return True, "cache up-to-date"
+    requests, up_to_date = [], 0
+    for s, last in get_last_db_dates(syms).items():
+        if last is None:
+            requests.append(FetchRequest(s + ".IS")) # Full bootstrap gerekli
+            continue
+        try:
+            rng = compute_update_range(last, today)
+        except ValueError:
+            logger.error(f"Symbol {s}: Date parse error for last date: {last}")
+            continue
+        if rng is None:
+            up_to_date += 1
+        else:
+            requests.append(FetchRequest(s + ".IS", rng[0], rng[1]))
+    return requests, up_to_date
+
+@timed("ingest")
+def ingest_batch(syms: list, bootstrap: bool = False, label: str = "Ingest",
+                 provider: Optional[DataProvider] = None, job: Optional[Job] = None,
+                 on_result: Optional[Callable[[str, bool, str], None]] = None) -> WriteStats:
+    """Sembolleri eşzamanlı pipeline ile indirir; sonuçlar tek yazıcı thread'de (bu thread)
+    toplu transaction'larla yazılır ve batch sonunda tutarlı cache tek seferde yayınlanır.
+    job verilirse ilerleme (tamamlanan/hatalı sembol) ona bildirilir; on_result(sembol, ok, mesaj)
+    her sembolden sonra çağrılır (canlı ilerleme olayları)."""
+    if CACHE_ROLE == "worker":
+        raise RuntimeError(READ_ONLY_MESSAGE)
+    requests, up_to_date = plan_fetch_requests(syms, bootstrap)
+    total = len(requests)
+    logger.info(f"{label}: {total} sembol indirilecek, {up_to_date} sembol zaten güncel.")
+    if job is not None:
+        job.set_total(total)
+    staged = stage_cache()
+    writer = PriceWriter(DB_FILE)
+    state = {"done": 0, "writes_ok": True}
+
+    def consume(res: FetchResult):
+        state["done"] += 1
+        FETCHED_SYMBOLS.inc(result="ok" if res.ok else "failed")
+        symbol = res.ticker[:-3] if res.ticker.endswith(".IS") else res.ticker
+        if res.ok:
+            ok, msg = store_rows(symbol, res.rows, cache=staged, writer=writer)
+        else:
+            ok, msg = False, res.message
+        if ok:
+            logger.info(f"[{state['done']}/{total}] {symbol} : {msg}")
+        else:
+            logger.warning(f"{label} Error [{state['done']}/{total}] {symbol}: {msg}")
+        if job is not None:
+            job.advance(ok, symbol)
+        if on_result is not None:
+            on_result(symbol, ok, msg)
+        if writer.pending_rows >= WRITE_BATCH_ROWS:
+            state["writes_ok"] &= _flush_writer(writer, label)
 
     try:
-        start_dt = (datetime.datetime.strptime(last, "%Y-%m-%d") + datetime.timedelta(days=1)).strftime("%Y-%m-%d")
-        end_dt = (datetime.datetime.strptime(today, "%Y-%m-%d") + datetime.timedelta(days=1)).strftime("%Y-%m-%d")
-    except ValueError:
-        logger.error(f"Symbol {symbol}: Date parse error for last date: {last}")
-        return False, "Date parse error"
-        
-    logger.info(f"Symbol {symbol}: Updating from {start_dt} to {end_dt}")
-    return fetch_and_store(symbol, start=start_dt, end=end_dt)
+        pipeline = FetchPipeline(provider or get_data_provider(), workers=FETCH_WORKERS)
+        summary = pipeline.run(requests, consume)
+        state["writes_ok"] &= _flush_writer(writer, label)
+    finally:
+        writer.close()
+
+    if state["writes_ok"]:
+        save_cache_snapshot(publish_cache(staged)) # Batch bitti, tutarlı cache tek seferde yayınlanır
+    else:
+        load_all_data_to_cache() # Yazılamayan satırlar cache'te kalmasın, DB'den yeniden kur
+    logger.info(f"{label} indirme: {summary['ok']} başarılı, {summary['failed']} hatalı, "
+                f"{summary['seconds']:.1f} sn | DB toplam: {writer.totals}")
+    return writer.totals
 
 # CLI Fonksiyonları
-def cli_bootstrap_all():
-    syms = load_symbols_from_csv()
-    total = len(syms)
-    logger.info(f"CLI Bootstrap: {total} sembol indiriliyor...")
-    for i, s in enumerate(syms, 1):
-        ok, msg = fetch_and_store(s)
-        logger.info(f"[{i}/{total}] {s} : {msg}")
+def cli_bootstrap_all(job: Optional[Job] = None) -> str:
+    syms = data_symbols()
+    logger.info(f"CLI Bootstrap: {len(syms)} sembol indiriliyor...")
+    stats = ingest_batch(syms, bootstrap=True, label="CLI Bootstrap", job=job)
     logger.info("CLI Bootstrap tamamlandı. RAM Cache yüklendi.")
+    return str(stats)
 
-def cli_update_all():
-    syms = load_symbols_from_csv()
-    logger.info(f"CLI Update: {len(syms)} sembol güncelleniyor...")
-    for s in syms:
-        ok, msg = update_symbol_prices(s)
-        logger.info(f"{s} : {msg}")
-    logger.info("CLI Update tamamlandı. RAM Cache güncellendi.")
+def cli_update_all(job: Optional[Job] = None, label: str = "CLI Update",
+                   on_result: Optional[Callable[[str, bool, str], None]] = None) -> str:
+    syms = data_symbols()
+    logger.info(f"{label}: {len(syms)} sembol güncelleniyor...")
+    stats = ingest_batch(syms, label=label, job=job, on_result=on_result)
+    logger.info(f"{label} tamamlandı. RAM Cache güncellendi.")
+    return str(stats)
 
 # ---------- GELİŞMİŞ SİNYAL MOTORU V2 ----------
 
@@ -238,13 +502,22 @@ def get_dynamic_atr_multiplier(atr_percent: float) -> float:
     else:
         return 1.5 # Normal Volatilite
 
-def swing_signal_engine_v2(symbol: str, risk_per_trade: float, portfolio_size: float) -> Tuple[str, Optional[Dict[str, Any]]]:
+@timed_symbol("engine_v2")
+def swing_signal_engine_v2(symbol: str, risk_per_trade: float, portfolio_size: float,
+                           cache: Optional[Dict[str, pd.DataFrame]] = None,
+                           as_of: Optional[str] = None) -> Tuple[str, Optional[Dict[str, Any]]]:
     
-    # 1. PERFORMANS: Veriyi RAM Cache'ten al
-    if symbol not in DATA_CACHE or DATA_CACHE[symbol].shape[0] < 200:
+    # 1. PERFORMANS: Veriyi RAM Cache'ten al (cache verilirse taramanın sabit snapshot'ı kullanılır)
+    # as_of verilirse o güne kadarki (dahil) son CACHE_WINDOW bar DB'den okunur
+    if as_of is not None:
+        cache = load_windows_from_db([symbol], end=as_of)
+    elif cache is None:
+        cache = DATA_CACHE
+    df = cache.get(symbol)
+    if df is None or df.shape[0] < 200:
         return "Veri Eksik (< 200 gün)", None
         
-    df = DATA_CACHE[symbol].copy()
+    df = df.copy()
     
     # Tüm göstergeleri hesapla
     df['ma20'] = df['close'].rolling(window=20).mean()
@@ -375,6 +648,497 @@ def swing_signal_engine_v2(symbol: str, risk_per_trade: float, portfolio_size: f
 
     return final_status, vals
 
+@timed("scan_compute")
+def _compute_base_signals(cache: Dict[str, pd.DataFrame], syms: list) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+    """Risk ayarından bağımsız sinyal sonuçları (SIGNAL_CACHE için).
+    Güncel artımlı durumu olan semboller O(1) durumdan, diğerleri tek panel geçişinde hesaplanır
+    (ve durumları tohumlanır). Panel motoru hata verirse sembol bazlı motora döner."""
+    versions = {s: symbol_version(cache, s) for s in syms}
+    results: Dict[str, Tuple[str, Optional[Dict[str, Any]]]] = {}
+    panel_syms = []
+    for s in syms:
+        state = STATE_STORE.current(s, versions[s])
+        if state is not None and not STATE_STORE.verify:
+            results[s] = state.result(VOLUME_ZSCORE_THRESHOLD)
+        else:
+            panel_syms.append(s)
+    if not panel_syms:
+        return [results[s] for s in syms]
+
+    try:
+        if SCAN_EXECUTOR.parallel:
+            # Parçalar worker'larda hesaplanır; artımlı durumlar sadece serial yolda tohumlanır
+            for s, res in zip(panel_syms, SCAN_EXECUTOR.run(cache, panel_syms, SCAN_COMPUTE)):
+                results[s] = res
+            return [results[s] for s in syms]
+        scratch = thread_scratch() # Panel ve gösterge dizileri her taramada yeniden ayrılmaz
+        with timed("panel_build"):
+            panel = build_panel(cache, panel_syms, window=CACHE_WINDOW, scratch=scratch)
+        with timed("indicators_panel"):
+            # Sinyaller + artımlı durum tohumları için gereken göstergeler (ara diziler tamponlarda kalır)
+            ind = compute_indicators(panel, slope_period=MA_SLOPE_PERIOD, scratch=scratch, outputs=SEED_OUTPUTS)
+        with timed("signals_panel"):
+            signals = compute_signals(panel, volume_z_threshold=VOLUME_ZSCORE_THRESHOLD,
+                                      slope_period=MA_SLOPE_PERIOD, ind=ind)
+        for s, res in zip(panel_syms, signals):
+            results[s] = res
+        if STATE_STORE.verify:
+            for j, s in enumerate(panel_syms):
+                state = STATE_STORE.current(s, versions[s])
+                if state is not None and compare_state(state, ind, j) > STATE_STORE.rtol:
+                    logger.warning(f"Artımlı durum {s} toplu hesaplamadan sapıyor: {compare_state(state, ind, j):.3g}")
+        STATE_STORE.seed(panel, ind, versions)
+        return [results[s] for s in syms]
+    except Exception as e:
+        logger.error(f"Panel motoru hatası, sembol bazlı motora dönülüyor: {e}")
+
+    for s in panel_syms:
+        try:
+            status, vals = swing_signal_engine_v2(s, DEFAULT_RISK_PER_TRADE, DEFAULT_PORTFOLIO_SIZE, cache=cache)
+            if vals is not None:
+                vals = {k: v for k, v in vals.items() if k not in ("stop_loss", "recommended_lot")}
+            results[s] = (status, vals)
+        except Exception as e:
+            logger.error(f"Scan Error for {s}: {e}")
+            results[s] = (f"Hesaplama Hatası: {e}", None)
+    return [results[s] for s in syms]
+
+# Tarama yürütücüsü (--scan-backend/--workers ile yapılandırılır) ve worker'lara gönderilen hesap fonksiyonu
+SCAN_EXECUTOR = ScanExecutor(SCAN_BACKEND, SCAN_WORKERS, snapshot_dir=SNAPSHOT_DIR + ".scan", window=CACHE_WINDOW)
+SCAN_COMPUTE = functools.partial(panel_signals, window=CACHE_WINDOW, volume_z_threshold=VOLUME_ZSCORE_THRESHOLD,
+                                 slope_period=MA_SLOPE_PERIOD)
+
+# Sembol başına artımlı gösterge durumları (yeni bar geldiğinde O(1) ilerler)
+STATE_STORE = StateStore(slope_period=MA_SLOPE_PERIOD, verify=INCREMENTAL_VERIFY)
+
+# Günlük cache'ten türetilen haftalık / aylık barlar (yeni bar geldiğinde sadece son dönem güncellenir)
+TIMEFRAME_STORE = TimeframeStore(TIMEFRAMES)
+
+# Sembol başına, veri sürümüne göre anahtarlanmış sinyal önbelleği
+SIGNAL_CACHE = SignalCache(_compute_base_signals)
+
+# ---------- Ölçümler (/metrics) ----------
+FETCHED_SYMBOLS = counter("swing_fetch_symbols_total", "İndirilen semboller (sonuca göre).", ("result",))
+HTTP_SECONDS = histogram("swing_http_request_seconds", "HTTP isteği süresi (saniye).", ("endpoint",))
+HTTP_REQUESTS = counter("swing_http_requests_total", "HTTP istekleri.", ("endpoint", "status"))
+
+def cache_memory_report() -> Dict[str, Any]:
+    """Kompakt cache'in dizi bazında bellek kullanımı, tarama tamponları ve süreç RSS'i."""
+    cache, generation = get_cache_snapshot()
+    report = cache.memory_report()
+    report["role"] = CACHE_ROLE
+    report["generation"] = generation
+    report["scratch_bytes"] = scratch_nbytes()
+    report["screen_bytes"] = _SCREEN_DATA.nbytes if _SCREEN_DATA is not None else 0
+    report["timeframe_bytes"] = TIMEFRAME_STORE.nbytes
+    report["rss_bytes"] = process_rss_bytes()
+    return report
+
+gauge("swing_cache_symbols", "RAM cache'teki sembol sayısı.", fn=lambda: len(DATA_CACHE))
+gauge("swing_cache_bars", "RAM cache'teki toplam bar sayısı.", fn=lambda: DATA_CACHE.total_bars)
+gauge("swing_cache_bytes", "RAM cache dizilerinin bellek kullanımı (bayt).", fn=lambda: DATA_CACHE.nbytes)
+gauge("swing_scratch_bytes", "Tarama tamponlarının (panel + göstergeler) bellek kullanımı (bayt).", fn=scratch_nbytes)
+gauge("swing_cache_generation", "Yayınlanmış cache nesli.", fn=lambda: CACHE_GENERATION)
+gauge("swing_indicator_states", "Artımlı gösterge durumu olan sembol sayısı.", fn=lambda: len(STATE_STORE))
+gauge("swing_timeframe_events", "Haftalık/aylık barlar: baştan resample / artımlı güncelleme sayıları (kümülatif).",
+      ("kind",), fn=lambda: {"resampled": TIMEFRAME_STORE.resampled, "extended": TIMEFRAME_STORE.extended})
+gauge("swing_signal_cache_events", "Sinyal önbelleği isabet / yeniden hesaplama sayıları (kümülatif).", ("kind",),
+      fn=lambda: {"hit": SIGNAL_CACHE.hits, "recomputed": SIGNAL_CACHE.recomputed})
+gauge("swing_process_rss_bytes", "Süreç bellek kullanımı (RSS, bayt).", fn=process_rss_bytes)
+
+def get_signal_index(syms: List[str]) -> SignalIndex:
+    """as_of indeksini döner; DB değiştiyse (MAX(id)) veya sembol listesi farklıysa yeniden kurar."""
+    global _SIGNAL_INDEX
+    stamp = (db_stamp(DB_FILE), tuple(syms))
+    with _SIGNAL_INDEX_LOCK:
+        if _SIGNAL_INDEX is None or _SIGNAL_INDEX.stamp != stamp:
+            t0 = time.perf_counter()
+            start = (datetime.date.today() - datetime.timedelta(days=int(SIGNAL_INDEX_YEARS * 365.25))).isoformat()
+            frames = load_windows_from_db(syms, bars=int(SIGNAL_INDEX_YEARS * 252) + CACHE_WINDOW)
+            with timed("signal_index_build"):
+                _SIGNAL_INDEX = SignalIndex.build(frames, syms, start=start,
+                                                  volume_z_threshold=VOLUME_ZSCORE_THRESHOLD,
+                                                  slope_period=MA_SLOPE_PERIOD, stamp=stamp)
+            logger.info(f"as_of indeksi kuruldu: {len(syms)} sembol, {_SIGNAL_INDEX.first_date} - "
+                        f"{_SIGNAL_INDEX.last_date}, {_SIGNAL_INDEX.nbytes() / 2**20:.1f} MB "
+                        f"({time.perf_counter() - t0:.2f} sn)")
+        return _SIGNAL_INDEX
+
+@timed("scan_as_of")
+def scan_as_of(syms: List[str], as_of: str) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+    """as_of gününde tarayıcının göstereceği sonuçlar (lot hariç). İndeks kapsamındaki tarihler
+    indeksten, daha eskileri o güne kadarki son CACHE_WINDOW barla panel motorundan hesaplanır."""
+    index = get_signal_index(syms)
+    if index.covers(as_of):
+        return index.scan(as_of)
+    return SCAN_COMPUTE(load_windows_from_db(syms, end=as_of), syms)
+
+def scan_universe(syms: list, risk_per_trade: float, portfolio_size: float,
+                  cache: Optional[Dict[str, pd.DataFrame]] = None,
+                  generation: Optional[int] = None,
+                  as_of: Optional[str] = None) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+    """Tüm evreni panel motoruyla (panel_engine) tarar; sonuçlar syms sırasıyla
+    swing_signal_engine_v2 çıktısıyla aynıdır. Göstergeler SIGNAL_CACHE'ten gelir (sadece barları
+    değişen semboller yeniden hesaplanır); lot hesabı her çağrıda son adım olarak uygulanır.
+    as_of (YYYY-MM-DD) verilirse sadece o güne kadarki barlarla değerlendirilir (scan_as_of)."""
+    if as_of is not None:
+        return [(status, apply_position_sizing(vals, risk_per_trade, portfolio_size) if vals is not None else None)
+                for status, vals in scan_as_of(syms, as_of)]
+    if cache is None:
+        cache, generation = get_cache_snapshot()
+    return SIGNAL_CACHE.get_sized(cache, syms, generation, (risk_per_trade, portfolio_size),
+                                  lambda vals: apply_position_sizing(vals, risk_per_trade, portfolio_size))
+
+@timed("signal_history_write")
+def record_signal_history(syms: List[str], results: List[Tuple[str, Optional[Dict[str, Any]]]],
+                          generation: Optional[int] = None) -> int:
+    """Canlı tarama sonuçlarını signal_history tablosuna yazar. generation verilirse aynı cache nesli
+    ve sembol listesi için sadece bir kez yazılır. Hata taramayı durdurmaz."""
+    global _HISTORY_RECORDED
+    key = (generation, tuple(syms))
+    with _HISTORY_LOCK:
+        if generation is not None and _HISTORY_RECORDED == key:
+            return 0
+        conn = connect(DB_FILE)
+        try:
+            written = record_scan(conn, results)
+        except sqlite3.Error as e:
+            logger.error(f"Sinyal geçmişi yazılamadı: {e}")
+            return 0
+        finally:
+            conn.close()
+        _HISTORY_RECORDED = key
+    return written
+
+def backfill_signal_history(days: int) -> int:
+    """Son `days` işlem gününün sonuçlarını as_of indeksinden hesaplayıp geçmiş tablosuna yazar."""
+    syms = load_symbols_from_csv()
+    index = get_signal_index(syms)
+    trading_days = index.trading_days()[-days:]
+    total = 0
+    conn = connect(DB_FILE)
+    try:
+        for day in trading_days:
+            total += record_scan(conn, index.scan(day))
+    finally:
+        conn.close()
+    logger.info(f"Sinyal geçmişi dolduruldu: {len(trading_days)} gün, {total} satır.")
+    return total
+
+def get_signal_changes(date: Optional[str] = None, previous: Optional[str] = None) -> Dict[str, Any]:
+    conn = connect(DB_FILE)
+    try:
+        return diff_signals(conn, date, previous)
+    finally:
+        conn.close()
+
+# /api/scan: (veri sürümü, semboller, risk ayarı) -> kompakt satırlar; sıralama/filtre/sayfa bu listeden
+SCAN_ROWS = RowCache()
+
+def scan_data_version(generation: int, as_of: Optional[str] = None) -> Tuple:
+    """Tarama sonucunu belirleyen veri sürümü (ETag anahtarı). Canlı taramada cache nesli, geçmiş
+    tarihli taramada as_of; ikisinde de DB damgası (yeniden başlatma sonrası nesil çakışmasına karşı)."""
+    stamp = db_stamp(DB_FILE)
+    return ("live", generation, stamp) if as_of is None else ("as_of", as_of, stamp)
+
+def get_scan_rows(syms: List[str], risk_per_trade: float, portfolio_size: float,
+                  cache: Dict[str, pd.DataFrame], generation: int, version: Tuple,
+                  as_of: Optional[str] = None) -> List[Dict[str, Any]]:
+    def build():
+        # as_of verilirse tarama o güne kadarki barlarla (tarih bazlı indeksten) yapılır
+        with timed("scan"):
+            results = scan_universe(syms, risk_per_trade, portfolio_size, cache, generation, as_of=as_of)
+        if as_of is None:
+            record_signal_history(syms, results, generation) # Canlı taramalar geçmiş tablosuna yazılır
+        with timed("scan_rows_build"):
+            return build_rows(syms, results, scan_bulk_columns(syms, cache, generation) if as_of is None else None)
+    return SCAN_ROWS.get((version, tuple(syms), risk_per_trade, portfolio_size), build)
+
+# ---------- Kayıtlı taramalar (screener_rules kural dili) ----------
+_SCREEN_DATA: Optional[ScreenData] = None
+_SCREEN_DATA_LOCK = threading.Lock()
+
+def get_screen_data(syms: List[str], cache: Optional[Dict[str, pd.DataFrame]] = None,
+                    generation: Optional[int] = None) -> ScreenData:
+    """Kuralların değerlendirildiği panel ve gösterge grafiği. Cache nesli ve sembol listesi değişmedikçe
+    yeniden kurulmaz; göstergeler taramaların istediği kadar ve nesil başına bir kez hesaplanır.
+    Haftalık / aylık sütunlar TIMEFRAME_STORE görünümlerinden gelir (tam geçmiş yeniden resample edilmez)."""
+    global _SCREEN_DATA
+    if cache is None:
+        cache, generation = get_cache_snapshot()
+    stamp = (generation, tuple(syms))
+    with _SCREEN_DATA_LOCK:
+        if generation is None or _SCREEN_DATA is None or _SCREEN_DATA.stamp != stamp:
+            with timed("screen_data"):
+                _SCREEN_DATA = ScreenData.build(cache, syms, window=CACHE_WINDOW, slope_period=MA_SLOPE_PERIOD,
+                                                stamp=stamp, timeframes=functools.partial(
+                                                    TIMEFRAME_STORE.view, cache, key=generation),
+                                                benchmark=BENCHMARK_SYMBOL)
+        return _SCREEN_DATA
+
+def scan_bulk_columns(syms: List[str], cache: Optional[Dict[str, pd.DataFrame]] = None,
+                      generation: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Tarama tablosunun evren üzerinden toplu hesaplanan sütunları (göreli güç sırası), syms sırasıyla.
+    Kural verisiyle (get_screen_data) aynı gösterge grafiğinden gelir: nesil başına bir kez hesaplanır."""
+    if cache is None:
+        cache, generation = get_cache_snapshot()
+    if not BENCHMARK_SYMBOL or BENCHMARK_SYMBOL not in cache:
+        return {}
+    with timed("rs_rank"):
+        return {"rs_rank": get_screen_data(syms, cache, generation).last_values("rs_rank")}
+
+def get_screen(name: str) -> Optional[Screen]:
+    """Yerleşik (v2) veya kayıtlı tarama; yoksa None."""
+    builtin = builtin_screens(VOLUME_ZSCORE_THRESHOLD)
+    if name in builtin:
+        return builtin[name]
+    conn = connect(DB_FILE)
+    try:
+        return load_screen(conn, name)
+    finally:
+        conn.close()
+
+def get_screens() -> List[Dict[str, Any]]:
+    """Yerleşik + kayıtlı taramaların listesi."""
+    conn = connect(DB_FILE)
+    try:
+        saved = list_screens(conn)
+    finally:
+        conn.close()
+    return [s.to_dict(MA_SLOPE_PERIOD) for s in builtin_screens(VOLUME_ZSCORE_THRESHOLD).values()] + saved
+
+@timed("screens_eval")
+def run_screen_set(screens: List[Screen], syms: List[str], cache: Optional[Dict[str, pd.DataFrame]] = None,
+                   generation: Optional[int] = None) -> Dict[str, ScreenResult]:
+    """Taramaları tüm evren üzerinde tek geçişte değerlendirir (ortak kriterler bir kez hesaplanır)."""
+    return run_screens(screens, get_screen_data(syms, cache, generation))
+
+def _stream_scan_rows(channel: EventChannel, syms: List[str], risk_per_trade: float, portfolio_size: float,
+                      cache: Dict[str, pd.DataFrame], generation: int, stage: str) -> List[Dict[str, Any]]:
+    """Evreni LIVE_SCAN_CHUNK'lık parçalarla tarar ve her parçanın satırlarını hemen yayınlar."""
+    results, rows = [], []
+    bulk = scan_bulk_columns(syms, cache, generation) # Sıralar parça değil tüm evren üzerinden
+    for i in range(0, len(syms), LIVE_SCAN_CHUNK):
+        chunk = syms[i:i + LIVE_SCAN_CHUNK]
+        # generation=None: parça listeleri evren önbelleğine (SIGNAL_CACHE LRU) girmez, sembol önbelleği kullanılır
+        part = scan_universe(chunk, risk_per_trade, portfolio_size, cache)
+        part_rows = build_rows(chunk, part, {k: v[i:i + LIVE_SCAN_CHUNK] for k, v in bulk.items()})
+        results.extend(part)
+        rows.extend(part_rows)
+        channel.publish("rows", {"stage": stage, "rows": part_rows, "done": len(rows), "total": len(syms)})
+    record_signal_history(syms, results, generation)
+    return rows
+
+def run_live_scan(job: Job, channel: EventChannel, syms: List[str], risk_per_trade: float,
+                  portfolio_size: float, update: bool = True) -> str:
+    """Canlı tarama: önce yayınlanmış cache'ten anında tarama (ilk sonuçlar hemen akar), sonra isteğe bağlı
+    güncelleme (sembol bazlı ilerleme ve hatalar), güncelleme yeni veri yayınladıysa değişen satırlar.
+    Her aşamanın başı/sonu ve süresi "stage" olayıyla bildirilir."""
+    timings: Dict[str, float] = {}
+
+    def stage(name: str, fn: Callable[[], Any]) -> Any:
+        channel.publish("stage", {"stage": name, "status": "start"})
+        t0 = time.perf_counter()
+        out = fn()
+        timings[name] = round(time.perf_counter() - t0, 3)
+        channel.publish("stage", {"stage": name, "status": "end", "seconds": timings[name]})
+        return out
+
+    def on_result(symbol: str, ok: bool, msg: str):
+        channel.publish("progress", {"symbol": symbol, "ok": ok, "done": job.done, "total": job.total})
+        if not ok:
+            channel.publish("fetch_error", {"symbol": symbol, "message": msg})
+
+    try:
+        cache, generation = get_cache_snapshot()
+        rows = stage("scan", lambda: _stream_scan_rows(channel, syms, risk_per_trade, portfolio_size,
+                                                        cache, generation, "scan"))
+        if update:
+            stage("update", lambda: cli_update_all(job, label="Live Scan Update", on_result=on_result))
+            new_cache, new_generation = get_cache_snapshot()
+            if new_generation != generation:
+                # Yeni veriyle tekrar taranır; sadece değişen satırlar yayınlanır
+                before = {r["symbol"]: r for r in rows}
+                rows = stage("rescan", lambda: get_scan_rows(syms, risk_per_trade, portfolio_size, new_cache,
+                                                              new_generation, scan_data_version(new_generation)))
+                changed = [r for r in rows if before.get(r["symbol"]) != r]
+                channel.publish("rows", {"stage": "rescan", "rows": changed, "done": len(rows), "total": len(syms)})
+        summary = summarize(rows)
+        channel.publish("done", dict(summary, timings=timings))
+        return f"{summary['strong_signals']} güçlü sinyal, süreler: {timings}"
+    except Exception as e:
+        channel.publish("failed", {"error": str(e), "timings": timings})
+        raise
+
+def verify_panel_engine(rtol: float = 1e-9, as_of: Optional[str] = None) -> int:
+    """Panel motorunu sembol bazlı swing_signal_engine_v2 ile karşılaştırır; uyuşmazlık sayısını döner.
+    as_of verilirse geçmiş tarihli tarama (indeks) o güne kesilmiş verideki motorla karşılaştırılır."""
+    syms = load_symbols_from_csv()
+    cache = DATA_CACHE
+    panel_results = scan_universe(syms, DEFAULT_RISK_PER_TRADE, DEFAULT_PORTFOLIO_SIZE, cache=cache, as_of=as_of)
+    mismatches = 0
+    for s, (p_status, p_vals) in zip(syms, panel_results):
+        status, vals = swing_signal_engine_v2(s, DEFAULT_RISK_PER_TRADE, DEFAULT_PORTFOLIO_SIZE, cache=cache, as_of=as_of)
+        if status != p_status or (vals is None) != (p_vals is None):
+            mismatches += 1
+            logger.warning(f"Verify {s}: durum farklı: {status!r} != {p_status!r}")
+            continue
+        for k, v in (vals or {}).items():
+            pv = p_vals[k]
+            if isinstance(v, (str, bool, np.bool_)):
+                same = v == pv
+            else:
+                same = bool(np.isclose(v, pv, rtol=rtol, atol=rtol, equal_nan=True))
+            if not same:
+                mismatches += 1
+                logger.warning(f"Verify {s}: {k} farklı: {v} != {pv}")
+    logger.info(f"Panel doğrulama: {len(syms)} sembol, {mismatches} uyuşmazlık.")
+    return mismatches
+
+def verify_screen_rules() -> int:
+    """Yerleşik V2 kural setinin durum ve güçlü sinyal sonuçlarını panel motoruyla karşılaştırır."""
+    syms = load_symbols_from_csv()
+    cache, generation = get_cache_snapshot()
+    result = run_screen_set([get_screen(BUILTIN_SCREEN)], syms, cache, generation)[BUILTIN_SCREEN]
+    labels = result.screen.level_labels(result.flags)
+    results = scan_universe(syms, DEFAULT_RISK_PER_TRADE, DEFAULT_PORTFOLIO_SIZE, cache, generation)
+    mismatches = 0
+    for j, (s, (status, vals)) in enumerate(zip(syms, results)):
+        if vals is None:
+            same = not result.matched[j] and not result.flags['is_trend_ok'][j]
+        else:
+            same = status == labels[j] and bool(vals['is_strong_signal']) == bool(result.flags['is_strong'][j])
+        if not same:
+            mismatches += 1
+            logger.warning(f"Kural doğrulama {s}: {status!r} != {labels[j]!r}")
+    logger.info(f"Kural doğrulama ({BUILTIN_SCREEN}): {len(syms)} sembol, {mismatches} uyuşmazlık.")
+    return mismatches
+
+def cli_screens(specs: List[str]) -> Dict[str, List[str]]:
+    """Kayıtlı taramaları (ad) veya kural dosyalarını (yol) tek geçişte çalıştırır; eşleşmeler loglanır."""
+    screens = []
+    for spec in specs:
+        if os.path.isfile(spec):
+            with open(spec, encoding="utf-8") as f:
+                screens.append(compile_screen(f.read(), os.path.splitext(os.path.basename(spec))[0]))
+            continue
+        screen = get_screen(spec)
+        if screen is None:
+            raise RuleError(f"Tarama bulunamadı: {spec}")
+        screens.append(screen)
+    syms = load_symbols_from_csv()
+    t0 = time.perf_counter()
+    results = run_screen_set(screens, syms)
+    logger.info(f"{len(screens)} tarama, {len(syms)} sembol: {time.perf_counter() - t0:.3f} sn")
+    out = {}
+    for name, result in results.items():
+        out[name] = result.symbols()
+        logger.info(f"Tarama {name} ({result.screen.match}): {len(out[name])} eşleşme | {', '.join(out[name]) or '-'}")
+    return out
+
+def configure_scan_executor(backend: str, workers: int):
+    """Tarama arka ucunu değiştirir (mevcut process havuzu kapatılır)."""
+    global SCAN_EXECUTOR
+    SCAN_EXECUTOR.shutdown()
+    SCAN_EXECUTOR = ScanExecutor(backend, workers, snapshot_dir=SNAPSHOT_DIR + ".scan", window=CACHE_WINDOW)
+    SIGNAL_CACHE.clear()
+
+SCAN_OUTPUT_COLUMNS = ["universe", "symbol", "status", "price", "stop_loss", "recommended_lot",
+                       "rsi", "volume_zscore", "atr_percent", "rs_rank", "analysis_date", "signal_reason"]
+
+def cli_scan(universes: List[str], output: Optional[str] = None, as_of: Optional[str] = None) -> int:
+    """Bir veya daha fazla sembol listesini (CSV) tarar; özet loglanır, output verilirse CSV yazılır.
+    as_of verilirse tarama o günün verisiyle yapılır. Dönüş: toplam GÜÇLÜ sinyal sayısı."""
+    cache, generation = get_cache_snapshot()
+    rows = []
+    strong_total = 0
+    for path in universes:
+        syms = load_symbols_from_csv(path)
+        t0 = time.perf_counter()
+        results = scan_universe(syms, DEFAULT_RISK_PER_TRADE, DEFAULT_PORTFOLIO_SIZE, cache, generation, as_of=as_of)
+        if as_of is None:
+            record_signal_history(syms, results, generation)
+        bulk = scan_bulk_columns(syms, cache, generation) if as_of is None else {}
+        counts: Dict[str, int] = {}
+        for j, (s, (status, vals)) in enumerate(zip(syms, results)):
+            counts[status] = counts.get(status, 0) + 1
+            vals = dict(vals, **{k: v[j] for k, v in bulk.items()}) if vals else {}
+            rows.append([os.path.basename(path), s, status] + [vals.get(c, "") for c in SCAN_OUTPUT_COLUMNS[3:]])
+        strong = [s for s, (_, vals) in zip(syms, results) if vals and vals.get("is_strong_signal")]
+        strong_total += len(strong)
+        logger.info(f"Tarama {path}{f' (as_of {as_of})' if as_of else ''}: {len(syms)} sembol, {time.perf_counter() - t0:.2f} sn | "
+                    + ", ".join(f"{k}: {v}" for k, v in sorted(counts.items())))
+        if strong:
+            logger.info(f"GÜÇLÜ sinyaller ({path}): {', '.join(sorted(strong))}")
+    if output:
+        with open(output, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(SCAN_OUTPUT_COLUMNS)
+            writer.writerows(rows)
+        logger.info(f"Tarama sonuçları yazıldı: {output} ({len(rows)} satır)")
+    return strong_total
+
+def backtest_universe(syms: List[str], config: BacktestConfig, years: float = BACKTEST_YEARS) -> BacktestResult:
+    """Son `years` yılın sinyallerini test eder. Geçmiş DB'den tek pencereli sorguyla okunur;
+    göstergelerin ısınması için test başlangıcından önce CACHE_WINDOW bar daha yüklenir."""
+    if config.start is None:
+        config.start = (datetime.date.today() - datetime.timedelta(days=int(years * 365.25))).isoformat()
+    t0 = time.perf_counter()
+    frames = load_windows_from_db(syms, bars=int(years * 252) + CACHE_WINDOW)
+    load_seconds = time.perf_counter() - t0
+    result = run_backtest(frames, syms, config)
+    logger.info(f"Backtest: {len(frames)} sembol, {result.stats.get('trades', 0)} işlem | "
+                f"veri {load_seconds:.2f} sn, hesap {result.seconds:.2f} sn")
+    return result
+
+def _cli_backtest_config(signals: List[str], target_r: Optional[float], max_hold: int) -> BacktestConfig:
+    return BacktestConfig(risk_per_trade=DEFAULT_RISK_PER_TRADE, portfolio_size=DEFAULT_PORTFOLIO_SIZE,
+                          signals=tuple(signals), target_r=target_r, max_hold=max_hold,
+                          volume_z_threshold=VOLUME_ZSCORE_THRESHOLD, slope_period=MA_SLOPE_PERIOD)
+
+def cli_backtest(years: float, signals: List[str], target_r: Optional[float], max_hold: int,
+                 trades_out: Optional[str] = None) -> BacktestResult:
+    config = _cli_backtest_config(signals, target_r, max_hold)
+    result = backtest_universe(load_symbols_from_csv(), config, years)
+    for k, v in result.stats.items():
+        logger.info(f"  {k}: {v}")
+    if trades_out:
+        result.trades.to_csv(trades_out, index=False)
+        logger.info(f"İşlem listesi yazıldı: {trades_out} ({len(result.trades)} işlem)")
+    return result
+
+def cli_optimize(years: float, signals: List[str], target_r: Optional[float], max_hold: int,
+                 samples: int = 0, workers: int = 1, output: str = "optimizer_results.csv",
+                 rank_by: str = "avg_r", grid_file: Optional[str] = None, seed: int = 0) -> pd.DataFrame:
+    """Eşik parametrelerini tarar. Göstergeler bir kez hesaplanır; samples > 0 ise random search."""
+    grid = DEFAULT_GRID
+    if grid_file:
+        with open(grid_file, encoding='utf-8') as f:
+            grid = json.load(f)
+    check_grid(grid)
+    param_sets = sample_grid(grid, samples, seed) if samples else parameter_grid(grid)
+    base = _cli_backtest_config(signals, target_r, max_hold)
+    base.start = (datetime.date.today() - datetime.timedelta(days=int(years * 365.25))).isoformat()
+
+    t0 = time.perf_counter()
+    syms = load_symbols_from_csv()
+    data = prepare_backtest(load_windows_from_db(syms, bars=int(years * 252) + CACHE_WINDOW), syms,
+                            slope_period=base.slope_period)
+    logger.info(f"Optimizasyon verisi hazır: {len(syms)} sembol, {data.close.shape[0]} bar "
+                f"({time.perf_counter() - t0:.1f} sn). {len(param_sets)}/{grid_size(grid)} kombinasyon taranacak.")
+
+    step = max(1, len(param_sets) // 20)
+    def progress(done: int, total: int):
+        if done % step < 8 or done == total:
+            logger.info(f"Optimizasyon: {done}/{total}")
+
+    ranked = run_sweep(data, base, param_sets, workers=workers, rank_by=rank_by, progress=progress)
+    ranked.to_csv(output, index=False)
+    logger.info(f"Sıralı sonuçlar yazıldı: {output}")
+    if not ranked.empty:
+        logger.info("En iyi 5:\n" + ranked.head(5).to_string(index=False))
+    return ranked
+
 # ---------- Flask routes (TEMPLATE ve Mantık Güncellendi) ----------
 
 TEMPLATE_INDEX = """
@@ -409,6 +1173,18 @@ TEMPLATE_INDEX = """
     {% endif %}
   {% endwith %}
 
+  <div id="job-status" class="alert alert-light border small d-none"></div>
+
+  <div id="live-scan" class="card mb-3 border-success d-none">
+    <div class="card-header small">⚡ Canlı Tarama <span id="live-stage" class="text-muted"></span></div>
+    <div class="card-body small">
+      <div>Taranan: <span id="live-scanned">0</span> | Güncellenen: <span id="live-updated">-</span> | Hatalı: <span id="live-failed">0</span></div>
+      <div id="live-timings" class="text-muted"></div>
+      <div class="mt-2">Güçlü sinyaller: <span id="live-strong" class="fw-bold"></span></div>
+      <div id="live-errors" class="text-danger mt-1"></div>
+    </div>
+  </div>
+
   <div class="card mb-4 border-info">
       <div class="card-header bg-info text-white">⚙️ Risk ve Portföy Ayarları</div>
       <div class="card-body">
@@ -440,23 +1216,39 @@ TEMPLATE_INDEX = """
     <form method="post" action="{{ url_for('scan') }}" class="d-inline me-2">
       <button class="btn btn-primary btn-sm">Tara ve Sinyalleri Göster</button>
     </form>
+    <button type="button" class="btn btn-outline-success btn-sm me-2" onclick="startLiveScan()">Canlı Tara (Güncelle + Akış)</button>
+    <form method="get" action="{{ url_for('scan') }}" class="d-inline me-2">
+      <input type="date" name="as_of" value="{{ as_of or '' }}" class="form-control form-control-sm d-inline-block w-auto">
+      <button class="btn btn-outline-primary btn-sm">Geçmiş Tarihte Tara</button>
+    </form>
     
-    {% if current_filter == 'strong' %}
-      <a href="{{ url_for('scan') }}" class="btn btn-info btn-sm">Filtreyi Kaldır (Tümünü Göster)</a>
+    {% if screens %}
+    <form method="get" action="{{ url_for('scan') }}" class="d-inline me-2">
+      <select name="screen" class="form-select form-select-sm d-inline-block w-auto" onchange="this.form.submit()">
+        <option value="">Tarama Kuralı: Tümü</option>
+        {% for s in screens %}
+        <option value="{{ s.name }}" {% if s.name == current_screen %}selected{% endif %}>{{ s.name }}{% if s.description %} - {{ s.description }}{% endif %}</option>
+        {% endfor %}
+      </select>
+    </form>
+    {% endif %}
+
+    {% if current_filter or current_screen %}
+      <a href="{{ url_for('scan', as_of=as_of) }}" class="btn btn-info btn-sm">Filtreyi Kaldır (Tümünü Göster)</a>
     {% endif %}
     
   </div>
 
 
-  {% if results %}
+  {% if scan_view %}
     <div class="row mb-3">
         <div class="col-md-4">
             <div class="card border-primary">
                 <div class="card-body">
                     <h5 class="card-title">Özet İstatistikler</h5>
-                    <p class="card-text mb-1">Toplam Sembol: **{{ total_symbols }}**</p>
-                    <p class="card-text">Güçlü Sinyal: <a href="{{ url_for('scan', filter='strong') }}" class="badge bg-success text-decoration-none">**{{ strong_signals }}**</a></p>
-                    <p class="card-text"><small class="text-muted">Son Analiz Tarihi: **{{ analysis_date }}**</small></p>
+                    <p class="card-text mb-1">Toplam Sembol: **<span id="total-symbols">…</span>**</p>
+                    <p class="card-text">Güçlü Sinyal: <a href="{{ url_for('scan', filter='strong', as_of=as_of) }}" class="badge bg-success text-decoration-none">**<span id="strong-signals">…</span>**</a></p>
+                    <p class="card-text"><small class="text-muted">Son Analiz Tarihi: **<span id="analysis-date">…</span>**{% if as_of %} (as_of {{ as_of }}){% endif %}</small></p>
                     <p class="card-text"><small class="text-muted">Risk Ayarı: %{{ (risk_per_trade * 100) | round(2) }} (Portföy: {{ portfolio_size | round(0) }} TL)</small></p>
                 </div>
             </div>
@@ -474,60 +1266,18 @@ TEMPLATE_INDEX = """
           <th>RSI</th><th>MACD Hist.</th>
           <th><a href="{{ url_for_sort('volume_zscore') }}" class="text-white text-decoration-none">Hacim Z-Score</a></th>
           <th data-bs-toggle="tooltip" title="Volatilite Oranı (%)">ATR%</th>
-          <th data-bs-toggle="tooltip" title="SL Çarpanı: {{ dynamic_multiplier }}">Stop Loss</th>
+          <th data-bs-toggle="tooltip" title="Endekse göre göreli güç sırası (0-100)"><a href="{{ url_for_sort('rs_rank') }}" class="text-white text-decoration-none">RS</a></th>
+          <th>Stop Loss</th>
           <th class="table-success">Önerilen Lot</th>
           <th>Sinyal Durumu</th>
           <th>Neden (Açıklama)</th>
         </tr>
       </thead>
-      <tbody>
-      {% for r in results %}
-        <tr class="{% if r.is_strong_signal %}strong-signal-row{% elif r.status == 'Orta SWING SİNYALİ (Hacim Eksik)' %}table-info{% endif %}">
-          <td>{{ r.symbol }}</td>
-          {% if r.error %}
-            <td colspan="12" class="text-danger">{{ r.error }}</td>
-          {% else %}
-            <td>{{ "%.2f" % r.price }}</td>
-            <td class="{% if r.ma20_slope > 0 %}bg-green-lite{% else %}bg-red-lite{% endif %}">{{ "%.2f" % r.ma20 }}</td>
-            <td class="{% if r.ma20 > r.ma50 %}bg-green-lite{% else %}bg-red-lite{% endif %}">{{ "%.2f" % r.ma50 }}</td>
-            <td class="{% if r.ma50 > r.ma200 %}bg-green-lite{% else %}bg-red-lite{% endif %}">{{ "%.2f" % r.ma200 }}</td>
-            
-            {% set pullback_class = "bg-pullback-fail" %}
-            {% if "Pullback: Fiyat, MA20 Destek Aralığında" in r.signal_reason %}
-                {% set pullback_class = "bg-pullback-ok" %}
-            {% endif %}
-            <td class="{{ pullback_class }} text-center">
-                {% if pullback_class == 'bg-pullback-ok' %} ✅ {% else %} ❌ {% endif %}
-            </td>
-            
-            {% set reversal_class = "" %}
-            {% if "Momentum: Dönüş sinyali yok" not in r.signal_reason %}
-                {% set reversal_class = "bg-reversal-ok" %}
-            {% endif %}
-            <td class="{{ reversal_class }} text-center">
-                {% if reversal_class == 'bg-reversal-ok' %} ✅ {% else %} ❌ {% endif %}
-            </td>
-
-            <td>{{ "%.2f" % r.rsi }}</td>
-            <td>{{ "%.4f" % r.macd_hist }}</td>
-            
-            <td class="{% if r.volume_zscore >= volume_zscore_threshold %}bg-zscore-high{% endif %}">
-                 {{ "%.2f" % r.volume_zscore }}
-            </td>
-            
-            <td>{{ "%.2f" % r.atr_percent }}%</td>
-            <td class="table-danger fw-bold" data-bs-toggle="tooltip" title="SL Çarpanı: {{ r.dynamic_multiplier | round(1) }}x">
-                {{ "%.2f" % r.stop_loss if r.stop_loss is not none and r.stop_loss > 0 else 'N/A' }}
-            </td>
-            <td class="table-success fw-bold">{{ r.recommended_lot if r.recommended_lot is not none and r.recommended_lot > 0 else 'N/A' }}</td>
-            
-            <td class="fw-bold">{{ r.status }}</td>
-            <td style="font-size: 0.75rem;">{{ r.signal_reason | replace("|", "<br>") | safe }}</td>
-          {% endif %}
-        </tr>
-      {% endfor %}
+      <tbody id="scan-body">
+        <tr><td colspan="16" class="text-muted">Yükleniyor…</td></tr>
       </tbody>
     </table>
+    <nav id="scan-pager" class="small mb-3"></nav>
   {% endif %}
 
   <hr>
@@ -542,17 +1292,121 @@ TEMPLATE_INDEX = """
     var tooltipList = tooltipTriggerList.map(function (tooltipTriggerEl) {
         return new bootstrap.Tooltip(tooltipTriggerEl)
     })
+
+    // Arka plan işlerinin (bootstrap/update) ilerlemesini göster
+    function pollJobs() {
+        fetch("{{ url_for('jobs_status') }}").then(r => r.json()).then(jobs => {
+            var box = document.getElementById('job-status');
+            var active = Object.values(jobs).filter(j => j.status === 'running' || j.status === 'queued');
+            if (active.length === 0) { box.classList.add('d-none'); return; }
+            box.innerHTML = active.map(j => '⏳ <b>' + j.kind + '</b>: ' + j.done + '/' + j.total +
+                ' sembol (%' + j.progress + ', hatalı: ' + j.failed + ')' +
+                (j.eta_seconds !== null ? ' | ETA: ' + Math.round(j.eta_seconds) + ' sn' : '')).join('<br>');
+            box.classList.remove('d-none');
+            setTimeout(pollJobs, 2000);
+        }).catch(() => {});
+    }
+    pollJobs();
+
+    // Canlı tarama: /scan/live işi başlatır, ilerleme ve kısmi sonuçlar SSE ile gelir
+    function startLiveScan() {
+        fetch("{{ url_for('live_scan_start') }}", {method: 'POST'}).then(r => r.json()).then(run => {
+            if (run.error) { alert(run.error); return; }
+            var $ = id => document.getElementById(id);
+            var strong = {}, failed = 0, timings = [];
+            $('live-scan').classList.remove('d-none');
+            $('live-strong').textContent = ''; $('live-errors').textContent = '';
+            var es = new EventSource(run.events_url);
+            var data = e => JSON.parse(e.data);
+            es.addEventListener('stage', e => {
+                var d = data(e);
+                $('live-stage').textContent = '(' + d.stage + (d.status === 'end' ? ' bitti' : '…') + ')';
+                if (d.status === 'end') { timings.push(d.stage + ': ' + d.seconds + ' sn'); $('live-timings').textContent = timings.join(' | '); }
+            });
+            es.addEventListener('rows', e => {
+                var d = data(e);
+                $('live-scanned').textContent = d.done + '/' + d.total;
+                d.rows.forEach(r => { if (r.is_strong_signal) { strong[r.symbol] = true; } else { delete strong[r.symbol]; } });
+                $('live-strong').textContent = Object.keys(strong).join(', ') || '-';
+            });
+            es.addEventListener('progress', e => { var d = data(e); $('live-updated').textContent = d.done + '/' + d.total; });
+            es.addEventListener('fetch_error', e => { var d = data(e); failed++; $('live-failed').textContent = failed;
+                $('live-errors').textContent = d.symbol + ': ' + d.message; });
+            es.addEventListener('gap', e => { $('live-errors').textContent = data(e).skipped + ' olay atlandı (yavaş bağlantı).'; });
+            es.addEventListener('done', e => { es.close(); $('live-stage').innerHTML = '(bitti) <a href="{{ url_for('scan') }}">Tabloyu göster</a>'; });
+            es.addEventListener('failed', e => { es.close(); $('live-errors').textContent = 'Hata: ' + data(e).error; });
+        });
+    }
+
+    {% if scan_view %}
+    // Tarama tablosu /api/scan'den sayfa sayfa doldurulur (filtre/sıralama/sayfa sunucu tarafında)
+    function esc(v) {
+        return String(v).replace(/[&<>"']/g, c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[c]));
+    }
+    function fmt(v, digits) { return v === null ? '-' : v.toFixed(digits); }
+    function rowHtml(r, zThreshold) {
+        if (r.error) {
+            return '<tr><td>' + esc(r.symbol) + '</td><td colspan="15" class="text-danger">' + esc(r.error) + '</td></tr>';
+        }
+        var cls = r.is_strong_signal ? 'strong-signal-row' : (r.status === {{ status_medium | tojson }} ? 'table-info' : '');
+        var trend = ok => ok ? 'bg-green-lite' : 'bg-red-lite';
+        return '<tr class="' + cls + '">' +
+            '<td>' + esc(r.symbol) + '</td>' +
+            '<td>' + fmt(r.price, 2) + '</td>' +
+            '<td class="' + trend(r.ma20_slope > 0) + '">' + fmt(r.ma20, 2) + '</td>' +
+            '<td class="' + trend(r.ma20 > r.ma50) + '">' + fmt(r.ma50, 2) + '</td>' +
+            '<td class="' + trend(r.ma50 > r.ma200) + '">' + fmt(r.ma200, 2) + '</td>' +
+            '<td class="' + (r.pullback ? 'bg-pullback-ok' : 'bg-pullback-fail') + ' text-center">' + (r.pullback ? '✅' : '❌') + '</td>' +
+            '<td class="' + (r.reversal ? 'bg-reversal-ok' : '') + ' text-center">' + (r.reversal ? '✅' : '❌') + '</td>' +
+            '<td>' + fmt(r.rsi, 2) + '</td>' +
+            '<td>' + fmt(r.macd_hist, 4) + '</td>' +
+            '<td class="' + (r.volume_zscore !== null && r.volume_zscore >= zThreshold ? 'bg-zscore-high' : '') + '">' + fmt(r.volume_zscore, 2) + '</td>' +
+            '<td>' + fmt(r.atr_percent, 2) + '%</td>' +
+            '<td>' + fmt(r.rs_rank, 0) + '</td>' +
+            '<td class="table-danger fw-bold" title="SL Çarpanı: ' + fmt(r.dynamic_multiplier, 1) + 'x">' + (r.stop_loss > 0 ? r.stop_loss.toFixed(2) : 'N/A') + '</td>' +
+            '<td class="table-success fw-bold">' + (r.recommended_lot > 0 ? r.recommended_lot : 'N/A') + '</td>' +
+            '<td class="fw-bold">' + esc(r.status) + '</td>' +
+            '<td style="font-size: 0.75rem;">' + esc(r.signal_reason).split('|').join('<br>') + '</td>' +
+            '</tr>';
+    }
+    function pagerHtml(meta) {
+        var pages = Math.max(1, Math.ceil(meta.total_matched / meta.limit));
+        var page = Math.floor(meta.offset / meta.limit) + 1;
+        if (pages === 1) { return ''; }
+        var link = p => { var q = new URLSearchParams(window.location.search); q.set('page', p); return '?' + q.toString(); };
+        return (page > 1 ? '<a href="' + link(page - 1) + '">&laquo; Önceki</a> ' : '') +
+            'Sayfa ' + page + ' / ' + pages + ' (' + meta.total_matched + ' sembol)' +
+            (page < pages ? ' <a href="' + link(page + 1) + '">Sonraki &raquo;</a>' : '');
+    }
+    fetch({{ api_url | tojson }}).then(r => r.ok ? r.json() : r.json().then(e => Promise.reject(e))).then(data => {
+        var meta = data.meta;
+        document.getElementById('total-symbols').textContent = meta.total_symbols;
+        document.getElementById('strong-signals').textContent = meta.strong_signals;
+        document.getElementById('analysis-date').textContent = meta.analysis_date || 'N/A';
+        document.getElementById('scan-body').innerHTML = data.rows.map(r => rowHtml(r, meta.volume_zscore_threshold)).join('') ||
+            '<tr><td colspan="16" class="text-muted">Sonuç yok.</td></tr>';
+        document.getElementById('scan-pager').innerHTML = pagerHtml(meta);
+    }).catch(e => {
+        document.getElementById('scan-body').innerHTML = '<tr><td colspan="16" class="text-danger">Tarama yüklenemedi: ' +
+            esc(e && e.error ? e.error : e) + '</td></tr>';
+    });
+    {% endif %}
 </script>
 </body>
 </html>
 """
 
+# Şablon isimle kaydedilir: Jinja derlenmiş hâlini önbellekte tutar (her istekte yeniden ayrıştırılmaz)
+app.jinja_loader = DictLoader({"index.html": TEMPLATE_INDEX})
+
 @app.context_processor
 def utility_processor():
     def url_for_sort(sort_by_column):
         current_sort_by = request.args.get('sort_by')
         current_sort_order = request.args.get('sort_order', 'desc')
         current_filter = request.args.get('filter')
+        current_screen = request.args.get('screen')
+        as_of = request.args.get('as_of')
         
         if current_sort_by == sort_by_column:
             new_sort_order = 'asc' if current_sort_order == 'desc' else 'desc'
@@ -561,28 +1415,71 @@ def utility_processor():
 
         return url_for('scan', 
                        filter=current_filter, 
+                       screen=current_screen,
+                       as_of=as_of,
                        sort_by=sort_by_column, 
                        sort_order=new_sort_order)
     return dict(url_for_sort=url_for_sort)
 
 
+@app.before_request
+def _follow_shared_cache():
+    refresh_shared_cache() # worker rolünde yeni yayınlanan cache sürümüne geçilir
+
+@app.before_request
+def _start_request_metrics():
+    g.request_t0 = time.perf_counter()
+    # İstek bazlı profil: sadece REQUEST_PROFILING açıkken ve istemci ?profile=1 gönderdiğinde
+    if REQUEST_PROFILING and request.args.get('profile') == '1':
+        g.profile_token = start_profile(f"{request.method} {request.full_path.rstrip('?')}")
+
+@app.after_request
+def _finish_request_metrics(response):
+    endpoint = request.endpoint or "unknown"
+    HTTP_SECONDS.observe(time.perf_counter() - g.request_t0, endpoint=endpoint)
+    HTTP_REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+    token = g.pop('profile_token', None)
+    if token is not None:
+        profile = end_profile(token)
+        report = profile.to_dict(PROFILE_TOP)
+        RECENT_PROFILES.append(report)
+        response.headers['Server-Timing'] = profile.server_timing(PROFILE_TOP)
+        logger.info(f"Profil {report['label']}: {report['total_ms']} ms | en yavaş aşamalar: "
+                    + ", ".join(f"{st['stage']}={st['total_ms']}ms" for st in report['stages'])
+                    + (" | en yavaş semboller: " + ", ".join(f"{sy['symbol']}({sy['stage']})={sy['ms']}ms"
+                                                             for sy in report['symbols']) if report['symbols'] else ""))
+    return response
+
+@app.route("/metrics", methods=["GET"])
+def metrics_route():
+    """Prometheus metin biçiminde sayaçlar, aşama gecikme histogramları ve cache/bellek değerleri."""
+    return app.response_class(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route("/metrics/profiles", methods=["GET"])
+def metrics_profiles():
+    """Son profillenen istekler (?profile=1, REQUEST_PROFILING açıkken)."""
+    return jsonify(enabled=REQUEST_PROFILING, profiles=list(RECENT_PROFILES))
+
+@app.route("/cache/memory", methods=["GET"])
+def cache_memory():
+    """RAM cache dizilerinin, tarama tamponlarının ve sürecin bellek kullanımı."""
+    return jsonify(cache_memory_report())
+
 @app.route("/", methods=["GET"])
 def index():
     portfolio_size = session.get('portfolio_size', DEFAULT_PORTFOLIO_SIZE)
     risk_per_trade = session.get('risk_per_trade', DEFAULT_RISK_PER_TRADE)
     
-    return render_template_string(TEMPLATE_INDEX, 
-                                  csv_name=SYMBOLS_CSV, 
-                                  db_name=DB_FILE, 
-                                  results=None, 
-                                  analysis_date="N/A", 
-                                  total_symbols=len(load_symbols_from_csv()),
-                                  strong_signals=0,
-                                  current_filter=None,
-                                  risk_per_trade=risk_per_trade,
-                                  portfolio_size=portfolio_size,
-                                  cache_size=len(DATA_CACHE),
-                                  volume_zscore_threshold=VOLUME_ZSCORE_THRESHOLD)
+    with timed("render"):
+        return render_template("index.html",
+                               csv_name=SYMBOLS_CSV,
+                               db_name=DB_FILE,
+                               scan_view=False,
+                               current_filter=None,
+                               risk_per_trade=risk_per_trade,
+                               portfolio_size=portfolio_size,
+                               cache_size=len(DATA_CACHE),
+                               volume_zscore_threshold=VOLUME_ZSCORE_THRESHOLD)
 
 @app.route("/set_settings", methods=["POST"])
 def set_settings():
@@ -603,22 +1500,89 @@ def set_settings():
         flash("Geçersiz değerler girdiniz. Lütfen sayısal değerler kullanın.", "danger")
         return redirect(url_for("index"))
 
+def _flash_job_conflict(job: Job):
+    flash(f"Zaten çalışan bir <b>{job.kind}</b> işi var (#{job.id}, {job.done}/{job.total} sembol). "
+          f"Yeni iş başlatılmadı.", "warning")
+
 @app.route("/bootstrap", methods=["POST"])
 def bootstrap():
-    def job():
-        cli_bootstrap_all() # CLI fonksiyonları artık yukarıda tanımlı
-    threading.Thread(target=job).start()
-    flash("Bootstrap başlatıldı (arka planda). Veri indirme tamamlandığında cache otomatik güncellenecektir.", "info")
+    if CACHE_ROLE == "worker":
+        flash(READ_ONLY_MESSAGE, "warning")
+        return redirect(url_for("index"))
+    job, created = JOBS.start("bootstrap", cli_bootstrap_all, group=INGEST_GROUP)
+    if not created:
+        _flash_job_conflict(job)
+    else:
+        flash("Bootstrap başlatıldı (arka planda). Veri indirme tamamlandığında cache otomatik güncellenecektir.", "info")
     return redirect(url_for("index"))
 
 @app.route("/update_all", methods=["POST"])
 def update_all():
-    def job():
-        cli_update_all() # CLI fonksiyonları artık yukarıda tanımlı
-    threading.Thread(target=job).start()
-    flash("Tüm semboller için güncelleme başlatıldı (arka planda). Tamamlandığında cache otomatik güncellenecektir.", "info")
+    if CACHE_ROLE == "worker":
+        flash(READ_ONLY_MESSAGE, "warning")
+        return redirect(url_for("index"))
+    job, created = JOBS.start("update", cli_update_all, group=INGEST_GROUP)
+    if not created:
+        _flash_job_conflict(job)
+    else:
+        flash("Tüm semboller için güncelleme başlatıldı (arka planda). Tamamlandığında cache otomatik güncellenecektir.", "info")
     return redirect(url_for("index"))
 
+@app.route("/jobs", methods=["GET"])
+def jobs_status():
+    """Tüm iş türlerinin son durumu: tamamlanan/hatalı sembol, ilerleme yüzdesi ve ETA."""
+    return jsonify(JOBS.snapshot())
+
+@app.route("/jobs/<kind>", methods=["GET"])
+def job_status(kind):
+    job = JOBS.get(kind)
+    if job is None:
+        abort(404)
+    return jsonify(job.to_dict())
+
+@app.route("/backtest", methods=["GET"])
+def backtest_route():
+    """V2 sinyallerinin geçmiş performansı (JSON). Parametreler: years, signals (strong,medium),
+    target_r (0: hedef yok), max_hold, max_trades (döndürülen son işlem sayısı). Risk ve portföy ayarları oturumdan alınır."""
+    try:
+        years = float(request.args.get('years', BACKTEST_YEARS))
+        signals = [s for s in request.args.get('signals', 'strong').split(',') if s]
+        target_r = float(request.args.get('target_r', BACKTEST_TARGET_R)) or None
+        max_hold = int(request.args.get('max_hold', BACKTEST_MAX_HOLD))
+        max_trades = int(request.args.get('max_trades', 500))
+    except ValueError as e:
+        return jsonify(error=f"Geçersiz parametre: {e}"), 400
+    if not set(signals) <= {"strong", "medium"} or years <= 0 or max_hold < 1 or max_trades < 1:
+        return jsonify(error="signals: strong,medium; years > 0; max_hold >= 1; max_trades >= 1"), 400
+    config = BacktestConfig(risk_per_trade=session.get('risk_per_trade', DEFAULT_RISK_PER_TRADE),
+                            portfolio_size=session.get('portfolio_size', DEFAULT_PORTFOLIO_SIZE),
+                            signals=tuple(signals), target_r=target_r, max_hold=max_hold,
+                            volume_z_threshold=VOLUME_ZSCORE_THRESHOLD, slope_period=MA_SLOPE_PERIOD)
+    result = backtest_universe(load_symbols_from_csv(), config, years)
+    return jsonify(result.to_dict(max_trades=max_trades))
+
+@app.route("/signals/changes", methods=["GET"])
+def signal_changes():
+    """Son iki kayıt günü (veya date/previous) arasında yeni güçlü, düşen ve yükselen/düşen sinyaller."""
+    return jsonify(get_signal_changes(request.args.get('date'), request.args.get('previous')))
+
+@app.route("/signals/history/<symbol>", methods=["GET"])
+def signal_history_route(symbol):
+    conn = connect(DB_FILE)
+    try:
+        return jsonify(symbol_history(conn, symbol.upper(), request.args.get('since')))
+    finally:
+        conn.close()
+
+@app.route("/signals/counts", methods=["GET"])
+def signal_counts_route():
+    """Gün bazında güçlü / orta sinyal sayıları."""
+    conn = connect(DB_FILE)
+    try:
+        return jsonify(signal_counts(conn, request.args.get('since')))
+    finally:
+        conn.close()
+
 @app.route("/scan", methods=["POST", "GET"])
 def scan():
     if not DATA_CACHE:
@@ -629,94 +1593,217 @@ def scan():
     risk_per_trade = session.get('risk_per_trade', DEFAULT_RISK_PER_TRADE)
     
     filter_param = request.args.get('filter')
-    sort_by = request.args.get('sort_by')
-    sort_order = request.args.get('sort_order', 'desc')
-    
-    syms = load_symbols_from_csv()
-    all_results_for_count = []
-    analysis_date = "N/A"
-    strong_signals_count = 0
-    total_count = len(syms)
+    as_of = request.args.get('as_of') or None
+    if as_of is not None:
+        try:
+            as_of = pd.Timestamp(as_of).strftime('%Y-%m-%d')
+        except ValueError:
+            flash(f"Geçersiz tarih: {as_of}", "danger")
+            return redirect(url_for('scan'))
     
-    # POST ile gelindiyse (Tarama butonu tıklandıysa) güncelleme yap
+    # POST ile gelindiyse (Tarama butonu tıklandıysa) güncellemeyi arka planda başlat;
+    # tarama beklemeden son tutarlı cache snapshot'ından yapılır
     if request.method == 'POST':
-        flash("Tarama başlamadan önce son güncellemeler kontrol ediliyor...", "secondary")
-        for s in syms:
-            ok, msg = update_symbol_prices(s)
-            if not ok and "unique constraint" not in msg:
-                logger.warning(f"Scan Update Error {s}: {msg}")
-        load_all_data_to_cache() # Güncellemeler bitti, cache'i yeniden yükle
-        
-    # Analiz (Cache'ten çalışır, çok hızlıdır)
-    for s in syms:
-        try:
-            status, vals = swing_signal_engine_v2(s, risk_per_trade, portfolio_size)
-            
-            if vals is None:
-                all_results_for_count.append({"symbol": s, "error": status})
-            else:
-                result_entry = {
-                    "symbol": vals["symbol"], 
-                    "price": vals["price"], 
-                    "ma20": vals["ma20"], 
-                    "ma50": vals["ma50"], 
-                    "ma200": vals["ma200"], 
-                    "rsi": vals["rsi"], 
-                    "macd_hist": vals["macd_hist"],
-                    "volume_zscore": vals["volume_zscore"],
-                    "ma20_slope": vals["ma20_slope"],
-                    "atr": vals["atr"],
-                    "atr_percent": vals["atr_percent"],
-                    "dynamic_multiplier": vals["dynamic_multiplier"],
-                    "stop_loss": vals["stop_loss"],
-                    "recommended_lot": vals["recommended_lot"],
-                    "status": status, 
-                    "error": None,
-                    "signal_reason": vals["signal_reason"],
-                    "is_strong_signal": vals["is_strong_signal"]
-                }
-                analysis_date = vals["analysis_date"]
-                
-                if vals["is_strong_signal"]:
-                    strong_signals_count += 1
-            
-                all_results_for_count.append(result_entry)
-            
-        except Exception as e:
-            logger.error(f"Scan Error for {s}: {e}")
-            all_results_for_count.append({"symbol": s, "error": f"Hesaplama Hatası: {e}"})
+        if CACHE_ROLE == "worker":
+            flash(READ_ONLY_MESSAGE, "warning")
+            return redirect(url_for('scan'))
+        job, created = JOBS.start("scan_update", lambda j: cli_update_all(j, label="Scan Update"), group=INGEST_GROUP)
+        if created:
+            flash("Güncelleme arka planda başlatıldı. Sonuçlar son tutarlı cache'ten gösteriliyor; "
+                  "güncelleme bitince tekrar tarayın.", "secondary")
+        else:
+            flash(f"Arka planda <b>{job.kind}</b> işi sürüyor ({job.done}/{job.total} sembol). "
+                  f"Sonuçlar son tutarlı cache'ten gösteriliyor.", "secondary")
+        return redirect(url_for('scan'))
 
-    # FİLTRELEME İŞLEMİ
-    results = all_results_for_count
-    if filter_param == 'strong':
-        results = [r for r in all_results_for_count if r.get('is_strong_signal')]
-    
-    # SIRALAMA İŞLEMİ
-    if sort_by:
-        reverse = (sort_order == 'desc')
-        
-        sortable_results = [r for r in results if r.get(sort_by) is not None and r.get('error') is None]
-        non_sortable_results = [r for r in results if r not in sortable_results]
-        
+    # Sayfa sadece iskelet; tablo /api/scan'den aynı filtre/sıralama/sayfa parametreleriyle doldurulur
+    api_args = request.args.to_dict()
+    if as_of is not None:
+        api_args['as_of'] = as_of
+    with timed("render"):
+        return render_template("index.html",
+                               csv_name=SYMBOLS_CSV,
+                               db_name=DB_FILE,
+                               scan_view=True,
+                               api_url=url_for('api_scan', **api_args),
+                               current_filter=filter_param,
+                               current_screen=request.args.get('screen'),
+                               screens=get_screens() if as_of is None else [],
+                               as_of=as_of,
+                               risk_per_trade=risk_per_trade,
+                               portfolio_size=portfolio_size,
+                               cache_size=len(DATA_CACHE),
+                               status_medium=STATUS_MEDIUM,
+                               volume_zscore_threshold=VOLUME_ZSCORE_THRESHOLD)
+
+@app.route("/scan/live", methods=["POST"])
+def live_scan_start():
+    """Canlı taramayı (tarama + güncelleme) arka planda başlatır; olaylar events_url'den SSE ile okunur.
+    update=0 verilirse sadece tarama yapılır. Başka bir veri işi sürüyorsa güncellemesiz tarama başlar;
+    aynı canlı tarama sürüyorsa ona bağlanılır."""
+    if not DATA_CACHE:
+        return jsonify(error="RAM Cache boş. Lütfen önce Güncelle veya Bootstrap yapın."), 503
+    update = request.values.get('update', '1') != '0' and CACHE_ROLE != "worker" # worker sadece tarar
+    syms = load_symbols_from_csv()
+    risk_per_trade = session.get('risk_per_trade', DEFAULT_RISK_PER_TRADE)
+    portfolio_size = session.get('portfolio_size', DEFAULT_PORTFOLIO_SIZE)
+
+    def target(job: Job, update: bool) -> str:
+        return run_live_scan(job, SCAN_EVENTS.channel(job.id), syms, risk_per_trade, portfolio_size, update)
+
+    job, created = JOBS.start("live_scan", functools.partial(target, update=update),
+                              group=INGEST_GROUP if update else "live_scan")
+    if not created and job.kind != "live_scan":
+        # Bootstrap / güncelleme sürüyor: veri işine dokunmadan sadece tarama akıtılır
+        update = False
+        job, created = JOBS.start("live_scan", functools.partial(target, update=False), group="live_scan")
+    SCAN_EVENTS.channel(job.id) # İstemci iş thread'inden önce bağlanabilir
+    return jsonify(run_id=job.id, update=update, attached=not created,
+                   events_url=url_for('live_scan_events', run_id=job.id))
+
+@app.route("/scan/live/<int:run_id>/events", methods=["GET"])
+def live_scan_events(run_id):
+    """text/event-stream: stage, rows, progress, fetch_error, gap, done / failed olayları."""
+    channel = SCAN_EVENTS.get(run_id)
+    if channel is None:
+        abort(404)
+    last_id = request.headers.get('Last-Event-ID', request.args.get('last_id', '0'))
+    response = app.response_class(stream_with_context(sse_stream(channel, int(last_id) if last_id.isdigit() else 0)),
+                                  mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no' # nginx arkasında tamponlamayı kapat
+    return response
+
+@app.route("/api/scan", methods=["GET"])
+def api_scan():
+    """Tarama sonuçları (JSON veya NDJSON). Parametreler: filter (strong|signal), q (sembol içerir),
+    screen (kayıtlı tarama: sadece eşleşen semboller), sort_by, sort_order (asc|desc), offset/limit veya
+    page/page_size, as_of (YYYY-MM-DD), format (json|ndjson).
+    Risk ve portföy ayarları oturumdan alınır. ETag veri sürümüne bağlıdır; If-None-Match eşleşirse 304."""
+    if not DATA_CACHE:
+        return jsonify(error="RAM Cache boş. Lütfen önce Güncelle veya Bootstrap yapın."), 503
+    try:
+        query = parse_query(request.args)
+        as_of = request.args.get('as_of') or None
+        if as_of is not None:
+            as_of = pd.Timestamp(as_of).strftime('%Y-%m-%d')
+    except ValueError as e:
+        return jsonify(error=f"Geçersiz parametre: {e}"), 400
+    screen = None
+    if request.args.get('screen'):
+        if as_of is not None:
+            return jsonify(error="screen geçmiş tarihli taramada (as_of) desteklenmiyor."), 400
         try:
-            results = sorted(sortable_results, key=lambda x: x[sort_by], reverse=reverse)
-            results.extend(non_sortable_results)
-        except (KeyError, TypeError):
-            results = all_results_for_count 
+            screen = get_screen(request.args['screen'])
+        except RuleError as e:
+            return jsonify(error=f"Tarama derlenemedi: {e}"), 400
+        if screen is None:
+            return jsonify(error=f"Tarama bulunamadı: {request.args['screen']}"), 404
+    ndjson = (request.args.get('format') == 'ndjson' or
+              request.accept_mimetypes.best_match(['application/json', 'application/x-ndjson']) == 'application/x-ndjson')
+    risk_per_trade = session.get('risk_per_trade', DEFAULT_RISK_PER_TRADE)
+    portfolio_size = session.get('portfolio_size', DEFAULT_PORTFOLIO_SIZE)
 
-    
-    return render_template_string(TEMPLATE_INDEX, 
-                                  csv_name=SYMBOLS_CSV, 
-                                  db_name=DB_FILE, 
-                                  results=results, 
-                                  analysis_date=analysis_date,
-                                  total_symbols=total_count,
-                                  strong_signals=strong_signals_count,
-                                  current_filter=filter_param,
-                                  risk_per_trade=risk_per_trade,
-                                  portfolio_size=portfolio_size,
-                                  cache_size=len(DATA_CACHE),
-                                  volume_zscore_threshold=VOLUME_ZSCORE_THRESHOLD)
+    syms = load_symbols_from_csv()
+    cache, generation = get_cache_snapshot() # Tarama boyunca aynı snapshot kullanılır
+    version = scan_data_version(generation, as_of)
+    # Kural metni değişirse ETag da değişir (digest)
+    etag = make_etag(version, syms, risk_per_trade, portfolio_size, query.key(), ndjson,
+                     screen.digest if screen is not None else None)
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        rows = get_scan_rows(syms, risk_per_trade, portfolio_size, cache, generation, version, as_of)
+        selected = rows
+        if screen is not None:
+            matches = set(run_screen_set([screen], syms, cache, generation)[screen.name].symbols())
+            selected = [r for r in rows if r["symbol"] in matches]
+        page, matched = apply_query(selected, query)
+        meta = dict(summarize(rows), as_of=as_of, screen=screen.name if screen is not None else None,
+                    total_matched=matched, offset=query.offset, limit=query.limit,
+                    risk_per_trade=risk_per_trade, portfolio_size=portfolio_size,
+                    volume_zscore_threshold=VOLUME_ZSCORE_THRESHOLD)
+        if ndjson:
+            response = app.response_class(ndjson_lines(meta, page), mimetype='application/x-ndjson')
+        else:
+            with timed("serialize"):
+                body = dumps({"meta": meta, "rows": page})
+            response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache' # Her seferinde ETag ile doğrulanır
+    response.vary.add('Cookie')
+    return response
+
+@app.route("/api/screens", methods=["GET"])
+def api_screens():
+    """Yerleşik ve kayıtlı taramalar (kural metinleriyle)."""
+    return jsonify(screens=get_screens())
+
+@app.route("/api/screens", methods=["POST"])
+def api_screen_save():
+    """Tarama kaydeder / günceller. JSON veya form: name, rules (kural metni), description.
+    Kural derlenemezse 400 ve satır numaralı hata."""
+    data = request.get_json(silent=True) or request.form
+    conn = connect(DB_FILE)
+    try:
+        screen = save_screen(conn, (data.get('name') or '').strip(), data.get('rules') or '', data.get('description') or '')
+    except RuleError as e:
+        return jsonify(error=str(e), line=e.line), 400
+    finally:
+        conn.close()
+    logger.info(f"Tarama kaydedildi: {screen.name} ({len(screen.rules)} kural)")
+    return jsonify(screen.to_dict(MA_SLOPE_PERIOD)), 201
+
+@app.route("/api/screens/run", methods=["GET", "POST"])
+def api_screens_run():
+    """Taramaları canlı cache üzerinde tek geçişte çalıştırır. name (tekrarlanabilir veya virgüllü; verilmezse
+    tümü), details=1 eşleşen sembollerin kural bayrakları ve değerleri. POST gövdesinde `rules` verilirse
+    kaydetmeden denenir ("adhoc")."""
+    if not DATA_CACHE:
+        return jsonify(error="RAM Cache boş. Lütfen önce Güncelle veya Bootstrap yapın."), 503
+    data = request.get_json(silent=True) or {}
+    names = [n for arg in request.args.getlist('name') + list(data.get('names') or []) for n in arg.split(',') if n]
+    try:
+        screens = [compile_screen(data['rules'], "adhoc", params=data.get('params'))] if data.get('rules') else []
+        if not names and not screens:
+            names = [s['name'] for s in get_screens()]
+        for name in dict.fromkeys(names):
+            screen = get_screen(name)
+            if screen is None:
+                return jsonify(error=f"Tarama bulunamadı: {name}"), 404
+            screens.append(screen)
+    except RuleError as e:
+        return jsonify(error=str(e), line=e.line), 400
+    syms = load_symbols_from_csv()
+    cache, generation = get_cache_snapshot()
+    details = (request.args.get('details') or str(data.get('details', ''))).lower() in ('1', 'true')
+    t0 = time.perf_counter()
+    results = run_screen_set(screens, syms, cache, generation)
+    return jsonify(generation=generation, total_symbols=len(syms), seconds=round(time.perf_counter() - t0, 4),
+                   screens={name: r.to_dict(details) for name, r in results.items()})
+
+@app.route("/api/screens/<name>", methods=["GET"])
+def api_screen_get(name):
+    try:
+        screen = get_screen(name)
+    except RuleError as e:
+        return jsonify(error=str(e), line=e.line), 400
+    if screen is None:
+        return jsonify(error=f"Tarama bulunamadı: {name}"), 404
+    return jsonify(screen.to_dict(MA_SLOPE_PERIOD))
+
+@app.route("/api/screens/<name>", methods=["DELETE"])
+def api_screen_delete(name):
+    if name == BUILTIN_SCREEN:
+        return jsonify(error="Yerleşik tarama silinemez."), 400
+    conn = connect(DB_FILE)
+    try:
+        deleted = delete_screen(conn, name)
+    finally:
+        conn.close()
+    if not deleted:
+        return jsonify(error=f"Tarama bulunamadı: {name}"), 404
+    return app.response_class(status=204)
 
 # ---------- main ----------
 
@@ -724,12 +1811,98 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--bootstrap", action="store_true", help="Tüm semboller için bootstrap (tüm tarihleri indir).")
     parser.add_argument("--update", action="store_true", help="CSV'deki tüm semboller için cache güncelle.")
+    parser.add_argument("--provider", choices=["yfinance", "csv", "fake"], default=DATA_PROVIDER,
+                        help="Veri kaynağı (csv: --data-dir klasörü, fake: sentetik offline veri).")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="csv sağlayıcısı için veri klasörü.")
+    parser.add_argument("--fetch-workers", default=FETCH_WORKERS, type=int, help="Paralel indirme thread sayısı.")
+    parser.add_argument("--verify-panel", action="store_true", help="Panel motorunu sembol bazlı motorla karşılaştır.")
+    parser.add_argument("--verify-incremental", action="store_true",
+                        help="Artımlı gösterge durumunu toplu hesaplamayla karşılaştır.")
+    parser.add_argument("--verify-timeframes", action="store_true",
+                        help="Haftalık/aylık barların artımlı güncellemesini baştan resample ile karşılaştır.")
+    parser.add_argument("--rebuild-snapshot", action="store_true",
+                        help="Cache snapshot'ını DB'den yeniden oluştur (snapshot eskidiyse).")
+    parser.add_argument("--scan", action="store_true", help="Web arayüzü olmadan tara ve çık (gece taraması).")
+    parser.add_argument("--universe", action="append", default=None,
+                        help="--scan için sembol listesi CSV'si (birden çok verilebilir; varsayılan hisseler.csv).")
+    parser.add_argument("--as-of", default=None,
+                        help="--scan / --verify-panel için geçmiş tarih (YYYY-MM-DD): sadece o güne kadarki barlar.")
+    parser.add_argument("--signal-changes", action="store_true",
+                        help="Son iki tarama günü arasındaki sinyal değişikliklerini göster ve çık.")
+    parser.add_argument("--backfill-history", default=0, type=int, metavar="DAYS",
+                        help="Son DAYS işlem gününün sinyal geçmişini as_of indeksinden doldur ve çık.")
+    parser.add_argument("--scan-output", default=None, help="--scan sonuçlarının yazılacağı CSV dosyası.")
+    parser.add_argument("--scan-backend", choices=SCAN_BACKENDS, default=None,
+                        help="Tarama arka ucu (varsayılan: --workers > 1 ise process, değilse serial).")
+    parser.add_argument("--workers", default=None, type=int, help="Tarama worker sayısı.")
+    parser.add_argument("--backtest", action="store_true", help="V2 sinyallerini geçmiş veride test et ve çık.")
+    parser.add_argument("--bt-years", default=BACKTEST_YEARS, type=float, help="Backtest süresi (yıl).")
+    parser.add_argument("--bt-signals", default="strong", help="Test edilecek sinyaller: strong,medium")
+    parser.add_argument("--bt-target-r", default=BACKTEST_TARGET_R, type=float, help="Hedef (R katı, 0: hedef yok).")
+    parser.add_argument("--bt-max-hold", default=BACKTEST_MAX_HOLD, type=int, help="Zaman stopu (bar).")
+    parser.add_argument("--bt-trades-out", default=None, help="İşlem listesinin yazılacağı CSV dosyası.")
+    parser.add_argument("--optimize", action="store_true",
+                        help="Sinyal eşiklerini parametre taramasıyla optimize et (--bt-* ayarlarıyla).")
+    parser.add_argument("--opt-samples", default=0, type=int, help="Random search örnek sayısı (0: tüm grid).")
+    parser.add_argument("--opt-workers", default=os.cpu_count() or 1, type=int, help="Optimizasyon process sayısı.")
+    parser.add_argument("--opt-rank-by", choices=RANK_METRICS, default="avg_r", help="Sıralama ölçütü.")
+    parser.add_argument("--opt-grid", default=None, help="Parametre gridi JSON dosyası (varsayılan: DEFAULT_GRID).")
+    parser.add_argument("--opt-out", default="optimizer_results.csv", help="Sonuç tablosu CSV dosyası.")
+    parser.add_argument("--screen", action="append", default=None, metavar="AD|DOSYA",
+                        help="Kayıtlı tarama veya kural dosyasıyla tara ve çık (tekrarlanabilir; tümü tek geçişte).")
+    parser.add_argument("--verify-rules", action="store_true",
+                        help="Yerleşik V2 kural setini (screener_rules) panel motoruyla karşılaştır.")
+    parser.add_argument("--cache-role", choices=CACHE_ROLES, default=CACHE_ROLE,
+                        help="local: kendi cache'i | loader: cache'i yükle/güncelle ve paylaşılan klasöre yayınla | "
+                             "worker: paylaşılan cache'i salt okunur eşle (ortam: SWING_CACHE_ROLE).")
+    parser.add_argument("--shared-cache", default=SHARED_CACHE_DIR,
+                        help="loader/worker rolleri için paylaşılan cache klasörü (ör. /dev/shm/swing; ortam: SWING_SHARED_CACHE).")
+    parser.add_argument("--cache-memory", action="store_true",
+                        help="Cache'i yükle, bir tarama yap ve dizi / tampon / RSS bellek raporunu yazdır.")
+    parser.add_argument("--profile-requests", action="store_true",
+                        help="İstek bazlı profili aç: ?profile=1 ile gelen isteklerin en yavaş aşama/sembolleri loglanır.")
     parser.add_argument("--host", default="0.0.0.0")
     parser.add_argument("--port", default=5000, type=int)
     args = parser.parse_args()
 
+    DATA_PROVIDER, DATA_DIR, FETCH_WORKERS = args.provider, args.data_dir, args.fetch_workers
+    REQUEST_PROFILING = REQUEST_PROFILING or args.profile_requests
+    CACHE_ROLE, SHARED_CACHE_DIR = args.cache_role, args.shared_cache
+    if args.workers or args.scan_backend:
+        workers = args.workers or SCAN_WORKERS
+        configure_scan_executor(args.scan_backend or ("process" if workers > 1 else "serial"), workers)
     init_db()
-    load_all_data_to_cache() # Uygulama başlarken cache'i doldur
+    if args.rebuild_snapshot:
+        rebuild_snapshot()
+        raise SystemExit(0)
+    if args.backtest:
+        cli_backtest(args.bt_years, [s for s in args.bt_signals.split(",") if s], args.bt_target_r or None,
+                     args.bt_max_hold, args.bt_trades_out)
+        raise SystemExit(0)
+    if args.backfill_history:
+        backfill_signal_history(args.backfill_history)
+        raise SystemExit(0)
+    if args.signal_changes:
+        changes = get_signal_changes()
+        logger.info(f"Sinyal değişiklikleri {changes['previous']} -> {changes['date']}")
+        logger.info(f"  Yeni güçlü: {', '.join(changes['new_strong']) or '-'}")
+        for key in ("dropped", "upgrades", "downgrades"):
+            for c in changes[key]:
+                logger.info(f"  {key}: {c['symbol']}: {c['from']} -> {c['to']}")
+        raise SystemExit(0)
+    if args.optimize:
+        cli_optimize(args.bt_years, [s for s in args.bt_signals.split(",") if s], args.bt_target_r or None,
+                     args.bt_max_hold, samples=args.opt_samples, workers=args.opt_workers,
+                     output=args.opt_out, rank_by=args.opt_rank_by, grid_file=args.opt_grid)
+        raise SystemExit(0)
+    universes = args.universe or [SYMBOLS_CSV]
+    if args.scan:
+        # Tüm evrenlerin birleşimi tek seferde yüklenir (varsayılan liste ve endeks dahil: snapshot daralmasın)
+        load_all_data_to_cache(syms=sorted({s for u in universes for s in load_symbols_from_csv(u)} | set(data_symbols())))
+        cli_scan(universes, args.scan_output, as_of=args.as_of)
+        SCAN_EXECUTOR.shutdown()
+        raise SystemExit(0)
+    load_all_data_to_cache() # Uygulama başlarken cache'i doldur (güncel snapshot varsa mmap ile)
 
     if args.bootstrap:
         cli_bootstrap_all()
@@ -737,5 +1910,37 @@ if __name__ == "__main__":
     if args.update:
         cli_update_all()
         raise SystemExit(0)
+    if args.verify_panel:
+        # as_of indeksi daha uzun geçmişle ısındığından EWM farkları için tolerans gevşetilir
+        raise SystemExit(1 if verify_panel_engine(rtol=1e-6 if args.as_of else 1e-9, as_of=args.as_of) else 0)
+    if args.verify_rules:
+        raise SystemExit(1 if verify_screen_rules() else 0)
+    if args.screen:
+        try:
+            cli_screens(args.screen)
+        except RuleError as e:
+            logger.error(f"Tarama kuralı hatası: {e}")
+            raise SystemExit(1)
+        raise SystemExit(0)
+    if args.verify_incremental:
+        diffs = verify_incremental(DATA_CACHE, load_symbols_from_csv(), slope_period=MA_SLOPE_PERIOD,
+                                   volume_z_threshold=VOLUME_ZSCORE_THRESHOLD)
+        worst = max(diffs.values(), default=0.0)
+        logger.info(f"Artımlı doğrulama: {len(diffs)} sembol, en büyük bağıl fark {worst:.3g}")
+        raise SystemExit(1 if worst > 1e-6 else 0)
+    if args.verify_timeframes:
+        mismatches = verify_timeframes(DATA_CACHE, load_symbols_from_csv())
+        logger.info(f"Zaman dilimi doğrulama: {len(DATA_CACHE)} sembol, uyuşmazlıklar {mismatches}")
+        raise SystemExit(1 if any(mismatches.values()) else 0)
+    if args.cache_memory:
+        scan_universe(load_symbols_from_csv(), DEFAULT_RISK_PER_TRADE, DEFAULT_PORTFOLIO_SIZE) # tamponlar ayrılsın
+        report = cache_memory_report()
+        for name, arr in report["arrays"].items():
+            logger.info(f"  {name:<9} {arr['dtype']:<8} {arr['bytes'] / 2**20:9.2f} MB")
+        logger.info(f"Cache: {report['symbols']} sembol, {report['bars']} bar, {report['dates']} tarih | "
+                    f"{report['total_bytes'] / 2**20:.2f} MB ({report['bytes_per_bar']} bayt/bar; DataFrame düzeninde "
+                    f"~{report['frame_layout_bytes'] / 2**20:.2f} MB) | tamponlar {report['scratch_bytes'] / 2**20:.2f} MB | "
+                    f"RSS {(report['rss_bytes'] or 0) / 2**20:.1f} MB")
+        raise SystemExit(0)
         
     app.run(host=args.host, port=args.port, debug=True, use_reloader=False)
\ No newline at end of file
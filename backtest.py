@@ -0,0 +1,287 @@
+# backtest.py
+
+"""
+V2 Pullback/Reversal sinyalleri için vektörel geçmiş testi (backtest).
+
+Motoru gün gün çalıştırmak yerine:
+1. Tüm sembollerin geçmişi tek panelde (panel_engine.build_panel) dizilir ve göstergeler bir kez hesaplanır.
+2. signal_masks() aynı giriş kurallarını her sembolün her barına aynı anda uygular.
+3. Her aday giriş için sonraki max_hold barlık pencere (giriş x bar) matrisi olarak çıkarılır;
+   stop / hedef / zaman stopu ilk tetiklenme indeksi argmax ile bulunur.
+4. Sembol başına tek pozisyon kuralı, çıkışı hesaplanmış adaylar üzerinde tek geçişle uygulanır.
+
+Göstergeler (prepare_backtest) ve simülasyon (simulate) ayrıdır: parametre taraması (optimizer.py)
+pahalı gösterge dizilerini bir kez hesaplayıp her parametre kombinasyonunda yeniden kullanır.
+
+Varsayımlar:
+* Giriş sinyal barının kapanışından yapılır (sinyal kapanışta hesaplanır).
+* Stop swing_signal_engine_v2 ile aynıdır: kapanış - ATR * get_dynamic_atr_multiplier(ATR%).
+  Lot da aynı kurala göre portfolio_size * risk_per_trade üzerinden hesaplanır (bileşik getiri yok,
+  eşzamanlı pozisyonlar için nakit sınırı yok).
+* Açılış fiyatı tutulmadığından boşluklu barlarda dolum yaklaşıktır: stop min(stop, high),
+  hedef max(hedef, low) ile dolar. Aynı barda hem stop hem hedef görülürse stop önce sayılır.
+* Göstergeler tüm yüklenen geçmiş üzerinden hesaplanır; canlı motor son CACHE_WINDOW barı kullandığı
+  için EWM tabanlı değerler çok küçük farklar gösterebilir.
+"""
+
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from panel_engine import MIN_BARS, build_panel, compute_indicators, dynamic_atr_multiplier, shift, signal_masks
+
+SIGNAL_STRONG, SIGNAL_MEDIUM = "strong", "medium"
+EXIT_STOP, EXIT_TARGET, EXIT_TIME, EXIT_END = "stop", "target", "time", "end"
+MIN_RISK_PER_LOT = 0.01  # position_size ile aynı
+
+# Simülasyonun ihtiyaç duyduğu gösterge dizileri (optimizer worker'larına sadece bunlar gönderilir)
+INDICATOR_KEYS = ("ma20", "ma50", "ma200", "rsi", "macd_hist", "volume_zscore", "ma20_slope", "atr", "atr_percent")
+
+TRADE_COLUMNS = ["symbol", "signal", "entry_date", "entry_price", "stop_loss", "target", "exit_date",
+                 "exit_price", "exit_reason", "bars_held", "lot", "pnl", "r_multiple", "return_pct"]
+
+
+@dataclass
+class BacktestConfig:
+    risk_per_trade: float = 0.025
+    portfolio_size: float = 50000.0
+    signals: Tuple[str, ...] = (SIGNAL_STRONG,)  # strong ve/veya medium
+    target_r: Optional[float] = 2.0  # hedef = giriş + target_r * (giriş - stop); None: hedef yok
+    max_hold: int = 20               # zaman stopu (bar)
+    start: Optional[str] = None      # bu tarihten önceki sinyaller alınmaz (önceki barlar ısınma için kullanılır)
+    volume_z_threshold: float = 1.0
+    slope_period: int = 5
+    pullback_band: float = 0.02      # fiyat MA20'nin ±%2 bandında
+    rsi_max: float = 55.0            # RSI dönüşü bu seviyenin altında aranır
+    atr_low_band: float = 2.0        # ATR% < low_band: 2.5x stop
+    atr_high_band: float = 5.0       # ATR% > high_band: 1.0x stop
+    min_bars: int = MIN_BARS
+
+
+@dataclass
+class BacktestData:
+    """Parametreden bağımsız panel dizileri ve göstergeler (prepare_backtest çıktısı)."""
+    symbols: List[str]
+    close: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    dates: np.ndarray
+    lengths: np.ndarray
+    ind: Dict[str, np.ndarray]
+    slope_period: int = 5
+
+    def indicators(self, slope_period: int) -> Dict[str, np.ndarray]:
+        """Farklı eğim periyodu istenirse sadece ma20_slope yeniden hesaplanır."""
+        if slope_period == self.slope_period:
+            return self.ind
+        ind = dict(self.ind)
+        ind['ma20_slope'] = ind['ma20'] - shift(ind['ma20'], slope_period)
+        return ind
+
+
+@dataclass
+class BacktestResult:
+    config: BacktestConfig
+    trades: pd.DataFrame
+    equity: pd.Series
+    stats: Dict[str, Any] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    def to_dict(self, max_trades: int = 500) -> Dict[str, Any]:
+        """JSON'a uygun özet (son max_trades işlem ve aylık özsermaye eğrisi)."""
+        trades = self.trades.tail(max_trades).copy()
+        for c in ("entry_date", "exit_date"):
+            trades[c] = trades[c].dt.strftime("%Y-%m-%d")
+        monthly = self.equity.resample("ME").last() if len(self.equity) else self.equity
+        return {
+            "config": asdict(self.config),
+            "stats": self.stats,
+            "seconds": round(self.seconds, 3),
+            "equity": [{"date": d.strftime("%Y-%m-%d"), "equity": round(float(v), 2)} for d, v in monthly.items()],
+            "trades": trades.replace({np.nan: None}).to_dict(orient="records"),
+        }
+
+
+def _first_hit(hit: np.ndarray) -> np.ndarray:
+    """Her satırda ilk True'nun indeksi; hiç yoksa sütun sayısı."""
+    return np.where(hit.any(axis=1), hit.argmax(axis=1), hit.shape[1])
+
+
+def _select_non_overlapping(j: np.ndarray, t: np.ndarray, exit_t: np.ndarray) -> np.ndarray:
+    """Sembol başına tek pozisyon: adaylar (sembol, bar) sırasında, önceki işlem kapanmadan gelen giriş atlanır."""
+    order = np.lexsort((t, j))
+    keep = np.zeros(len(t), dtype=bool)
+    last_sym, busy_until = -1, -1
+    for i in order:
+        if j[i] != last_sym:
+            last_sym, busy_until = j[i], -1
+        if t[i] > busy_until:
+            keep[i] = True
+            busy_until = exit_t[i]
+    return keep
+
+
+def prepare_backtest(frames: Dict[str, pd.DataFrame], symbols: List[str], slope_period: int = 5) -> BacktestData:
+    """frames: sembol -> date indeksli close/high/low/volume DataFrame (tam veya pencereli geçmiş)."""
+    panel = build_panel(frames, symbols)
+    # Sadece simülasyonun kullandığı göstergeler tutulur; ara diziler (EMA, TR, hacim ortalaması) hemen bırakılır
+    ind = compute_indicators(panel, slope_period=slope_period, outputs=INDICATOR_KEYS) if panel.close.shape[0] else {}
+    return BacktestData(panel.symbols, panel.close, panel.high, panel.low, panel.dates, panel.lengths,
+                        ind, slope_period)
+
+
+def run_backtest(frames: Dict[str, pd.DataFrame], symbols: List[str],
+                 config: Optional[BacktestConfig] = None) -> BacktestResult:
+    config = config or BacktestConfig()
+    t0 = time.perf_counter()
+    result = simulate(prepare_backtest(frames, symbols, config.slope_period), config)
+    result.seconds = time.perf_counter() - t0
+    return result
+
+
+def simulate(data: BacktestData, config: BacktestConfig) -> BacktestResult:
+    """Hazır göstergeler üzerinde giriş kurallarını ve çıkışları simüle eder."""
+    t0 = time.perf_counter()
+    close, high, low = data.close, data.high, data.low
+    T = close.shape[0]
+    if T == 0:
+        empty = pd.DataFrame(columns=TRADE_COLUMNS)
+        return BacktestResult(config, empty, pd.Series(dtype=float),
+                              summarize(empty, pd.Series(dtype=float), config), time.perf_counter() - t0)
+
+    ind = data.indicators(config.slope_period)
+    masks = signal_masks(close, ind, volume_z_threshold=config.volume_z_threshold,
+                         pullback_band=config.pullback_band, rsi_max=config.rsi_max)
+    strong = masks['is_strong']
+    medium = masks['is_medium'] & ~strong  # canlı motordaki durum önceliği
+
+    entry_mask = np.zeros_like(strong)
+    if SIGNAL_STRONG in config.signals:
+        entry_mask |= strong
+    if SIGNAL_MEDIUM in config.signals:
+        entry_mask |= medium
+    # Canlı motor en az min_bars bar ister; sağa hizalı panelde sembolün ilk barı T - lengths
+    bars_seen = np.arange(1, T + 1)[:, None] - (T - data.lengths)[None, :]
+    entry_mask &= bars_seen >= config.min_bars
+    if config.start:
+        entry_mask &= data.dates >= np.datetime64(pd.Timestamp(config.start))
+    entry_mask[-1] = False  # son barda giriş yapılırsa çıkış barı yok
+    with np.errstate(invalid='ignore'):
+        entry_mask &= ind['atr'] > 0
+
+    t, j = np.nonzero(entry_mask)
+    entry = close[t, j]
+    multiplier = dynamic_atr_multiplier(ind['atr_percent'][t, j], config.atr_low_band, config.atr_high_band)
+    stop = np.round(entry - multiplier * ind['atr'][t, j], 2)
+    risk_ps = entry - stop
+    risk_amount = config.portfolio_size * config.risk_per_trade
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lot = np.where(risk_ps > MIN_RISK_PER_LOT, np.floor(risk_amount / risk_ps), 0)
+    ok = lot > 0
+    t, j, entry, stop, risk_ps, lot = t[ok], j[ok], entry[ok], stop[ok], risk_ps[ok], lot[ok]
+    target = entry + config.target_r * risk_ps if config.target_r else np.full(len(t), np.inf)
+
+    # İleri pencere matrisleri (giriş x max_hold); veri sonunu aşan hücreler NaN
+    H = max(1, int(config.max_hold))
+    rows = t[:, None] + np.arange(1, H + 1)[None, :]
+    inside = rows < T
+    rows = np.minimum(rows, T - 1)
+    cols = j[:, None]
+    fwd_low = np.where(inside, low[rows, cols], np.nan)
+    fwd_high = np.where(inside, high[rows, cols], np.nan)
+    fwd_close = np.where(inside, close[rows, cols], np.nan)
+
+    with np.errstate(invalid='ignore'):
+        k_stop = _first_hit(fwd_low <= stop[:, None])
+        k_target = _first_hit(fwd_high >= target[:, None])
+    available = inside.sum(axis=1)  # en az 1 (son barda giriş yok)
+    k_last = available - 1
+
+    is_stop = (k_stop <= k_target) & (k_stop < H)
+    is_target = ~is_stop & (k_target < H)
+    k_exit = np.where(is_stop, k_stop, np.where(is_target, k_target, k_last))
+    idx = np.arange(len(t))
+    exit_price = np.where(is_stop, np.minimum(stop, fwd_high[idx, k_exit]),
+                          np.where(is_target, np.maximum(target, fwd_low[idx, k_exit]), fwd_close[idx, k_exit]))
+    reason = np.where(is_stop, EXIT_STOP, np.where(is_target, EXIT_TARGET,
+                                                   np.where(available == H, EXIT_TIME, EXIT_END)))
+    exit_t = t + 1 + k_exit
+
+    keep = _select_non_overlapping(j, t, exit_t)
+    t, j, exit_t = t[keep], j[keep], exit_t[keep]
+    entry, stop, target, lot = entry[keep], stop[keep], target[keep], lot[keep]
+    exit_price, reason = exit_price[keep], reason[keep]
+
+    pnl = lot * (exit_price - entry)
+    trades = pd.DataFrame({
+        "symbol": np.asarray(data.symbols, dtype=object)[j],
+        "signal": np.where(strong[t, j], SIGNAL_STRONG, SIGNAL_MEDIUM),
+        "entry_date": pd.to_datetime(data.dates[t, j]),
+        "entry_price": entry,
+        "stop_loss": stop,
+        "target": np.where(np.isinf(target), np.nan, target),
+        "exit_date": pd.to_datetime(data.dates[exit_t, j]),
+        "exit_price": exit_price,
+        "exit_reason": reason,
+        "bars_held": exit_t - t,
+        "lot": lot.astype(np.int64),
+        "pnl": pnl,
+        "r_multiple": (exit_price - entry) / (entry - stop),
+        "return_pct": (exit_price / entry - 1) * 100,
+    }).sort_values(["entry_date", "symbol"], kind="stable").reset_index(drop=True)
+
+    # Özsermaye eğrisi: kapanan işlemlerin kârı çıkış gününe yazılır (takvim = paneldeki tüm işlem günleri)
+    days = np.unique(data.dates[~np.isnat(data.dates)])
+    if config.start:
+        days = days[days >= np.datetime64(pd.Timestamp(config.start))]
+    daily_pnl = trades.groupby("exit_date")["pnl"].sum()
+    equity = config.portfolio_size + daily_pnl.reindex(pd.DatetimeIndex(days), fill_value=0.0).cumsum()
+    equity.index.name = "date"
+
+    stats = summarize(trades, equity, config)
+    return BacktestResult(config, trades, equity, stats, time.perf_counter() - t0)
+
+
+def _trade_stats(trades: pd.DataFrame) -> Dict[str, Any]:
+    n = len(trades)
+    if n == 0:
+        return {"trades": 0}
+    wins = trades["pnl"] > 0
+    gross_win = float(trades.loc[wins, "pnl"].sum())
+    gross_loss = float(-trades.loc[~wins, "pnl"].sum())
+    return {
+        "trades": n,
+        "win_rate": round(float(wins.mean()) * 100, 2),
+        "avg_r": round(float(trades["r_multiple"].mean()), 3),
+        "avg_return_pct": round(float(trades["return_pct"].mean()), 3),
+        "profit_factor": round(gross_win / gross_loss, 3) if gross_loss > 0 else None,
+        "total_pnl": round(float(trades["pnl"].sum()), 2),
+        "avg_bars_held": round(float(trades["bars_held"].mean()), 2),
+    }
+
+
+def summarize(trades: pd.DataFrame, equity: pd.Series, config: BacktestConfig) -> Dict[str, Any]:
+    """İşlem ve özsermaye eğrisi istatistikleri."""
+    stats = _trade_stats(trades)
+    stats["exits"] = {str(k): int(v) for k, v in trades["exit_reason"].value_counts().items()} if len(trades) else {}
+    stats["by_signal"] = {str(k): _trade_stats(g) for k, g in trades.groupby("signal")} if len(trades) else {}
+    if len(equity) > 1:
+        peak = equity.cummax()
+        drawdown = (equity / peak - 1) * 100
+        daily = equity.pct_change().dropna()
+        years = (equity.index[-1] - equity.index[0]).days / 365.25
+        final = float(equity.iloc[-1])
+        stats.update({
+            "start": equity.index[0].strftime("%Y-%m-%d"),
+            "end": equity.index[-1].strftime("%Y-%m-%d"),
+            "final_equity": round(final, 2),
+            "total_return_pct": round((final / config.portfolio_size - 1) * 100, 2),
+            "cagr_pct": round(((final / config.portfolio_size) ** (1 / years) - 1) * 100, 2)
+            if years > 0 and final > 0 else None,
+            "max_drawdown_pct": round(float(drawdown.min()), 2),
+            "sharpe": round(float(daily.mean() / daily.std() * np.sqrt(252)), 3) if daily.std() > 0 else None,
+        })
+    return stats
@@ -0,0 +1,513 @@
+# benchmarks.py
+
+"""
+Çevrimdışı benchmark paketi (yfinance / ağ gerekmez).
+
+* Sentetik evren: fetch_pipeline.FakeProvider ile deterministik OHLCV üretilir ve PriceWriter ile
+  doğrudan prices.db'ye yazılır (aynı seed + sembol + bar sayısı her zaman aynı veriyi verir).
+* Ölçülenler: DB yazma yolu, load_all_data_to_cache (DB'den ve snapshot'tan), indicators_v2
+  göstergeleri, swing_signal_engine_v2, panel taraması ve Flask test istemcisi üzerinden /scan ve /api/scan.
+* --kernels: indicator_kernels (NumPy) ile önceki pandas göstergelerinin eşitlik kontrolü ve kernel başına
+  pandas / NumPy mikro benchmark'ları (1-D sembol serisi ve 2-D panel, hızlanma oranıyla).
+* Çıktı makine tarafından okunabilir JSON'dur; --compare ile önceki bir çalıştırmayla medyan süreler
+  karşılaştırılır (--fail-on-regression CI için çıkış kodu döner).
+
+Kullanım:
+    python benchmarks.py --symbols 300 --bars 500 --out bench.json
+    python benchmarks.py --symbols 1000 --bars 1000 --compare bench.json --fail-on-regression
+    python benchmarks.py --kernels --sample 100 --bars 1000
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import app15
+import indicator_kernels as kernels
+from fetch_pipeline import FakeProvider
+from indicators_v2 import calculate_atr, calculate_ma_slope, calculate_macd, calculate_rsi, calculate_volume_zscore
+from price_store import PriceWriter, WriteStats
+
+logger = logging.getLogger('SwingScanner')
+
+BENCH_FORMAT = 1
+BENCH_END = "2026-01-01"  # Sabit bitiş: sonuçlar çalıştırma gününden bağımsız
+DEFAULT_SYMBOLS = 300
+DEFAULT_BARS = 500
+DEFAULT_SAMPLE = 100  # Sembol başına benchmark'larda (göstergeler, V2 motoru) kullanılan sembol sayısı
+
+
+def bench_symbols(count: int) -> List[str]:
+    return [f"B{i:05d}" for i in range(count)]
+
+
+def generate_universe(db_file: str, symbols: List[str], bars: int, seed: int = 0,
+                      batch_rows: int = app15.WRITE_BATCH_ROWS) -> WriteStats:
+    """Her sembol için BENCH_END'e kadar son `bars` iş gününü üretip PriceWriter ile yazar."""
+    provider = FakeProvider(seed=seed)
+    writer = PriceWriter(db_file)
+    try:
+        for s in symbols:
+            df = provider.series(f"{s}.IS", BENCH_END)
+            if len(df) < bars:
+                raise ValueError(f"En fazla {len(df)} bar üretilebilir (istenen: {bars})")
+            writer.add(f"{s}.IS", df.tail(bars))  # prices tablosunda semboller .IS ekiyle tutulur
+            if writer.pending_rows >= batch_rows:
+                writer.flush()
+        writer.flush()
+    finally:
+        writer.close()
+    return writer.totals
+
+
+@dataclass
+class BenchResult:
+    name: str
+    times: List[float]
+    units: int = 1  # bir ölçümde işlenen birim (sembol, satır, istek) sayısı
+    unit: str = "çağrı"
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        median = statistics.median(self.times)
+        out = {
+            "median_s": median,
+            "min_s": min(self.times),
+            "mean_s": statistics.fmean(self.times),
+            "stdev_s": statistics.stdev(self.times) if len(self.times) > 1 else 0.0,
+            "repeat": len(self.times),
+            "units": self.units,
+            "unit": self.unit,
+            "per_unit_us": median / self.units * 1e6 if self.units else None,
+        }
+        out.update(self.extra)
+        return out
+
+
+def measure(fn: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None,
+            warmup: int = 1) -> List[float]:
+    """fn'i repeat kez ölçer (setup ölçüme dahil değildir). setup bir değer dönerse fn'e verilir."""
+    times = []
+    for i in range(warmup + repeat):
+        arg = setup() if setup is not None else None
+        t0 = time.perf_counter()
+        fn(arg) if setup is not None else fn()
+        elapsed = time.perf_counter() - t0
+        if i >= warmup:
+            times.append(elapsed)
+    return times
+
+
+def reset_scan_caches():
+    """Soğuk tarama: gösterge/sonuç önbellekleri ve artımlı durumlar boşaltılır."""
+    app15.SIGNAL_CACHE.clear()
+    app15.STATE_STORE.drop_all()
+    app15.SCAN_ROWS.clear()
+    app15._SCREEN_DATA = None  # kural taramalarının panel + gösterge grafiği
+
+
+def _with_ma20(frames: List[pd.DataFrame]) -> List[pd.DataFrame]:
+    out = [df.copy() for df in frames]
+    for df in out:
+        df['ma20'] = df['close'].rolling(window=20).mean()
+    return out
+
+
+def _indicator_benchmarks(frames: List[pd.DataFrame], repeat: int) -> List[BenchResult]:
+    cases = [
+        ("indicator_rsi", calculate_rsi, None),
+        ("indicator_macd", calculate_macd, None),
+        ("indicator_atr", calculate_atr, None),
+        ("indicator_volume_zscore", calculate_volume_zscore, None),
+        ("indicator_ma_slope", lambda df: calculate_ma_slope(df, ma_period=20, slope_period=app15.MA_SLOPE_PERIOD),
+         lambda: _with_ma20(frames)),
+    ]
+    results = []
+    for name, fn, setup in cases:
+        times = measure(lambda batch: [fn(df) for df in batch], repeat,
+                        setup=setup or (lambda: [df.copy() for df in frames]))
+        results.append(BenchResult(name, times, len(frames), "sembol"))
+    return results
+
+
+def run_suite(symbols: int = DEFAULT_SYMBOLS, bars: int = DEFAULT_BARS, seed: int = 0, repeat: int = 5,
+              sample: int = DEFAULT_SAMPLE, reuse: bool = False) -> Dict[str, Any]:
+    """Tüm benchmark'ları çalışma klasöründe (cwd) çalıştırır; JSON'a yazılabilir sonuç sözlüğü döner."""
+    syms = bench_symbols(symbols)
+    results: List[BenchResult] = []
+
+    if not reuse:
+        for path in (app15.DB_FILE, app15.DB_FILE + "-wal", app15.DB_FILE + "-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(app15.SNAPSHOT_DIR, ignore_errors=True)
+    with open(app15.SYMBOLS_CSV, "w", encoding="utf-8") as f:
+        f.write("\n".join(syms) + "\n")
+    app15.init_db()
+
+    # 1) DB yazma yolu: ilk ekleme ve değişmeyen son barların tekrar yazılması (günlük update deseni)
+    if not reuse:
+        t0 = time.perf_counter()
+        stats = generate_universe(app15.DB_FILE, syms, bars, seed)
+        results.append(BenchResult("db_write_insert", [stats.seconds], stats.attempted, "satır",
+                                   {"rows_per_sec": stats.rows_per_sec,
+                                    "generate_total_s": time.perf_counter() - t0}))
+    provider = FakeProvider(seed=seed)
+    tails = {s: provider.series(f"{s}.IS", BENCH_END).tail(5) for s in syms}
+
+    def upsert_unchanged():
+        with PriceWriter(app15.DB_FILE) as writer:
+            for s, df in tails.items():
+                writer.add(f"{s}.IS", df)
+    results.append(BenchResult("db_write_upsert_unchanged", measure(upsert_unchanged, repeat),
+                               5 * len(syms), "satır"))
+
+    # 2) Cache yükleme: pencere sorgusu, DB'den tam yükleme (+ snapshot yazma) ve snapshot eşleme
+    results.append(BenchResult("load_windows_db", measure(lambda: app15.load_windows_from_db(syms), repeat),
+                               len(syms), "sembol"))
+    results.append(BenchResult("load_cache_from_db",
+                               measure(lambda: app15.load_all_data_to_cache(use_snapshot=False), repeat),
+                               len(syms), "sembol"))
+    results.append(BenchResult("load_cache_from_snapshot", measure(app15.load_all_data_to_cache, repeat),
+                               len(syms), "sembol"))
+
+    # 3) Göstergeler ve V2 motoru (sembol başına, tam geçmiş üzerinde)
+    picked = syms[:sample]
+    frames = [app15.get_historical_data_from_db(s, bars=None) for s in picked]
+    frames = [df for df in frames if df is not None]
+    results.extend(_indicator_benchmarks(frames, repeat))
+    cache, generation = app15.get_cache_snapshot()
+    risk, portfolio = app15.DEFAULT_RISK_PER_TRADE, app15.DEFAULT_PORTFOLIO_SIZE
+    results.append(BenchResult(
+        "swing_signal_engine_v2",
+        measure(lambda: [app15.swing_signal_engine_v2(s, risk, portfolio, cache) for s in picked], repeat),
+        len(picked), "sembol"))
+
+    # 4) Panel taraması: soğuk (tüm göstergeler hesaplanır) ve sıcak (önbellek)
+    results.append(BenchResult("scan_universe_cold",
+                               measure(lambda _: app15.scan_universe(syms, risk, portfolio, cache, generation),
+                                       repeat, setup=reset_scan_caches),
+                               len(syms), "sembol"))
+    results.append(BenchResult("scan_universe_warm",
+                               measure(lambda: app15.scan_universe(syms, risk, portfolio, cache, generation), repeat),
+                               len(syms), "sembol"))
+
+    # Kural taramaları (soğuk): sadece kuralların kullandığı göstergeler hesaplanır
+    trend = app15.compile_screen("match = close > ma20 > ma50 > ma200", "trend")
+    for name, screens in (("screen_trend_cold", [trend]), ("screen_v2_cold", [app15.get_screen(app15.BUILTIN_SCREEN)])):
+        results.append(BenchResult(name, measure(lambda _, screens=screens: app15.run_screen_set(screens, syms, cache, generation),
+                                                 repeat, setup=reset_scan_caches),
+                                   len(syms), "sembol"))
+
+    # 5) HTTP: Flask test istemcisi üzerinden sayfa ve API
+    client = app15.app.test_client()
+
+    def get(url, headers=None, expect=200):
+        response = client.get(url, headers=headers)
+        if response.status_code != expect:
+            raise RuntimeError(f"{url}: HTTP {response.status_code}")
+        return response
+    results.append(BenchResult("http_scan_page", measure(lambda: get("/scan"), repeat), 1, "istek"))
+    results.append(BenchResult("http_api_scan_cold",
+                               measure(lambda _: get("/api/scan?limit=5000"), repeat, setup=reset_scan_caches),
+                               len(syms), "sembol"))
+    results.append(BenchResult("http_api_scan_warm",
+                               measure(lambda: get("/api/scan?sort_by=volume_zscore&limit=100"), repeat), 1, "istek"))
+    etag = get("/api/scan?limit=100").headers["ETag"]
+    results.append(BenchResult("http_api_scan_304",
+                               measure(lambda: get("/api/scan?limit=100", {"If-None-Match": etag}, 304), repeat),
+                               1, "istek"))
+
+    memory = app15.cache_memory_report()
+    return {
+        "format": BENCH_FORMAT,
+        "meta": environment_meta(symbols=symbols, bars=bars, seed=seed, repeat=repeat, sample=len(picked)),
+        "results": {r.name: r.to_dict() for r in results},
+        "memory": {k: memory[k] for k in ("bars", "total_bytes", "bytes_per_bar", "scratch_bytes", "rss_bytes")},
+    }
+
+
+# ---------- GÖSTERGE KERNELLERİ: pandas referansı, eşitlik kontrolü, mikro benchmark'lar ----------
+
+KERNEL_RTOL = 1e-9  # kernel / pandas eşitlik toleransı (göreli; |değer| < 1 için mutlak)
+
+
+def _pandas_rsi(df, window=14):
+    delta = df['close'].diff()
+    gain = delta.where(delta > 0, 0)
+    loss = -delta.where(delta < 0, 0)
+    avg_gain = gain.ewm(com=window - 1, min_periods=window).mean()
+    avg_loss = loss.ewm(com=window - 1, min_periods=window).mean()
+    rs = (avg_gain / avg_loss).replace([np.inf, -np.inf], np.nan)
+    df['rsi'] = 100 - (100 / (1 + rs))
+    return df
+
+
+def _pandas_macd(df, fast=12, slow=26, signal=9):
+    df['ema_fast'] = df['close'].ewm(span=fast, adjust=False).mean()
+    df['ema_slow'] = df['close'].ewm(span=slow, adjust=False).mean()
+    df['macd'] = df['ema_fast'] - df['ema_slow']
+    df['macd_signal_line'] = df['macd'].ewm(span=signal, adjust=False).mean()
+    df['macd_hist'] = df['macd'] - df['macd_signal_line']
+    return df
+
+
+def _pandas_atr(df, window=14):
+    high_low = df['high'] - df['low']
+    high_close = np.abs(df['high'] - df['close'].shift(1))
+    low_close = np.abs(df['low'] - df['close'].shift(1))
+    df['tr'] = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
+    df['atr'] = df['tr'].ewm(span=window, adjust=False, min_periods=window).mean()
+    df['atr_percent'] = (df['atr'] / df['close']) * 100
+    return df
+
+
+def _pandas_volume_zscore(df, window=20):
+    df['volume_ma'] = df['volume'].rolling(window=window).mean()
+    df['volume_std'] = df['volume'].rolling(window=window).std()
+    zscore = (df['volume'] - df['volume_ma']) / df['volume_std']
+    zscore[df['volume_std'] == 0] = 0
+    df['volume_zscore'] = zscore.fillna(0)
+    return df
+
+
+def _pandas_ma_slope(df, ma_period=20, slope_period=5):
+    ma_col = f'ma{ma_period}'
+    df[f'{ma_col}_slope'] = df[ma_col] - df[ma_col].shift(slope_period)
+    return df
+
+
+# indicators_v2 fonksiyonu -> (önceki pandas sürümü, kernel sürümü, karşılaştırılan sütunlar)
+PANDAS_REFERENCE = {
+    "calculate_rsi": (_pandas_rsi, calculate_rsi, ('rsi',)),
+    "calculate_macd": (_pandas_macd, calculate_macd, ('ema_fast', 'ema_slow', 'macd', 'macd_signal_line', 'macd_hist')),
+    "calculate_atr": (_pandas_atr, calculate_atr, ('tr', 'atr', 'atr_percent')),
+    "calculate_volume_zscore": (_pandas_volume_zscore, calculate_volume_zscore, ('volume_ma', 'volume_std', 'volume_zscore')),
+    "calculate_ma_slope": (_pandas_ma_slope, calculate_ma_slope, ('ma20_slope',)),
+}
+
+
+def kernel_parity(frames: List[pd.DataFrame], rtol: float = KERNEL_RTOL) -> List[Dict[str, Any]]:
+    """indicators_v2 fonksiyonlarının (kernel) sonuçlarını önceki pandas sürümleriyle sütun sütun karşılaştırır."""
+    rows = []
+    for name, (reference, fn, columns) in PANDAS_REFERENCE.items():
+        worst, nan_mismatch = 0.0, 0
+        for df in _with_ma20(frames):
+            expected, actual = reference(df.copy()), fn(df.copy())
+            for col in columns:
+                e = expected[col].to_numpy(dtype=float)
+                a = actual[col].to_numpy(dtype=float)
+                nan_mismatch += int((np.isnan(e) != np.isnan(a)).sum())
+                both = ~np.isnan(e) & ~np.isnan(a)
+                if both.any():
+                    worst = max(worst, float((np.abs(a[both] - e[both]) / np.maximum(1.0, np.abs(e[both]))).max()))
+        rows.append({"name": name, "max_rel_diff": worst, "nan_mismatch": nan_mismatch,
+                     "ok": worst <= rtol and nan_mismatch == 0})
+    return rows
+
+
+def _kernel_benchmarks(frames: List[pd.DataFrame], repeat: int) -> List[BenchResult]:
+    """Her kernel için pandas ve NumPy sürümü: 1-D (sembol başına seri) ve 2-D (bar x sembol panel).
+    NumPy sonuçları pandas medyanını ve hızlanma oranını da taşır."""
+    bars = min(len(df) for df in frames)
+    series = [{c: df[c].astype(float) for c in ('close', 'high', 'low', 'volume')} for df in frames]
+    arrays = [{c: s.to_numpy() for c, s in cols.items()} for cols in series]
+    table = {c: pd.DataFrame({i: df[c].to_numpy(dtype=float)[-bars:] for i, df in enumerate(frames)})
+             for c in ('close', 'high', 'low', 'volume')}
+    panel = {c: t.to_numpy() for c, t in table.items()}
+
+    def pandas_tr(d):
+        prev_close = d['close'].shift(1)
+        parts = [d['high'] - d['low'], np.abs(d['high'] - prev_close), np.abs(d['low'] - prev_close)]
+        if isinstance(d['close'], pd.Series):
+            return pd.concat(parts, axis=1).max(axis=1)
+        return np.fmax(np.fmax(parts[0], parts[1]), parts[2])  # DataFrame: sütun bazında max
+
+    cases = [
+        ("ewm", lambda d: d['close'].ewm(span=26, adjust=False).mean(),
+         lambda d: kernels.ewm_mean(d['close'], 2.0 / 27)),
+        ("wilder", lambda d: d['close'].ewm(com=13, min_periods=14).mean(),
+         lambda d: kernels.wilder_mean(d['close'], 14)),
+        ("rolling_mean", lambda d: d['volume'].rolling(20).mean(), lambda d: kernels.rolling_mean(d['volume'], 20)),
+        ("rolling_std", lambda d: d['volume'].rolling(20).std(), lambda d: kernels.rolling_std(d['volume'], 20)),
+        ("true_range", pandas_tr, lambda d: kernels.true_range(d['high'], d['low'], d['close'])),
+        ("slope", lambda d: d['close'] - d['close'].shift(5), lambda d: kernels.slope(d['close'], 5)),
+    ]
+    results = []
+
+    def pair(name, pandas_fn, numpy_fn, units, unit):
+        base = measure(pandas_fn, repeat)
+        fast = measure(numpy_fn, repeat)
+        results.append(BenchResult(f"{name}_pandas", base, units, unit))
+        results.append(BenchResult(name, fast, units, unit,
+                                   {"pandas_median_s": statistics.median(base),
+                                    "speedup": statistics.median(base) / statistics.median(fast)}))
+
+    for name, pandas_fn, numpy_fn in cases:
+        pair(f"kernel_{name}_1d", lambda f=pandas_fn: [f(d) for d in series],
+             lambda f=numpy_fn: [f(d) for d in arrays], len(frames), "sembol")
+        pair(f"kernel_{name}_2d", lambda f=pandas_fn: f(table), lambda f=numpy_fn: f(panel), len(frames), "sembol")
+    # Kesitsel yüzdelik sıra (göreli güç) sadece panelde anlamlıdır: aynı bardaki semboller arasında
+    returns = table['close'].pct_change(21, fill_method=None)
+    days = np.broadcast_to(np.arange(bars)[:, np.newaxis], panel['close'].shape)
+    pair("kernel_percentile_rank_2d", lambda: returns.rank(axis=1, pct=True),
+         lambda r=returns.to_numpy(): kernels.percentile_rank(r, days), len(frames), "sembol")
+    prepared = _with_ma20(frames)
+    for name, (reference, fn, _) in PANDAS_REFERENCE.items():
+        pair(f"kernel_{name}", lambda f=reference: [f(df.copy()) for df in prepared],
+             lambda f=fn: [f(df.copy()) for df in prepared], len(frames), "sembol")
+    return results
+
+
+def kernel_suite(symbols: int = DEFAULT_SAMPLE, bars: int = DEFAULT_BARS, seed: int = 0,
+                 repeat: int = 5) -> Dict[str, Any]:
+    """Gösterge kernellerinin eşitlik kontrolü ve mikro benchmark'ları (DB gerekmez: FakeProvider serileri)."""
+    provider = FakeProvider(seed=seed)
+    frames = [provider.series(f"{s}.IS", BENCH_END).tail(bars).reset_index(drop=True) for s in bench_symbols(symbols)]
+    results = _kernel_benchmarks(frames, repeat)
+    return {
+        "format": BENCH_FORMAT,
+        "meta": environment_meta(symbols=symbols, bars=bars, seed=seed, repeat=repeat, sample=symbols, kernels=True),
+        "results": {r.name: r.to_dict() for r in results},
+        "parity": kernel_parity(frames),
+    }
+
+
+def environment_meta(**params) -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        **params,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """Ortak benchmark'ların medyan süre oranları (yeni / eski). threshold üzerindeki artış gerileme sayılır."""
+    rows = []
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None or not base.get("median_s"):
+            continue
+        ratio = cur["median_s"] / base["median_s"]
+        rows.append({"name": name, "baseline_s": base["median_s"], "current_s": cur["median_s"], "ratio": ratio,
+                     "regression": ratio > 1 + threshold})
+    return rows
+
+
+def print_report(report: Dict[str, Any], comparison: Optional[List[Dict[str, Any]]] = None):
+    meta = report["meta"]
+    print(f"Benchmark: {meta['symbols']} sembol x {meta['bars']} bar, repeat={meta['repeat']} "
+          f"(commit {meta['commit']}, Python {meta['python']}, pandas {meta['pandas']}, numpy {meta['numpy']})")
+    ratios = {c["name"]: c for c in comparison or []}
+    for name, r in report["results"].items():
+        line = f"  {name:<28} medyan {r['median_s'] * 1000:10.2f} ms"
+        if r["units"] > 1:
+            line += f"  ({r['per_unit_us']:9.1f} µs/{r['unit']})"
+        if "speedup" in r:
+            line += f"  pandas {r['pandas_median_s'] * 1000:8.2f} ms, x{r['speedup']:.1f} hızlı"
+        c = ratios.get(name)
+        if c is not None:
+            line += f"  x{c['ratio']:.2f}" + ("  << YAVAŞLADI" if c["regression"] else "")
+        print(line)
+    for p in report.get("parity", []):
+        print(f"  eşitlik {p['name']:<26} en büyük göreli fark {p['max_rel_diff']:.2e}, "
+              f"NaN farkı {p['nan_mismatch']}" + ("" if p["ok"] else "  << FARKLI"))
+    memory = report.get("memory")
+    if memory:
+        print(f"  bellek: cache {memory['total_bytes'] / 2**20:.2f} MB ({memory['bytes_per_bar']} bayt/bar), "
+              f"tamponlar {memory['scratch_bytes'] / 2**20:.2f} MB, RSS {(memory['rss_bytes'] or 0) / 2**20:.1f} MB")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Swing Scanner V2 çevrimdışı benchmark paketi")
+    parser.add_argument("--symbols", type=int, default=DEFAULT_SYMBOLS, help="Sentetik evren büyüklüğü (100-10000)")
+    parser.add_argument("--bars", type=int, default=DEFAULT_BARS, help="Sembol başına bar sayısı (300-5000)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5, help="Her benchmark'ın ölçüm sayısı (medyan raporlanır)")
+    parser.add_argument("--sample", type=int, default=DEFAULT_SAMPLE,
+                        help="Gösterge ve V2 motoru benchmark'larında kullanılan sembol sayısı")
+    parser.add_argument("--workdir", default=None,
+                        help="prices.db ve snapshot'ın oluşturulacağı klasör (varsayılan: geçici klasör)")
+    parser.add_argument("--reuse", action="store_true",
+                        help="workdir'deki mevcut sentetik DB'yi kullan (üretim ve ilk yazma ölçülmez)")
+    parser.add_argument("--out", default=None, help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--compare", default=None, metavar="JSON", help="Karşılaştırılacak önceki sonuç dosyası")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Gerileme eşiği (0.10 = %%10 yavaşlama)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Gerileme varsa çıkış kodu 1")
+    parser.add_argument("--kernels", action="store_true",
+                        help="Sadece gösterge kernelleri: pandas ile eşitlik kontrolü ve mikro benchmark'lar "
+                             "(--sample sembol, DB gerekmez; eşitlik bozuksa çıkış kodu 1)")
+    parser.add_argument("--verbose", action="store_true", help="Uygulama INFO loglarını göster")
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        logger.setLevel(logging.WARNING)
+    out = os.path.abspath(args.out) if args.out else None
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    if args.kernels:
+        report = kernel_suite(args.sample, args.bars, args.seed, args.repeat)
+    else:
+        workdir = args.workdir or tempfile.mkdtemp(prefix="swing_bench_")
+        os.makedirs(workdir, exist_ok=True)
+        if not args.reuse and os.path.exists(os.path.join(workdir, app15.DB_FILE)) and args.workdir:
+            parser.error(f"{workdir} içinde {app15.DB_FILE} zaten var; --reuse kullanın veya boş bir klasör verin")
+        cwd = os.getcwd()
+        os.chdir(workdir)  # DB_FILE / SYMBOLS_CSV / SNAPSHOT_DIR göreli yollar: hepsi çalışma klasörüne yazılır
+        try:
+            report = run_suite(args.symbols, args.bars, args.seed, args.repeat, args.sample, args.reuse)
+        finally:
+            app15.SCAN_EXECUTOR.shutdown()
+            os.chdir(cwd)
+            if not args.workdir:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+    comparison = compare(report, baseline, args.threshold) if baseline is not None else None
+    if baseline is not None:
+        base_meta = baseline.get("meta", {})
+        differs = [k for k in ("symbols", "bars", "seed", "sample") if base_meta.get(k) != report["meta"][k]]
+        if differs:
+            print(f"UYARI: karşılaştırılan çalıştırmanın parametreleri farklı ({', '.join(differs)}); "
+                  f"oranlar doğrudan karşılaştırılabilir değil.")
+    if comparison is not None:
+        report["comparison"] = {"baseline": baseline.get("meta"), "threshold": args.threshold, "rows": comparison}
+    print_report(report, comparison)
+    if out:
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Sonuçlar yazıldı: {out}")
+    if args.fail_on_regression and comparison and any(c["regression"] for c in comparison):
+        return 1
+    if not all(p["ok"] for p in report.get("parity", [])):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
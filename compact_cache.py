@@ -0,0 +1,270 @@
+# compact_cache.py
+
+"""
+RAM Cache'in kompakt, dizi tabanlı gösterimi.
+
+Sembol başına DataFrame (float64 sütunlar, int64 DatetimeIndex, nesne ek yükü) yerine tüm evren
+birkaç bitişik dizide tutulur:
+
+    axis      int64 (datetime64[ns])  tüm sembollerin paylaştığı sıralı tarih ekseni
+    offsets   int64, len = sembol + 1; i. sembolün satırları offsets[i]:offsets[i+1]
+    date_pos  uint16/uint32           her satırın axis içindeki konumu
+    close high low   float32
+    volume    en dar işaretsiz tamsayı (uint16/32/64); en büyük değer NULL hacim işaretidir.
+              Tamsayı olmayan / negatif hacim varsa float32.
+
+Bar başına ~18 bayt (DataFrame düzeninde 40 bayt + sembol başına nesne ek yükü). Fiyatlar float32'ye
+yuvarlanır (~7 anlamlı basamak); hesaplamalar yine float64 yapılır. Tüm tüketiciler aynı yuvarlanmış
+veriyi gördüğü için panel / sembol bazlı / artımlı motorlar birbiriyle birebir tutarlıdır.
+
+CompactCache salt okunur bir Mapping[str, DataFrame]'dir: eski kod yolları (sembol bazlı motor,
+doğrulama) cache[s] ile float64 DataFrame kopyası alır. Sıcak yol (panel_engine.build_panel)
+dizileri doğrudan okur. Güncellemeler stage() ile açılan StagedCache üzerinde yapılır ve build() ile
+yeni bir CompactCache olarak yayınlanır; değişmeyen sembollerin dizileri DataFrame'e çevrilmeden kopyalanır.
+"""
+
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from scan_cache import data_version, next_version
+
+PRICE_COLUMNS = ('close', 'high', 'low')
+COLUMNS = PRICE_COLUMNS + ('volume',)
+PRICE_DTYPE = np.float32
+FRAME_BYTES_PER_BAR = 8 * (len(COLUMNS) + 1)  # DataFrame düzeni: 4 float64 sütun + int64 tarih indeksi
+
+# (dates int64 ns, close, high, low, volume float64 (NaN = NULL), veri sürümü)
+Entry = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, Any]
+
+
+def quantize_prices(df: pd.DataFrame) -> pd.DataFrame:
+    """Fiyat sütunlarını cache'te saklanacak hassasiyete (float32) yuvarlar, float64 olarak döner.
+    Artımlı durumlar cache'e girecek yeni barlarla ilerlerken aynı değerleri görsün diye kullanılır."""
+    out = df.copy()
+    for c in PRICE_COLUMNS:
+        out[c] = out[c].to_numpy(dtype=np.float64, na_value=np.nan).astype(PRICE_DTYPE).astype(np.float64)
+    return out
+
+
+def _encode_volume(volume: np.ndarray) -> Tuple[np.ndarray, Optional[int]]:
+    """Hacmi en dar işaretsiz tamsayıya çevirir; dönüş (dizi, NULL işareti). Uygun değilse (float32, None)."""
+    present = volume[~np.isnan(volume)]
+    if present.size and (present.min() < 0 or not np.array_equal(present, np.floor(present))):
+        return volume.astype(np.float32), None
+    top = int(present.max()) if present.size else 0
+    for dtype in (np.uint16, np.uint32, np.uint64):
+        sentinel = int(np.iinfo(dtype).max)
+        if top < sentinel:
+            out = np.where(np.isnan(volume), sentinel, volume).astype(dtype)
+            return out, sentinel
+    return volume.astype(np.float32), None
+
+
+class CompactCache(Mapping):
+    """Salt okunur, dizi tabanlı sembol cache'i (bkz. modül açıklaması)."""
+
+    def __init__(self, symbols: List[str], offsets: np.ndarray, axis: np.ndarray, date_pos: np.ndarray,
+                 close: np.ndarray, high: np.ndarray, low: np.ndarray, volume: np.ndarray,
+                 volume_missing: Optional[int], versions: List[Any]):
+        self.symbols = symbols
+        self.offsets = offsets
+        self.axis = axis
+        self.date_pos = date_pos
+        self.close = close
+        self.high = high
+        self.low = low
+        self.volume = volume
+        self.volume_missing = volume_missing
+        self.versions = versions
+        self._pos = {s: i for i, s in enumerate(symbols)}
+
+    # ---------- Kurulum ----------
+
+    @classmethod
+    def empty(cls) -> "CompactCache":
+        return cls._assemble([], [])
+
+    @classmethod
+    def _assemble(cls, symbols: List[str], entries: List[Entry]) -> "CompactCache":
+        lengths = np.fromiter((len(e[0]) for e in entries), dtype=np.int64, count=len(entries))
+        offsets = np.zeros(len(entries) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        cat = lambda k, dtype: (np.concatenate([e[k] for e in entries]).astype(dtype, copy=False)
+                                if entries else np.empty(0, dtype=dtype))
+        dates = cat(0, np.int64)
+        axis, inverse = np.unique(dates, return_inverse=True)
+        date_pos = inverse.astype(np.uint16 if len(axis) <= np.iinfo(np.uint16).max else np.uint32)
+        volume, missing = _encode_volume(cat(4, np.float64))
+        return cls(list(symbols), offsets, axis, date_pos,
+                   cat(1, PRICE_DTYPE), cat(2, PRICE_DTYPE), cat(3, PRICE_DTYPE),
+                   volume, missing, [e[5] for e in entries])
+
+    @classmethod
+    def from_entries(cls, symbols: Sequence[str], entries: Sequence[Entry]) -> "CompactCache":
+        """Sembol başına hazır dizilerden (Entry) kurar; boş girdiler atlanır (ör. timeframes görünümleri)."""
+        kept = [(s, e) for s, e in zip(symbols, entries) if len(e[0])]
+        return cls._assemble([s for s, _ in kept], [e for _, e in kept])
+
+    @classmethod
+    def build(cls, source: Mapping, window: Optional[int] = None) -> "CompactCache":
+        """Sembol -> DataFrame eşlemesinden (veya StagedCache'ten) kurar; sembol başına son `window` bar.
+        StagedCache'te değişmemiş semboller taban cache'in dizilerinden doğrudan kopyalanır."""
+        base = source.base if isinstance(source, StagedCache) else None
+        symbols, entries = [], []
+        for s in source:
+            if base is not None and source.is_unchanged(s):
+                entry = base.entry(s, window)
+            else:
+                df = source[s]
+                if df is None or df.empty:
+                    continue
+                if window is not None:
+                    df = df.tail(window)
+                entry = (df.index.as_unit('ns').asi8,
+                         *(df[c].to_numpy(dtype=np.float64, na_value=np.nan) for c in COLUMNS),
+                         data_version(df))
+            if len(entry[0]):
+                symbols.append(s)
+                entries.append(entry)
+        return cls._assemble(symbols, entries)
+
+    @classmethod
+    def from_snapshot(cls, snap, symbols: Optional[Sequence[str]] = None) -> "CompactCache":
+        """snapshot_store.Snapshot dizilerinden (DataFrame kurmadan) kurar; her sembol yeni veri sürümü alır."""
+        pos = {s: i for i, s in enumerate(snap.symbols)}
+        wanted = snap.symbols if symbols is None else [s for s in symbols if s in pos]
+        out_symbols, entries = [], []
+        for s in wanted:
+            a, b = int(snap.offsets[pos[s]]), int(snap.offsets[pos[s] + 1])
+            if b > a:
+                out_symbols.append(s)
+                entries.append((snap.dates[a:b], *(snap.columns[c][a:b] for c in COLUMNS), next_version()))
+        return cls._assemble(out_symbols, entries)
+
+    def stage(self) -> "StagedCache":
+        """Toplu güncellemeler için yazılabilir katman (taban bu nesnedir, değişmez)."""
+        return StagedCache(self)
+
+    # ---------- Okuma ----------
+
+    def __getitem__(self, symbol: str) -> pd.DataFrame:
+        """Sembolün barları: float64 sütunlu yeni DataFrame (veri sürümü attrs'ta)."""
+        i = self._pos[symbol]
+        a, b = int(self.offsets[i]), int(self.offsets[i + 1])
+        index = pd.DatetimeIndex(self.axis[self.date_pos[a:b]].view('datetime64[ns]'), name='date')
+        df = pd.DataFrame({'close': self.close[a:b].astype(np.float64),
+                           'high': self.high[a:b].astype(np.float64),
+                           'low': self.low[a:b].astype(np.float64),
+                           'volume': self.decode_volume(self.volume[a:b])}, index=index)
+        df.attrs['data_version'] = self.versions[i]
+        return df
+
+    def __contains__(self, symbol) -> bool:
+        return symbol in self._pos
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.symbols)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def positions(self, symbols: Sequence[str]) -> np.ndarray:
+        """Sembollerin cache içindeki sırası (olmayanlar -1)."""
+        return np.fromiter((self._pos.get(s, -1) for s in symbols), dtype=np.int64, count=len(symbols))
+
+    def length(self, symbol: str) -> int:
+        i = self._pos.get(symbol)
+        return 0 if i is None else int(self.offsets[i + 1] - self.offsets[i])
+
+    def version(self, symbol: str) -> Any:
+        i = self._pos.get(symbol)
+        return None if i is None else self.versions[i]
+
+    def decode_volume(self, raw: np.ndarray) -> np.ndarray:
+        """Saklanan hacim dizisini float64'e çevirir (NULL işareti -> NaN)."""
+        out = raw.astype(np.float64)
+        if self.volume_missing is not None:
+            out[raw == self.volume_missing] = np.nan
+        return out
+
+    def entry(self, symbol: str, window: Optional[int] = None) -> Entry:
+        i = self._pos[symbol]
+        a, b = int(self.offsets[i]), int(self.offsets[i + 1])
+        if window is not None:
+            a = max(a, b - window)
+        return (self.axis[self.date_pos[a:b]], self.close[a:b], self.high[a:b], self.low[a:b],
+                self.decode_volume(self.volume[a:b]), self.versions[i])
+
+    def export(self, window: Optional[int] = None) -> Tuple[List[str], np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """Snapshot için düz diziler: (semboller, offsets, satır tarihleri int64, sütunlar)."""
+        entries = [self.entry(s, window) for s in self.symbols]
+        lengths = np.fromiter((len(e[0]) for e in entries), dtype=np.int64, count=len(entries))
+        offsets = np.zeros(len(entries) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        cat = lambda k, dtype: (np.concatenate([e[k] for e in entries]).astype(dtype, copy=False)
+                                if entries else np.empty(0, dtype=dtype))
+        columns = {c: cat(k + 1, PRICE_DTYPE) for k, c in enumerate(PRICE_COLUMNS)}
+        columns['volume'] = cat(4, np.float64)
+        return list(self.symbols), offsets, cat(0, np.int64), columns
+
+    # ---------- Bellek ----------
+
+    @property
+    def total_bars(self) -> int:
+        return int(self.offsets[-1])
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.offsets, self.axis, self.date_pos, self.close, self.high,
+                                      self.low, self.volume))
+
+    def memory_report(self) -> Dict[str, Any]:
+        """Dizi bazında bellek kullanımı ve DataFrame düzenine göre tahmini kazanç."""
+        arrays = {'offsets': self.offsets, 'axis': self.axis, 'date_pos': self.date_pos, 'close': self.close,
+                  'high': self.high, 'low': self.low, 'volume': self.volume}
+        bars = self.total_bars
+        return {
+            'symbols': len(self),
+            'bars': bars,
+            'dates': len(self.axis),
+            'arrays': {k: {'dtype': str(a.dtype), 'bytes': int(a.nbytes)} for k, a in arrays.items()},
+            'total_bytes': self.nbytes,
+            'bytes_per_bar': round(self.nbytes / bars, 2) if bars else 0.0,
+            'frame_layout_bytes': bars * FRAME_BYTES_PER_BAR,
+        }
+
+
+class StagedCache(MutableMapping):
+    """CompactCache üzerinde yazma katmanı: değişen semboller DataFrame olarak tutulur,
+    diğerleri tabandan okunur. CompactCache.build(staged) ile tek seferde yeni cache kurulur."""
+
+    def __init__(self, base: CompactCache):
+        self.base = base
+        self.overrides: Dict[str, pd.DataFrame] = {}
+
+    def is_unchanged(self, symbol: str) -> bool:
+        return symbol not in self.overrides
+
+    def __getitem__(self, symbol: str) -> pd.DataFrame:
+        if symbol in self.overrides:
+            return self.overrides[symbol]
+        return self.base[symbol]
+
+    def __setitem__(self, symbol: str, df: pd.DataFrame):
+        self.overrides[symbol] = df
+
+    def __delitem__(self, symbol: str):
+        raise TypeError("StagedCache sembol silmeyi desteklemez")
+
+    def __contains__(self, symbol) -> bool:
+        return symbol in self.overrides or symbol in self.base
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.base
+        yield from (s for s in self.overrides if s not in self.base)
+
+    def __len__(self) -> int:
+        return len(self.base) + sum(1 for s in self.overrides if s not in self.base)
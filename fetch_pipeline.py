@@ -0,0 +1,341 @@
+# fetch_pipeline.py
+
+"""
+Eşzamanlı, hız sınırlı veri indirme hattı (bootstrap / update).
+
+* Veri kaynağı DataProvider arayüzünün arkasındadır: YFinanceProvider (varsayılan),
+  CsvDirProvider (yerel dosyalar) ve FakeProvider (deterministik sentetik veri, test/offline).
+* İndirmeler sınırlı bir thread havuzunda paralel yapılır; sağlayıcı destekliyorsa
+  çoklu-ticker (batch) indirme kullanılır.
+* Her sağlayıcının kendi hız sınırlayıcısı (token bucket) ve üstel geri çekilmeli retry'ı vardır.
+* Sonuçlar sınırlı bir kuyruk üzerinden tek bir yazıcıya (run() çağıran thread) akar;
+  böylece SQLite'a tek bağlantıdan, sırayla yazılır.
+"""
+
+import os
+import queue
+import random
+import threading
+import time
+import zlib
+import datetime
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from metrics import timed
+
+logger = logging.getLogger('SwingScanner')
+
+OHLCV_COLUMNS = ["date", "close", "high", "low", "volume"]
+
+
+def normalize_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+    """yfinance biçimindeki (Date index, Close/High/Low/Volume) veriyi
+    DB formatına (date 'YYYY-MM-DD', close, high, low, volume) çevirir."""
+    df2 = df.reset_index()
+    df2 = df2.rename(columns={df2.columns[0]: "Date"})  # index adı sürüme göre değişebilir
+    required_cols = ["Date", "Close", "Volume", "High", "Low"]
+    df2 = df2[required_cols].rename(
+        columns={"Date": "date", "Close": "close", "Volume": "volume", "High": "high", "Low": "low"}
+    )
+    df2 = df2.dropna(subset=['date', 'close', 'high', 'low'])
+    df2['date'] = pd.to_datetime(df2['date']).dt.strftime("%Y-%m-%d")
+    return df2[OHLCV_COLUMNS].reset_index(drop=True)
+
+
+# ---------- HIZ SINIRLAMA / RETRY ----------
+
+class RateLimiter:
+    """Thread-safe token bucket. rate_per_sec <= 0 ise sınırlama yapmaz."""
+
+    def __init__(self, rate_per_sec: float, burst: int = 1):
+        self.rate = rate_per_sec
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def call_with_retry(fn: Callable, retries: int = 3, backoff: float = 1.0, label: str = ""):
+    """fn()'i hata durumunda üstel geri çekilme + jitter ile tekrar dener."""
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == retries:
+                raise
+            delay = backoff * (2 ** attempt) * (0.5 + random.random())
+            logger.warning(f"{label} indirme hatası ({e}), {delay:.1f} sn sonra tekrar denenecek "
+                           f"[{attempt + 1}/{retries}]")
+            time.sleep(delay)
+
+
+# ---------- VERİ SAĞLAYICILARI ----------
+
+class DataProvider:
+    """Veri kaynağı arayüzü.
+
+    fetch(tickers, start, end) -> {ticker: normalize_ohlcv formatında DataFrame}
+    start/end None ise tüm geçmiş istenir. Veri dönmeyen ticker sonuçta yer almaz.
+    """
+    name = "base"
+    max_batch = 1          # Tek çağrıda istenebilecek azami ticker sayısı
+    rate_per_sec = 0.0     # Saniyedeki azami çağrı (0 = sınırsız)
+    burst = 1
+
+    def __init__(self):
+        self.limiter = RateLimiter(self.rate_per_sec, self.burst)
+
+    def fetch(self, tickers: List[str], start: Optional[str] = None,
+              end: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+        raise NotImplementedError
+
+
+class YFinanceProvider(DataProvider):
+    name = "yfinance"
+    max_batch = 50
+    rate_per_sec = 2.0
+    burst = 2
+
+    def __init__(self, auto_adjust: bool = True):
+        super().__init__()
+        try:
+            import yfinance
+        except ImportError:
+            raise ImportError("yfinance kurulu değil: pip install yfinance (veya --provider csv/fake kullanın)")
+        self.yf = yfinance
+        self.auto_adjust = auto_adjust
+
+    def fetch(self, tickers, start=None, end=None):
+        kwargs = dict(auto_adjust=self.auto_adjust, progress=False, group_by='ticker', threads=False)
+        if start and end:
+            df = self.yf.download(tickers, start=start, end=end, **kwargs)
+        else:
+            df = self.yf.download(tickers, period="max", interval="1d", **kwargs)
+        if df is None or df.empty:
+            return {}
+
+        frames = {}
+        if isinstance(df.columns, pd.MultiIndex):
+            # group_by='ticker' -> (ticker, alan); bazı sürümlerde (alan, ticker)
+            ticker_level = 0 if "Close" not in df.columns.get_level_values(0) else 1
+            for t in df.columns.get_level_values(ticker_level).unique():
+                sub = df.xs(t, axis=1, level=ticker_level)
+                frames[t] = sub
+        else:
+            frames[tickers[0]] = df
+
+        out = {}
+        for t, sub in frames.items():
+            norm = normalize_ohlcv(sub)
+            if not norm.empty:
+                out[t] = norm
+        return out
+
+
+class CsvDirProvider(DataProvider):
+    """Yerel klasördeki <TICKER>.csv dosyalarından (Date, Close, High, Low, Volume) okur."""
+    name = "csv"
+    max_batch = 1
+
+    def __init__(self, data_dir: str):
+        super().__init__()
+        self.data_dir = data_dir
+
+    def fetch(self, tickers, start=None, end=None):
+        out = {}
+        for t in tickers:
+            path = os.path.join(self.data_dir, f"{t}.csv")
+            if not os.path.exists(path):
+                path = os.path.join(self.data_dir, f"{t.split('.')[0]}.csv")
+                if not os.path.exists(path):
+                    continue
+            norm = normalize_ohlcv(pd.read_csv(path, index_col=0))
+            if start:
+                norm = norm[norm['date'] >= start]
+            if end:
+                norm = norm[norm['date'] < end]  # yfinance gibi end hariç
+            if not norm.empty:
+                out[t] = norm.reset_index(drop=True)
+        return out
+
+
+class FakeProvider(DataProvider):
+    """Deterministik sentetik OHLCV üretir (ağ yok). Aynı ticker/tarih için her zaman aynı bar döner,
+    böylece bootstrap ve artımlı update birbiriyle tutarlıdır."""
+    name = "fake"
+    max_batch = 100
+    origin = "2000-01-03"
+
+    def __init__(self, seed: int = 0, latency: float = 0.0):
+        super().__init__()
+        self.seed = seed
+        self.latency = latency
+        self._calendars: Dict[str, np.ndarray] = {}
+
+    def _calendar(self, end: str) -> np.ndarray:
+        """origin..end (hariç) arası iş günleri, 'YYYY-MM-DD' dizisi (end başına bir kez hesaplanır)."""
+        cal = self._calendars.get(end)
+        if cal is None:
+            days = np.arange(np.datetime64(self.origin), np.datetime64(end), dtype='datetime64[D]')
+            cal = days[np.is_busday(days)].astype(str)
+            self._calendars[end] = cal
+        return cal
+
+    def series(self, ticker: str, end: Optional[str] = None) -> pd.DataFrame:
+        end_dt = end or (datetime.date.today() + datetime.timedelta(days=1)).strftime("%Y-%m-%d")
+        dates = self._calendar(end_dt)
+        key = zlib.crc32(ticker.encode())
+        n = len(dates)
+        # Her alan için ayrı üreteç: farklı end tarihlerinde de ortak önek aynı kalır
+        rng_close, rng_spread, rng_vol = (np.random.default_rng([key, self.seed, k]) for k in range(3))
+        base = 5 + (key % 1000) / 1000 * 195
+        close = base * np.exp(np.cumsum(rng_close.normal(0.0003, 0.02, n)))
+        spread = np.abs(rng_spread.normal(0, 0.01, n))
+        high = close * (1 + spread)
+        low = close * (1 - spread)
+        volume = rng_vol.lognormal(13, 0.6, n).astype(np.int64)
+        return pd.DataFrame({
+            "date": dates,
+            "close": close, "high": high, "low": low, "volume": volume,
+        })
+
+    def fetch(self, tickers, start=None, end=None):
+        if self.latency:
+            time.sleep(self.latency)
+        out = {}
+        for t in tickers:
+            df = self.series(t, end)
+            if start:
+                df = df[df['date'] >= start]
+            if not df.empty:
+                out[t] = df.reset_index(drop=True)
+        return out
+
+
+def make_provider(name: str = "yfinance", data_dir: Optional[str] = None,
+                  auto_adjust: bool = True) -> DataProvider:
+    if name == "yfinance":
+        return YFinanceProvider(auto_adjust=auto_adjust)
+    if name == "csv":
+        return CsvDirProvider(data_dir or "data")
+    if name == "fake":
+        return FakeProvider()
+    raise ValueError(f"Bilinmeyen veri sağlayıcı: {name}")
+
+
+# ---------- PIPELINE ----------
+
+@dataclass
+class FetchRequest:
+    ticker: str
+    start: Optional[str] = None   # None -> tüm geçmiş
+    end: Optional[str] = None
+
+
+@dataclass
+class FetchResult:
+    ticker: str
+    ok: bool
+    message: str
+    rows: Optional[pd.DataFrame] = None
+
+
+class FetchPipeline:
+    """İstekleri (start, end) aralığına göre gruplar, provider.max_batch'lik parçalara böler,
+    parçaları sınırlı bir thread havuzunda indirir ve sonuçları sınırlı bir kuyruk üzerinden
+    tek bir tüketiciye (consumer) aktarır."""
+
+    def __init__(self, provider: DataProvider, workers: int = 4, queue_size: int = 256,
+                 retries: int = 3, backoff: float = 1.0):
+        self.provider = provider
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.retries = retries
+        self.backoff = backoff
+
+    def _chunks(self, requests: List[FetchRequest]) -> List[Tuple[Optional[str], Optional[str], List[str]]]:
+        groups: Dict[Tuple[Optional[str], Optional[str]], List[str]] = {}
+        for r in requests:
+            groups.setdefault((r.start, r.end), []).append(r.ticker)
+        size = max(1, self.provider.max_batch)
+        return [(start, end, tickers[i:i + size])
+                for (start, end), tickers in groups.items()
+                for i in range(0, len(tickers), size)]
+
+    def _download(self, chunk, out: "queue.Queue"):
+        start, end, tickers = chunk
+        label = f"{self.provider.name} {tickers[0]}" + (f" (+{len(tickers) - 1})" if len(tickers) > 1 else "")
+
+        def call():
+            self.provider.limiter.acquire()
+            with timed("fetch_download"): # Ağ süresi (hız sınırlayıcı beklemesi hariç)
+                return self.provider.fetch(tickers, start, end)
+
+        # run() her ticker için tam bir sonuç bekler: hata nerede olursa olsun eksik kalanlar hata olarak bildirilir
+        emitted = 0
+        try:
+            frames = call_with_retry(call, self.retries, self.backoff, label)
+            for t in tickers:
+                df = frames.get(t)
+                if df is None or df.empty:
+                    res = FetchResult(t, False, f"No data returned from {self.provider.name}.")
+                else:
+                    res = FetchResult(t, True, f"{len(df)} rows", df)
+                out.put(res)
+                emitted += 1
+        except Exception as e:
+            for t in tickers[emitted:]:
+                out.put(FetchResult(t, False, f"{self.provider.name} download error: {e}"))
+
+    def run(self, requests: List[FetchRequest], consumer: Callable[[FetchResult], None]) -> Dict[str, int]:
+        """İndirmeleri başlatır ve sonuçları geldikçe consumer'a verir (çağıran thread = tek yazıcı).
+        Dönüş: {'ok': .., 'failed': .., 'rows': .., 'seconds': ..}"""
+        t0 = time.perf_counter()
+        summary = {"ok": 0, "failed": 0, "rows": 0}
+        if not requests:
+            summary["seconds"] = 0.0
+            return summary
+
+        results: "queue.Queue[FetchResult]" = queue.Queue(maxsize=self.queue_size)
+        chunks = self._chunks(requests)
+        remaining = len(requests)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="fetch") as pool:
+            for chunk in chunks:
+                pool.submit(self._download, chunk, results)
+            while remaining:
+                res = results.get()
+                remaining -= 1
+                if res.ok:
+                    summary["ok"] += 1
+                    summary["rows"] += len(res.rows)
+                else:
+                    summary["failed"] += 1
+                try:
+                    consumer(res)
+                except Exception as e:
+                    # Tüketici hatası kuyruğu tıkamasın; üreticiler beklemede kalmasın
+                    logger.error(f"{res.ticker}: sonuç işlenemedi: {e}")
+
+        summary["seconds"] = time.perf_counter() - t0
+        return summary
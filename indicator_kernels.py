@@ -0,0 +1,396 @@
+# indicator_kernels.py
+
+"""
+Göstergelerin saf NumPy kernelleri (pandas semantiğiyle).
+
+Tüm kerneller zaman ekseni 0 olan 1-D (tek sembol) ve 2-D (bar x sembol) dizilerle çalışır; out
+verilirse sonuç o diziye yazılır. indicators_v2 (DataFrame fonksiyonları) ve panel_engine (gösterge
+grafiği) aynı kernelleri kullanır.
+
+* ewm_mean: sütunun ilk geçerli değerinden sonra NaN yoksa (olağan durum) doğrusal özyineleme
+  S_t = f*S_{t-1} + x_t blok blok kapalı formla (kümülatif toplam) hesaplanır; adjust=True/False ve
+  min_periods bu toplamdan ve f^n'den elde edilir. Arada NaN olan sütunlar pandas'ın bar bar
+  algoritmasını birebir izleyen döngüye (_ewm_loop) düşer.
+* rolling_mean / rolling_std: kümülatif toplamlarla O(T). Sabit pencerelerde pandas gibi tam değer
+  (ortalama = değer, std = 0) verilir; varyansı ortalamaya göre çok küçük pencereler (sayısal olarak
+  kararsız) iki geçişli hesapla yeniden hesaplanır.
+* relative_strength / percentile_rank: karşılaştırma endeksine göre getiri ve aynı gündeki (grup)
+  değerler arasında yüzdelik sıra; tüm evren tek sıralamayla (lexsort) işlenir, sembol döngüsü yoktur.
+* Fiyatı NaN olan barlar (panelde hizalama dolgusu) sonuçta NaN kalır.
+"""
+
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+
+_BLOCK_RANGE = 100.0  # blok içi ağırlık aralığı: f^-B <= 10^100 (taşmayı önler; hassasiyet blok boyundan bağımsız)
+_STD_RTOL = 1e-8  # varyans / (ortalama kare) bunun altındaysa pencere iki geçişle yeniden hesaplanır
+
+
+def _output(x: np.ndarray, out: Optional[np.ndarray]) -> np.ndarray:
+    """NaN ile dolu çıktı dizisi: out verilirse o doldurulur, yoksa yeni dizi ayrılır."""
+    if out is None:
+        return np.full_like(x, np.nan, dtype=float)
+    out.fill(np.nan)
+    return out
+
+
+def _as_2d(x: np.ndarray) -> np.ndarray:
+    return x[:, np.newaxis] if x.ndim == 1 else x
+
+
+def shift(x: np.ndarray, n: int = 1, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """pandas .shift(n) eşdeğeri (eksen 0)."""
+    if out is None:
+        out = np.full_like(x, np.nan, dtype=float)
+    if n == 0:
+        out[:] = x
+    elif n > 0:
+        out[:n] = np.nan
+        out[n:] = x[:-n]
+    else:
+        out[n:] = np.nan
+        out[:n] = x[-n:]
+    return out
+
+
+def slope(x: np.ndarray, period: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """period bar önceki değere göre değişim (calculate_ma_slope)."""
+    shifted = shift(x, period, out=out)
+    return np.subtract(x, shifted, out=shifted)
+
+
+def _run_length(x: np.ndarray) -> np.ndarray:
+    """Her noktada, değerin kaç bardır değişmeden sürdüğü (sabit pencere tespiti için)."""
+    T = x.shape[0]
+    change = np.ones(x.shape, dtype=bool)
+    change[1:] = x[1:] != x[:-1]  # NaN her zaman değişim sayılır
+    pos = np.arange(T).reshape((T,) + (1,) * (x.ndim - 1))
+    last_change = np.maximum.accumulate(np.where(change, pos, 0), axis=0)
+    return pos - last_change + 1
+
+
+# ---------- EWM ----------
+
+def ewm_mean(x: np.ndarray, alpha: float, adjust: bool = False, min_periods: int = 0,
+             out: Optional[np.ndarray] = None) -> np.ndarray:
+    """pandas .ewm(alpha=..., adjust=..., min_periods=...).mean() (ignore_na=False) eşdeğeri.
+    out, x ile aynı dizi olabilir (yerinde hesap)."""
+    x = np.asarray(x, dtype=float)
+    if out is None:
+        out = np.empty_like(x)
+    if x.shape[0] == 0:
+        return out
+    x2, out2 = _as_2d(x), _as_2d(out)
+    missing = np.isnan(x2)
+    if not missing.any():
+        start = np.zeros(x2.shape[1], dtype=np.int64)
+        if np.may_share_memory(x2, out2):
+            out2[:] = _ewm_dense(x2, alpha, adjust, min_periods, start)
+        else:
+            _ewm_dense(x2, alpha, adjust, min_periods, start, out=out2)
+        return out
+    start = np.argmin(missing, axis=0)  # ilk geçerli bar (tamamen NaN sütunda 0)
+    leading = np.arange(x2.shape[0])[:, np.newaxis] < start
+    dense = ~(missing & ~leading).any(axis=0) & ~missing.all(axis=0)  # ilk geçerli değerden sonra NaN yok
+    if dense.all():
+        out2[:] = _ewm_dense(x2, alpha, adjust, min_periods, start)
+    elif dense.any():
+        out2[:, dense] = _ewm_dense(x2[:, dense], alpha, adjust, min_periods, start[dense])
+        out2[:, ~dense] = _ewm_loop(x2[:, ~dense], alpha, adjust, min_periods)
+    else:
+        out2[:] = _ewm_loop(x2, alpha, adjust, min_periods)
+    return out
+
+
+def wilder_mean(x: np.ndarray, window: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Wilder yumuşatması: ewm(com=window-1, min_periods=window).mean() (calculate_rsi)."""
+    return ewm_mean(x, 1.0 / window, adjust=True, min_periods=window, out=out)
+
+
+def _linear_recurrence(z: np.ndarray, f: float, powers: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """S_t = f * S_{t-1} + z_t (S_-1 = 0), eksen 0 boyunca (2-D); powers = f^0, f^1, ..., out z olabilir.
+    Blok içinde S = f^i * cumsum(z / f^i); bloklar arası değer f^(i+1) * önceki bloğun son değeriyle taşınır."""
+    T = z.shape[0]
+    B = max(1, min(T, int(_BLOCK_RANGE / -math.log10(f))))
+    for b0 in range(0, T, B):
+        seg = out[b0:b0 + B]
+        pw = powers[:len(seg), np.newaxis]
+        np.divide(z[b0:b0 + B], pw, out=seg)
+        np.cumsum(seg, axis=0, out=seg)
+        seg *= pw
+        if b0:
+            seg += powers[1:len(seg) + 1, np.newaxis] * out[b0 - 1]
+    return out
+
+
+def _ewm_dense(x: np.ndarray, alpha: float, adjust: bool, min_periods: int, start: np.ndarray,
+               out: Optional[np.ndarray] = None) -> np.ndarray:
+    """İlk geçerli değerinden (start) sonra NaN olmayan sütunlar için kapalı form. n_t = t - s + 1 ve
+    S_t = sum_{k=s..t} f^(t-k) x_k ise adjust=True: S_t (1-f) / (1-f^n);
+    adjust=False: alpha * S_t + f^n * x_s (y_s = x_s, y_t = f y_{t-1} + alpha x_t açılımı)."""
+    T, N = x.shape
+    f = 1.0 - alpha
+    y = np.empty_like(x) if out is None else out
+    rows = np.arange(T)[:, np.newaxis]
+    shifted = bool(start.any())
+    cols = np.arange(N)
+    first = x[start, cols]
+    if f == 0.0:  # alpha = 1: ortalama son değerin kendisi
+        y[:] = x
+    else:
+        powers = f ** np.arange(T + 1)
+        if shifted:
+            n = rows + 1 - start  # başlangıçtan beri bar sayısı
+            _linear_recurrence(np.where(n > 0, x, 0.0), f, powers, out=y)
+            fn = powers[np.maximum(n, 0)]
+        else:
+            _linear_recurrence(x, f, powers, out=y)
+            fn = powers[1:, np.newaxis]
+        if adjust:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                y *= alpha
+                y /= 1.0 - fn
+        else:
+            y *= alpha
+            y += fn * first
+        # Pandas ilk değeri ve başlangıçtan beri sabit seriyi aynen verir (ör. MACD tam 0 kalmalı);
+        # kapalı form bunları yuvarlama hatasıyla üretir. Sadece ikinci barı ilkine eşit sütunlara bakılır.
+        y[start, cols] = first
+        candidates = np.nonzero(x[np.minimum(start + 1, T - 1), cols] == first)[0]
+        if candidates.size:
+            xc, s = x[:, candidates], start[candidates]
+            const = np.logical_and.accumulate((xc == first[candidates]) | (rows < s), axis=0)
+            yc = y[:, candidates]
+            np.copyto(yc, xc, where=const)
+            y[:, candidates] = yc
+    minp = max(min_periods, 1)
+    if shifted:
+        y[rows < start + minp - 1] = np.nan
+    else:
+        y[:minp - 1] = np.nan
+    return y
+
+
+def _ewm_loop(x: np.ndarray, alpha: float, adjust: bool, min_periods: int) -> np.ndarray:
+    """pandas'ın ewma algoritması bar bar (arada NaN olan sütunlar için). Semboller üzerinde vektörel."""
+    out = np.empty_like(x)
+    weighted = np.full(x.shape[1:], np.nan)
+    old_wt = np.ones(x.shape[1:])
+    nobs = np.zeros(x.shape[1:], dtype=np.int64)
+    minp = max(min_periods, 1)
+    new_wt = 1.0 if adjust else alpha
+    factor = 1.0 - alpha
+
+    for t in range(x.shape[0]):
+        cur = x[t]
+        obs = cur == cur
+        nobs += obs
+        started = weighted == weighted
+        old_wt = np.where(started, old_wt * factor, old_wt)
+        upd = started & obs & (weighted != cur)  # pandas: sabit seride sayısal hatayı önler
+        with np.errstate(invalid='ignore'):
+            blended = (old_wt * weighted + new_wt * cur) / (old_wt + new_wt)
+        weighted = np.where(upd, blended, weighted)
+        if adjust:
+            old_wt = np.where(started & obs, old_wt + new_wt, old_wt)
+        else:
+            old_wt = np.where(started & obs, 1.0, old_wt)
+        weighted = np.where(~started & obs, cur, weighted)
+        out[t] = np.where(nobs >= minp, weighted, np.nan)
+    return out
+
+
+# ---------- ROLLING ----------
+
+def _windowed(v: np.ndarray, window: int) -> np.ndarray:
+    """Pencere sonundaki barlar (T - window + 1 satır) için kayan pencere toplamı (kümülatif toplam farkı)."""
+    c = np.cumsum(v, axis=0)
+    w = np.empty((c.shape[0] - window + 1,) + c.shape[1:], dtype=c.dtype)
+    w[0] = c[window - 1]
+    np.subtract(c[window:], c[:-window], out=w[1:])
+    return w
+
+
+def _window_sums(x: np.ndarray, window: int, squares: bool = False):
+    """Değerler sütunun ilk geçerli değerine göre merkezlenerek (kümülatif toplam hatası küçülür) pencere
+    toplamları. Dönüş: (referans, toplam, kareler toplamı veya None, tam pencere maskesi; None = hepsi tam)."""
+    missing = np.isnan(x)
+    if missing.any():
+        first = np.argmin(missing, axis=0)
+        ref = np.nan_to_num(np.take_along_axis(x, first[np.newaxis], axis=0)[0])
+        centered = np.where(missing, 0.0, x - ref)
+        full = _windowed((~missing).astype(np.int64), window) == window
+    else:
+        ref = x[0].copy()
+        centered = x - ref
+        full = None
+    s1 = _windowed(centered, window)
+    s2 = _windowed(np.square(centered, out=centered), window) if squares else None
+    return ref, s1, s2, full
+
+
+def _constant_runs(x: np.ndarray, window: int) -> Optional[np.ndarray]:
+    """Son `window` barı aynı (ve geçerli) olan noktalar; ardışık eşit değer hiç yoksa None."""
+    if not (x[1:] == x[:-1]).any():
+        return None
+    return (_run_length(x) >= window) & ~np.isnan(x)
+
+
+def rolling_mean(x: np.ndarray, window: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """pandas .rolling(window).mean() eşdeğeri (min_periods=window): kümülatif toplam ile O(T)."""
+    x = np.asarray(x, dtype=float)
+    if x.shape[0] < window:
+        return _output(x, out)
+    out = np.empty_like(x) if out is None else out
+    out[:window - 1] = np.nan
+    ref, s1, _, full = _window_sums(x, window)
+    tail = np.divide(s1, window, out=out[window - 1:])
+    tail += ref
+    if full is not None:
+        tail[~full] = np.nan
+    # Sabit pencerede pandas değeri aynen döndürür; fiyat > MA gibi kesin karşılaştırmalar bozulmasın
+    const = _constant_runs(x, window)
+    if const is not None:
+        out[const] = x[const]
+    return out
+
+
+def rolling_std(x: np.ndarray, window: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """pandas .rolling(window).std() (ddof=1, min_periods=window) eşdeğeri: kümülatif toplamlarla
+    sum(x) ve sum(x^2). Sabit pencerede tam 0; varyansı ortalamaya göre çok küçük (sayısal olarak
+    kararsız) pencereler iki geçişli hesapla yeniden hesaplanır."""
+    x = np.asarray(x, dtype=float)
+    if x.shape[0] < window:
+        return _output(x, out)
+    out = np.empty_like(x) if out is None else out
+    out[:window - 1] = np.nan
+    _, s1, s2, full = _window_sums(x, window, squares=True)
+    np.multiply(s1, s1, out=s1)
+    s1 /= window
+    tail = np.subtract(s2, s1, out=out[window - 1:])  # n * (ortalama etrafında kareler ortalaması)
+    unstable = tail <= _STD_RTOL * s2
+    np.maximum(tail, 0.0, out=tail)
+    tail /= window - 1
+    np.sqrt(tail, out=tail)
+    if full is not None:
+        tail[~full] = np.nan
+        unstable &= full
+    if unstable.any():
+        t, *cols = np.nonzero(unstable)
+        rows = (t + window - 1)[:, np.newaxis] - np.arange(window)[::-1]
+        tail[unstable] = x[(rows,) + tuple(c[:, np.newaxis] for c in cols)].std(axis=1, ddof=1)
+    const = _constant_runs(x, window)
+    if const is not None:
+        out[const] = 0.0
+    return out
+
+
+# ---------- GÖSTERGE KERNELLERİ ----------
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """max(high-low, |high-önceki close|, |low-önceki close|); NaN'lar atlanır (pandas max(axis=1))."""
+    prev_close = shift(close, 1)
+    return np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close), out=out)
+
+
+def rsi_averages(close: np.ndarray, window: int = 14, out_gain: Optional[np.ndarray] = None,
+                 out_loss: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """RSI ortalama kazanç / kayıp (calculate_rsi): ilk barın değişimi NaN'dır ve kazanç/kayıp 0 sayılır;
+    fiyatı NaN olan barlar NaN kalır. Ek tampon gerekmez: değişim kayıp dizisinde hesaplanır."""
+    close = np.asarray(close, dtype=float)
+    invalid = np.isnan(close)
+    delta = np.subtract(close, shift(close, 1, out=out_loss), out=out_loss)
+    gain = np.maximum(delta, 0.0, out=out_gain)
+    loss = np.negative(delta, out=delta)
+    np.maximum(loss, 0.0, out=loss)
+    for v in (gain, loss):
+        np.copyto(v, 0.0, where=np.isnan(v))
+        np.copyto(v, np.nan, where=invalid)
+    return wilder_mean(gain, window, out=gain), wilder_mean(loss, window, out=loss)
+
+
+def rsi_from_averages(avg_gain: np.ndarray, avg_loss: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """100 - 100 / (1 + RS); kayıp 0 ise (RS sonsuz) NaN."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = np.divide(avg_gain, avg_loss, out=out)
+    rs[np.isinf(rs)] = np.nan
+    rsi = np.add(rs, 1, out=rs)
+    np.divide(100, rsi, out=rsi)
+    return np.subtract(100, rsi, out=rsi)
+
+
+def zscore(x: np.ndarray, mean: np.ndarray, std: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """(x - ortalama) / std; std = 0 veya NaN sonuçlar 0 (calculate_volume_zscore)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = np.subtract(x, mean, out=out)
+        np.divide(z, std, out=z)
+    z[std == 0] = 0
+    z[np.isnan(z)] = 0.0
+    return z
+
+
+def relative_strength(close: np.ndarray, benchmark: np.ndarray, period: int,
+                      out: Optional[np.ndarray] = None) -> np.ndarray:
+    """period bardaki getirinin endeks getirisine oranı - 1 (0: endeksle aynı, 0.1: endeksten %10 iyi).
+    benchmark, close ile aynı biçimde her barın tarihindeki endeks kapanışıdır."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = np.divide(close, shift(close, period, out=out), out=out)
+        rs /= benchmark
+        rs *= shift(benchmark, period)
+    rs -= 1.0
+    rs[~np.isfinite(rs)] = np.nan
+    return rs
+
+
+def _row_rank(x: np.ndarray) -> np.ndarray:
+    """Satır içi yüzdelik sıra (eşitler ortalama sıra); NaN hücreler anlamsızdır (çağıran maskeler)."""
+    T, N = x.shape
+    order = np.argsort(x, axis=1)  # NaN'lar sona
+    values = np.take_along_axis(x, order, axis=1)
+    pos = np.broadcast_to(np.arange(N), (T, N))
+    counts = np.count_nonzero(~np.isnan(x), axis=1)[:, np.newaxis]
+    differs = values[:, 1:] != values[:, :-1]  # NaN komşuları her zaman farklı sayılır
+    if differs.all():  # Eşit değer yok (sürekli getirilerde olağan): sıra = konum
+        ranks = pos + 1.0
+    else:
+        tie_start = np.ones((T, N), dtype=bool)
+        tie_start[:, 1:] = differs
+        tie_end = np.ones((T, N), dtype=bool)
+        tie_end[:, :-1] = differs
+        first = np.maximum.accumulate(np.where(tie_start, pos, 0), axis=1)
+        last = np.minimum.accumulate(np.where(tie_end, pos, N)[:, ::-1], axis=1)[:, ::-1]
+        ranks = (first + last) / 2.0 + 1.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ranks = ranks / counts * 100.0
+    out = np.empty_like(ranks)
+    np.put_along_axis(out, order, ranks, axis=1)
+    return out
+
+
+def percentile_rank(x: np.ndarray, groups: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Her değerin kendi grubundaki (ör. aynı tarih) yüzdelik sırası: 100 * sıra / grup sayısı, eşitler ortalama
+    sıra alır (pandas rank(pct=True) * 100). NaN değerler sıralanmaz ve NaN kalır.
+    x ve groups (bar, sembol) biçimindedir; her sütunda bir grup en fazla bir kez geçer (sembolün tarihleri).
+    Değerler (grup, sütun) ızgarasına dağıtılıp satır satır sıralanır: sağa hizalı panelde tarihi geride kalan
+    semboller de kendi tarihlerinin grubunda sıralanır."""
+    out = _output(x, out)
+    x2, groups2 = _as_2d(x), _as_2d(groups)
+    valid = ~np.isnan(x2)
+    if not valid.any():
+        return out
+    info = np.iinfo(groups2.dtype)
+    low = np.where(valid, groups2, info.max).min(axis=1)
+    high = np.where(valid, groups2, info.min).max(axis=1)
+    filled = valid.any(axis=1)
+    if np.array_equal(low[filled], high[filled]) and np.all(np.diff(low[filled]) > 0):
+        # Hizalı evren (olağan durum): her satır tek bir gruptur, ızgara gerekmez
+        np.copyto(_as_2d(out), _row_rank(x2), where=valid)
+        return out
+    cols = np.nonzero(valid)[1]
+    keys, slot = np.unique(groups2[valid], return_inverse=True)
+    grid = np.full((len(keys), x2.shape[1]), np.nan)
+    grid[slot, cols] = x2[valid]
+    _as_2d(out)[valid] = _row_rank(grid)[slot, cols]
+    return out
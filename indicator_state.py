@@ -0,0 +1,373 @@
+# indicator_state.py
+
+"""
+Artımlı (streaming) gösterge durumu.
+
+indicators_v2'deki tüm göstergeler bir önceki barın durumundan güncellenebilir:
+* EWM tabanlı RSI (adjust=True), MACD ve ATR (adjust=False) -> _Ewm (pandas ile aynı özyineleme)
+* MA20/50/200 ve hacim ortalaması/std'si -> halka tampon + kayan toplam / kareler toplamı
+* MA20 eğimi -> son slope_period+1 MA20 değerinin halka tamponu
+
+IndicatorState sembol başına bu durumu tutar ve yeni bir bar geldiğinde O(1) ilerler.
+Durum, panel motorunun son bar çıktısından (from_panel) vektörel olarak tohumlanır; sonrasında
+merge_into_cache ile (ingest_batch) gelen her yeni bar için advance() çağrılır.
+
+Not: Cache son CACHE_WINDOW barı tuttuğu için toplu hesaplamada EWM her seferinde pencerenin
+başından başlar; artımlı durum ise kesintisiz devam eder. Aradaki fark (1-alpha)^300 mertebesindedir
+(~1e-10 bağıl); verify_incremental bu toleransı doğrular.
+"""
+
+import copy
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from panel_engine import (Panel, FLAG_COLUMNS, MIN_BARS, STATUS_NO_DATA, build_panel, build_signal_result,
+                          compute_indicators, signal_masks)
+
+logger = logging.getLogger('SwingScanner')
+
+MA_WINDOWS = (20, 50, 200)
+VOLUME_WINDOW = 20
+RSI_WINDOW = 14
+ATR_WINDOW = 14
+STATE_KEYS = ("ma20", "ma50", "ma200", "rsi", "macd_hist", "volume_zscore", "ma20_slope", "atr", "atr_percent")
+# states_from_panel'in panel göstergelerinden okuduğu çıktılar (EWM durumları + son değerler)
+SEED_OUTPUTS = STATE_KEYS + ("rsi_avg_gain", "rsi_avg_loss", "ema_fast", "ema_slow", "macd_signal_line")
+
+
+class _Ewm:
+    """pandas ewm(...).mean() (ignore_na=False) özyinelemesinin skaler, tek adımlık hali."""
+    __slots__ = ("factor", "new_wt", "adjust", "minp", "weighted", "old_wt", "nobs")
+
+    def __init__(self, alpha: float, adjust: bool = False, min_periods: int = 0):
+        self.factor = 1.0 - alpha
+        self.new_wt = 1.0 if adjust else alpha
+        self.adjust = adjust
+        self.minp = max(min_periods, 1)
+        self.weighted = np.nan
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    def seed(self, weighted: float, nobs: int):
+        """Toplu hesaplamanın son değerinden başlatır (kesintisiz nobs gözlem varsayılır)."""
+        self.weighted = float(weighted)
+        self.nobs = int(nobs)
+        if self.adjust:
+            # old_wt = sum_{i<nobs} factor^i
+            self.old_wt = (1.0 - self.factor ** nobs) / (1.0 - self.factor) if self.factor != 1.0 else float(nobs)
+        else:
+            self.old_wt = 1.0
+
+    def update(self, cur: float) -> float:
+        obs = cur == cur
+        self.nobs += obs
+        if self.weighted == self.weighted:
+            self.old_wt *= self.factor
+            if obs:
+                if self.weighted != cur:
+                    self.weighted = (self.old_wt * self.weighted + self.new_wt * cur) / (self.old_wt + self.new_wt)
+                self.old_wt = self.old_wt + self.new_wt if self.adjust else 1.0
+        elif obs:
+            self.weighted = cur
+        return self.weighted if self.nobs >= self.minp else np.nan
+
+
+class _Rolling:
+    """Sabit pencereli kayan ortalama/std: halka tampon + toplam ve kareler toplamı.
+    NaN içeren pencere NaN verir (pandas min_periods=window); sabit pencerede değer tam döner."""
+    __slots__ = ("window", "buf", "head", "filled", "total", "total_sq", "nan_count", "run", "last")
+
+    def __init__(self, window: int):
+        self.window = window
+        self.buf = [np.nan] * window
+        self.head = 0
+        self.filled = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.nan_count = 0
+        self.run = 0          # son değerin değişmeden sürdüğü bar sayısı
+        self.last = np.nan
+
+    def seed(self, values: np.ndarray, run: int):
+        for v in values[-self.window:]:
+            self.push(float(v))
+        self.run = run
+
+    def push(self, v: float):
+        if self.filled == self.window:
+            old = self.buf[self.head]
+            if old != old:
+                self.nan_count -= 1
+            else:
+                self.total -= old
+                self.total_sq -= old * old
+        else:
+            self.filled += 1
+        self.buf[self.head] = v
+        self.head = (self.head + 1) % self.window
+        if v != v:
+            self.nan_count += 1
+        else:
+            self.total += v
+            self.total_sq += v * v
+        self.run = self.run + 1 if v == self.last else 1
+        self.last = v
+
+    def _full(self) -> bool:
+        return self.filled == self.window and self.nan_count == 0
+
+    def mean(self) -> float:
+        if not self._full():
+            return np.nan
+        if self.run >= self.window:
+            return self.last
+        return self.total / self.window
+
+    def std(self) -> float:
+        if not self._full():
+            return np.nan
+        if self.run >= self.window:
+            return 0.0
+        n = self.window
+        var = (self.total_sq - self.total * self.total / n) / (n - 1)
+        return float(np.sqrt(var)) if var > 0 else 0.0
+
+    def resync(self):
+        """Uzun akışlarda kayan toplamların birikmiş yuvarlama hatasını sıfırlar."""
+        vals = [v for v in self.buf[:self.filled] if v == v]
+        self.total = float(sum(vals))
+        self.total_sq = float(sum(v * v for v in vals))
+
+
+class IndicatorState:
+    """Tek sembolün artımlı gösterge durumu. advance() her yeni bar için O(1) çalışır."""
+
+    RESYNC_EVERY = 1000
+
+    def __init__(self, symbol: str, slope_period: int = 5):
+        self.symbol = symbol
+        self.slope_period = slope_period
+        self.version: Any = None   # Durumun karşılık geldiği cache veri sürümü
+        self.bars = 0
+        self.last_date: Optional[pd.Timestamp] = None
+        self.close = np.nan
+        self.values: Dict[str, float] = {}
+        self.prev_values: Dict[str, float] = {}
+        self.ma = {w: _Rolling(w) for w in MA_WINDOWS}
+        self.vol = _Rolling(VOLUME_WINDOW)
+        self.ma20_hist: List[float] = [np.nan] * (slope_period + 1)
+        self.avg_gain = _Ewm(1.0 / RSI_WINDOW, adjust=True, min_periods=RSI_WINDOW)
+        self.avg_loss = _Ewm(1.0 / RSI_WINDOW, adjust=True, min_periods=RSI_WINDOW)
+        self.ema_fast = _Ewm(2.0 / (12 + 1))
+        self.ema_slow = _Ewm(2.0 / (26 + 1))
+        self.macd_signal = _Ewm(2.0 / (9 + 1))
+        self.atr = _Ewm(2.0 / (ATR_WINDOW + 1), min_periods=ATR_WINDOW)
+
+    def advance(self, date, close: float, high: float, low: float, volume: float) -> Dict[str, float]:
+        """Bir bar ilerler ve güncel gösterge değerlerini döner."""
+        prev_close = self.close
+        self.prev_values = self.values
+        self.bars += 1
+        self.last_date = pd.Timestamp(date)
+
+        for r in self.ma.values():
+            r.push(close)
+        self.vol.push(volume)
+        ma20, ma50, ma200 = (self.ma[w].mean() for w in MA_WINDOWS)
+        self.ma20_hist = self.ma20_hist[1:] + [ma20]
+
+        delta = close - prev_close
+        gain = delta if delta > 0 else 0.0   # ilk bar: delta NaN -> 0 (calculate_rsi ile aynı)
+        loss = -delta if delta < 0 else 0.0
+        avg_gain, avg_loss = self.avg_gain.update(gain), self.avg_loss.update(loss)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = np.float64(avg_gain) / np.float64(avg_loss)
+        rsi = np.nan if (np.isinf(rs) or np.isnan(rs)) else 100 - (100 / (1 + rs))
+
+        macd = self.ema_fast.update(close) - self.ema_slow.update(close)
+        macd_hist = macd - self.macd_signal.update(macd)
+
+        tr = max(high - low, abs(high - prev_close), abs(low - prev_close)) \
+            if prev_close == prev_close else high - low
+        atr = self.atr.update(tr)
+
+        vol_ma, vol_std = self.vol.mean(), self.vol.std()
+        if vol_std == 0:
+            zscore = 0.0
+        else:
+            zscore = (volume - vol_ma) / vol_std
+            zscore = 0.0 if zscore != zscore else zscore
+
+        self.close = close
+        self.values = {
+            "ma20": ma20, "ma50": ma50, "ma200": ma200,
+            "rsi": rsi, "macd_hist": macd_hist,
+            "volume_zscore": zscore,
+            "ma20_slope": ma20 - self.ma20_hist[0],
+            "atr": atr, "atr_percent": (atr / close) * 100,
+        }
+        if self.bars % self.RESYNC_EVERY == 0:
+            for r in list(self.ma.values()) + [self.vol]:
+                r.resync()
+        return self.values
+
+    def advance_frame(self, rows: pd.DataFrame):
+        """DATA_CACHE formatındaki (date index; close/high/low/volume) yeni satırlarla ilerler."""
+        for date, c, h, l, v in zip(rows.index, rows['close'].to_numpy(float), rows['high'].to_numpy(float),
+                                    rows['low'].to_numpy(float), rows['volume'].to_numpy(float, na_value=np.nan)):
+            self.advance(date, c, h, l, v)
+
+    def flags(self, volume_z_threshold: float = 1.0) -> Dict[str, bool]:
+        """Kural bayrakları (panel_engine.signal_masks ile aynı kurallar, 2 barlık dizide)."""
+        prev = self.prev_values or {}
+        ind = {k: np.array([[prev.get(k, np.nan)], [self.values[k]]]) for k in STATE_KEYS}
+        close = np.array([[np.nan], [self.close]])
+        masks = signal_masks(close, ind, volume_z_threshold=volume_z_threshold)
+        return {k: bool(masks[k][-1, 0]) for k in FLAG_COLUMNS}
+
+    def result(self, volume_z_threshold: float = 1.0,
+               min_bars: int = MIN_BARS) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """compute_signals ile aynı biçimde (status, vals) döner (lot hariç)."""
+        if self.bars < min_bars:
+            return STATUS_NO_DATA, None
+        return build_signal_result(self.symbol, self.close, self.values, self.flags(volume_z_threshold),
+                                   str(self.last_date.date()), volume_z_threshold)
+
+
+def states_from_panel(panel: Panel, ind: Dict[str, np.ndarray], slope_period: int = 5,
+                      min_bars: int = MIN_BARS) -> Dict[str, IndicatorState]:
+    """Panelin son barından sembol durumlarını tohumlar (en az min_bars barı olan semboller için;
+    böylece tüm EWM'lerin min_periods eşiği geçilmiştir)."""
+    states = {}
+    T = panel.close.shape[0]
+    for j, symbol in enumerate(panel.symbols):
+        n = int(panel.lengths[j])
+        if n < min_bars or T == 0:
+            continue
+        st = IndicatorState(symbol, slope_period)
+        close_col, vol_col = panel.close[T - n:, j], panel.volume[T - n:, j]
+        close_run = _tail_run(close_col)
+        for w, r in st.ma.items():
+            r.seed(close_col, close_run)
+        st.vol.seed(vol_col, _tail_run(vol_col))
+        st.ma20_hist = list(ind['ma20'][T - slope_period - 1:, j])
+        st.avg_gain.seed(ind['rsi_avg_gain'][-1, j], n)
+        st.avg_loss.seed(ind['rsi_avg_loss'][-1, j], n)
+        st.ema_fast.seed(ind['ema_fast'][-1, j], n)
+        st.ema_slow.seed(ind['ema_slow'][-1, j], n)
+        st.macd_signal.seed(ind['macd_signal_line'][-1, j], n)
+        st.atr.seed(ind['atr'][-1, j], n)
+        st.bars = n
+        st.close = float(close_col[-1])
+        st.last_date = pd.Timestamp(panel.dates[-1, j])
+        st.values = {k: ind[k][-1, j] for k in STATE_KEYS}
+        st.prev_values = {k: ind[k][-2, j] for k in STATE_KEYS}
+        states[symbol] = st
+    return states
+
+
+def _tail_run(col: np.ndarray) -> int:
+    """Dizinin sonundaki değerin kaç bardır aynı kaldığı."""
+    last = col[-1]
+    if last != last:
+        return 1
+    diff = np.nonzero(col[::-1] != last)[0]
+    return int(diff[0]) if len(diff) else len(col)
+
+
+
+def _rel_diff(a: float, b: float) -> float:
+    if (a != a) and (b != b):
+        return 0.0
+    if (a != a) or (b != b):
+        return np.inf
+    return abs(a - b) / max(abs(b), 1e-9)
+
+
+class StateStore:
+    """Sembol -> IndicatorState kaydı. Her durum, karşılık geldiği cache veri sürümünü taşır;
+    sürüm tutmuyorsa durum kullanılmaz (panel motoruyla yeniden hesaplanıp tohumlanır).
+    verify=True iken durumdan gelen her sonuç toplu hesaplamayla karşılaştırılır."""
+
+    def __init__(self, slope_period: int = 5, verify: bool = False, rtol: float = 1e-6):
+        self.slope_period = slope_period
+        self.verify = verify
+        self.rtol = rtol
+        self._states: Dict[str, IndicatorState] = {}
+        self._lock = threading.Lock()
+
+    def current(self, symbol: str, version: Any) -> Optional[IndicatorState]:
+        st = self._states.get(symbol)
+        return st if st is not None and version is not None and st.version == version else None
+
+    def seed(self, panel: Panel, ind: Dict[str, np.ndarray], versions: Dict[str, Any]):
+        fresh = states_from_panel(panel, ind, self.slope_period)
+        with self._lock:
+            for symbol, st in fresh.items():
+                st.version = versions.get(symbol)
+                self._states[symbol] = st
+
+    def on_merge(self, symbol: str, old_version: Any, new_version: Any, appended: Optional[pd.DataFrame]):
+        """Cache girdisi değişti. Sadece sona bar eklendiyse durum kopyalanıp O(1) ilerletilir;
+        geçmiş değiştiyse (ör. düzeltilmiş fiyatlar) durum düşürülür."""
+        with self._lock:
+            st = self._states.get(symbol)
+            if st is None:
+                return
+            if appended is None or appended.empty or st.version != old_version:
+                del self._states[symbol]
+                return
+        advanced = copy.deepcopy(st)  # okuyucular eski nesneyi tutarlı görmeye devam eder
+        advanced.advance_frame(appended)
+        advanced.version = new_version
+        with self._lock:
+            self._states[symbol] = advanced
+
+    def drop_all(self):
+        with self._lock:
+            self._states.clear()
+
+    def __len__(self):
+        return len(self._states)
+
+
+def compare_state(st: IndicatorState, ind: Dict[str, np.ndarray], j: int) -> float:
+    """Durumun son değerleri ile toplu hesaplamanın j. sütunu arasındaki en büyük bağıl fark."""
+    return max(_rel_diff(st.values[k], ind[k][-1, j]) for k in STATE_KEYS)
+
+
+def verify_incremental(cache: Dict[str, pd.DataFrame], symbols: List[str], replay: int = 5,
+                       slope_period: int = 5, volume_z_threshold: float = 1.0,
+                       rtol: float = 1e-6) -> Dict[str, float]:
+    """Doğrulama modu: her sembolün son `replay` barı hariç veriden durum tohumlanır, kalan barlar
+    advance() ile tek tek işlenir ve sonuç tam veri üzerindeki toplu hesaplamayla karşılaştırılır.
+    Dönüş: sembol -> gösterge değerlerindeki en büyük bağıl fark.
+    Kural bayrağı farkları ayrıca loglanır: sabit fiyatlı serilerde "RSI yükseliyor mu" gibi
+    karşılaştırmalar eşitliğe düşer ve yuvarlama gürültüsüyle her iki yöne dönebilir."""
+    syms = [s for s in symbols if s in cache and len(cache[s]) >= MIN_BARS + replay]
+    head = {s: cache[s].iloc[:-replay] for s in syms}
+    p0 = build_panel(head, syms)
+    states = states_from_panel(p0, compute_indicators(p0, slope_period, outputs=SEED_OUTPUTS), slope_period)
+    p1 = build_panel(cache, syms)
+    ind1 = compute_indicators(p1, slope_period, outputs=STATE_KEYS)
+    masks = signal_masks(p1.close, ind1, volume_z_threshold=volume_z_threshold)
+
+    worst: Dict[str, float] = {}
+    for j, s in enumerate(syms):
+        st = states.get(s)
+        if st is None:
+            continue
+        st.advance_frame(cache[s].iloc[-replay:])
+        diff = compare_state(st, ind1, j)
+        flags = st.flags(volume_z_threshold)
+        differing = [k for k in FLAG_COLUMNS if flags[k] != bool(masks[k][-1, j])]
+        if differing:
+            logger.info(f"Artımlı doğrulama {s}: bayraklar farklı {differing} (değer farkı {diff:.3g})")
+        worst[s] = diff
+        if diff > rtol:
+            logger.warning(f"Artımlı doğrulama {s}: bağıl fark {diff:.3g} > {rtol}")
+    return worst
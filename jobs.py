@@ -0,0 +1,135 @@
+# jobs.py
+
+"""
+Arka plan iş yöneticisi (bootstrap / update / tarama öncesi güncelleme).
+
+* Single-flight: aynı gruptaki bir iş çalışırken yeni istek yeni thread açmaz,
+  çalışan işi döner (iki tıklama iki bootstrap başlatmaz).
+* Her iş ilerleme bilgisini tutar: toplam / tamamlanan / hatalı sembol ve ETA.
+"""
+
+import itertools
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger('SwingScanner')
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class Job:
+    """Tek bir arka plan işinin durumu. İş fonksiyonu set_total()/advance() ile ilerleme bildirir."""
+
+    def __init__(self, job_id: int, kind: str, group: str):
+        self.id = job_id
+        self.kind = kind
+        self.group = group
+        self.status = QUEUED
+        self.total = 0
+        self.done = 0
+        self.failed = 0
+        self.last_symbol: Optional[str] = None
+        self.message = ""
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+    def set_total(self, total: int):
+        with self._lock:
+            self.total = total
+
+    def advance(self, ok: bool = True, symbol: Optional[str] = None):
+        with self._lock:
+            self.done += 1
+            if not ok:
+                self.failed += 1
+            self.last_symbol = symbol
+
+    def eta_seconds(self) -> Optional[float]:
+        if self.status != RUNNING or not self.started_at or self.done == 0 or self.total == 0:
+            return None
+        elapsed = time.time() - self.started_at
+        return max(0.0, elapsed / self.done * (self.total - self.done))
+
+    def to_dict(self) -> Dict[str, Any]:
+        end = self.finished_at or time.time()
+        eta = self.eta_seconds()
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "total": self.total,
+            "done": self.done,
+            "failed": self.failed,
+            "progress": round(self.done / self.total * 100, 1) if self.total else 0.0,
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+            "elapsed_seconds": round(end - self.started_at, 1) if self.started_at else 0.0,
+            "last_symbol": self.last_symbol,
+            "message": self.message,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """İşleri isimli daemon thread'lerde çalıştırır; grup başına tek aktif iş (single-flight)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._active: Dict[str, Job] = {}   # grup -> aktif iş
+        self._latest: Dict[str, Job] = {}   # tür -> son iş (bitmiş olabilir)
+
+    def start(self, kind: str, target: Callable[[Job], Any], group: Optional[str] = None) -> Tuple[Job, bool]:
+        """target(job) fonksiyonunu arka planda başlatır.
+        Dönüş: (iş, yeni_mi). Aynı grupta aktif iş varsa o iş ve False döner."""
+        group = group or kind
+        with self._lock:
+            running = self._active.get(group)
+            if running is not None and running.is_active:
+                return running, False
+            job = Job(next(self._ids), kind, group)
+            self._active[group] = job
+            self._latest[kind] = job
+
+        thread = threading.Thread(target=self._run, args=(job, target), name=f"job-{kind}-{job.id}", daemon=True)
+        thread.start()
+        return job, True
+
+    def _run(self, job: Job, target: Callable[[Job], Any]):
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            result = target(job)
+            if isinstance(result, str):
+                job.message = result
+            job.status = DONE
+        except Exception as e:
+            logger.exception(f"Job {job.kind}#{job.id} hata ile bitti")
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                if self._active.get(job.group) is job:
+                    del self._active[job.group]
+
+    def get(self, kind: str) -> Optional[Job]:
+        with self._lock:
+            return self._latest.get(kind)
+
+    def active(self, group: str) -> Optional[Job]:
+        with self._lock:
+            return self._active.get(group)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            jobs = list(self._latest.values())
+        return {j.kind: j.to_dict() for j in jobs}
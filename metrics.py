@@ -0,0 +1,314 @@
+# metrics.py
+
+"""
+Hafif ölçüm altyapısı: sayaç (Counter), anlık değer (Gauge) ve gecikme histogramı (Histogram),
+Prometheus metin biçiminde (/metrics) dışa aktarım ve istek bazlı profil.
+
+* Harici bağımlılık yoktur; her gözlem bir kilit altında birkaç toplama işlemidir (sıcak yolda ucuz).
+* timed("aşama") hem bağlam yöneticisi hem dekoratördür; süreyi swing_stage_seconds{stage=...}
+  histogramına yazar. O thread'de bir profil açıksa (start_profile) aşama ve sembol süreleri profile de eklenir.
+* Gauge'lar değerini kazıma (scrape) anında bir fonksiyondan okuyabilir (cache boyutu, bellek).
+"""
+
+import bisect
+import contextvars
+import functools
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[str, ...]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[Any]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelKey:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: etiketler {self.labelnames} olmalı, verilen: {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        """(örnek adı, etiket metni, değer) üçlüleri."""
+        return ()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(f"{name}{labels} {_format_value(value)}" for name, labels, value in self.samples())
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [(self.name, _format_labels(self.labelnames, k), v) for k, v in items]
+
+
+class Gauge(_Metric):
+    """set() ile yazılan veya fn() ile kazıma anında okunan değer. fn etiketliyse {etiket değerleri: değer} döner."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), fn: Optional[Callable[[], Any]] = None):
+        super().__init__(name, help, labelnames)
+        self.fn = fn
+        self._values: Dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self):
+        if self.fn is not None:
+            value = self.fn()
+            if not self.labelnames:
+                return [] if value is None else [(self.name, "", value)]
+            items = sorted((tuple(map(str, k if isinstance(k, tuple) else (k,))), v) for k, v in value.items())
+        else:
+            with self._lock:
+                items = sorted(self._values.items())
+        return [(self.name, _format_labels(self.labelnames, k), v) for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelKey, List[float]] = {}  # [kova sayıları..., +Inf, toplam, adet]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        out = []
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                out.append((f"{self.name}_bucket", _format_labels(self.labelnames + ("le",), key + (_format_value(bound),)),
+                            cumulative))
+            out.append((f"{self.name}_sum", _format_labels(self.labelnames, key), series[-2]))
+            out.append((f"{self.name}_count", _format_labels(self.labelnames, key), series[-1]))
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metrik zaten kayıtlı: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Prometheus metin biçimi (text/plain; version=0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, help, labelnames))
+
+
+def gauge(name: str, help: str, labelnames: Sequence[str] = (), fn: Optional[Callable[[], Any]] = None) -> Gauge:
+    return REGISTRY.register(Gauge(name, help, labelnames, fn))
+
+
+def histogram(name: str, help: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, help, labelnames, buckets))
+
+
+STAGE_SECONDS = histogram("swing_stage_seconds", "Aşama süresi (saniye).", ("stage",))
+
+
+# ---------- İstek bazlı profil ----------
+
+class Profile:
+    """Bir isteğin aşama ve sembol süreleri (sadece profil açıkken toplanır)."""
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.started_at = time.time()
+        self.t0 = time.perf_counter()
+        self.seconds = 0.0
+        self.stages: Dict[str, List[float]] = {}  # aşama -> [adet, toplam, en uzun]
+        self.symbols: Dict[Tuple[str, str], float] = {}  # (aşama, sembol) -> toplam süre
+        self._lock = threading.Lock()
+
+    def add_stage(self, stage: str, seconds: float):
+        with self._lock:
+            s = self.stages.setdefault(stage, [0, 0.0, 0.0])
+            s[0] += 1
+            s[1] += seconds
+            s[2] = max(s[2], seconds)
+
+    def add_symbol(self, stage: str, symbol: str, seconds: float):
+        with self._lock:
+            key = (stage, symbol)
+            self.symbols[key] = self.symbols.get(key, 0.0) + seconds
+
+    def finish(self) -> "Profile":
+        self.seconds = time.perf_counter() - self.t0
+        return self
+
+    def slowest_stages(self, top: int = 10) -> List[Dict[str, Any]]:
+        items = sorted(self.stages.items(), key=lambda kv: kv[1][1], reverse=True)[:top]
+        return [{"stage": k, "count": int(v[0]), "total_ms": round(v[1] * 1000, 3), "max_ms": round(v[2] * 1000, 3)}
+                for k, v in items]
+
+    def slowest_symbols(self, top: int = 10) -> List[Dict[str, Any]]:
+        items = sorted(self.symbols.items(), key=lambda kv: kv[1], reverse=True)[:top]
+        return [{"stage": stage, "symbol": symbol, "ms": round(sec * 1000, 3)} for (stage, symbol), sec in items]
+
+    def server_timing(self, top: int = 10) -> str:
+        """Server-Timing başlığı (tarayıcı geliştirici araçlarında görünür)."""
+        parts = [f"{s['stage'].replace(' ', '_')};dur={s['total_ms']}" for s in self.slowest_stages(top)]
+        return ", ".join(parts + [f"total;dur={round(self.seconds * 1000, 3)}"])
+
+    def to_dict(self, top: int = 10) -> Dict[str, Any]:
+        return {"label": self.label, "started_at": self.started_at, "total_ms": round(self.seconds * 1000, 3),
+                "stages": self.slowest_stages(top), "symbols": self.slowest_symbols(top)}
+
+
+_PROFILE: "contextvars.ContextVar[Optional[Profile]]" = contextvars.ContextVar("swing_profile", default=None)
+RECENT_PROFILES: "deque[Dict[str, Any]]" = deque(maxlen=20)
+
+
+def start_profile(label: str = "") -> contextvars.Token:
+    return _PROFILE.set(Profile(label))
+
+
+def end_profile(token: contextvars.Token) -> Optional[Profile]:
+    profile = _PROFILE.get()
+    _PROFILE.reset(token)
+    return profile.finish() if profile is not None else None
+
+
+def observe_stage(stage: str, seconds: float, symbol: Optional[str] = None):
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    profile = _PROFILE.get()
+    if profile is not None:
+        profile.add_stage(stage, seconds)
+        if symbol is not None:
+            profile.add_symbol(stage, symbol, seconds)
+
+
+class timed:
+    """Aşama süresini ölçer. `with timed("db_read"):` veya `@timed("scan")` olarak kullanılır.
+    symbol verilirse profil açıkken sembol süresi de kaydedilir."""
+
+    def __init__(self, stage: str, symbol: Optional[str] = None):
+        self.stage = stage
+        self.symbol = symbol
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe_stage(self.stage, time.perf_counter() - self._t0, self.symbol)
+        return False
+
+    def __call__(self, fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe_stage(self.stage, time.perf_counter() - t0, self.symbol)
+        return wrapper
+
+
+def timed_symbol(stage: str) -> Callable[[Callable], Callable]:
+    """İlk argümanı sembol olan fonksiyonlar için dekoratör: aşama süresi + profilde sembol süresi."""
+    def decorate(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(symbol, *args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(symbol, *args, **kwargs)
+            finally:
+                observe_stage(stage, time.perf_counter() - t0, symbol)
+        return wrapper
+    return decorate
+
+
+def process_rss_bytes() -> Optional[int]:
+    """Sürecin anlık RSS belleği (Linux /proc); yoksa tepe RSS (resource) ya da None."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+    except (ImportError, AttributeError):
+        return None
@@ -0,0 +1,181 @@
+# optimizer.py
+
+"""
+Sinyal eşikleri için paralel parametre taraması (grid / random search).
+
+* Pahalı gösterge dizileri (MA, RSI, MACD, ATR, hacim Z-Score) backtest.prepare_backtest ile bir kez
+  hesaplanır. Her kombinasyon sadece kural maskelerini ve çıkış simülasyonunu yeniden çalıştırır
+  (MA20 eğim periyodu değişirse sadece eğim yeniden hesaplanır).
+* Diziler geçici bir klasöre .npy olarak yazılır; process worker'ları bunları mmap ile bir kez açar.
+  Worker'lara giden görevler sadece parametre sözlükleridir.
+* Sonuçlar seçilen ölçüte göre sıralanıp CSV olarak yazılır (en az min_trades işlemi olan setler önde).
+"""
+
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, fields, replace
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from backtest import BacktestConfig, BacktestData, simulate
+
+logger = logging.getLogger('SwingScanner')
+
+# VOLUME_ZSCORE_THRESHOLD, MA_SLOPE_PERIOD, pullback bandı, RSI eşiği ve ATR% bantları
+DEFAULT_GRID: Dict[str, List[Any]] = {
+    "volume_z_threshold": [0.5, 1.0, 1.5, 2.0],
+    "slope_period": [3, 5, 10],
+    "pullback_band": [0.01, 0.02, 0.03],
+    "rsi_max": [45.0, 50.0, 55.0, 60.0],
+    "atr_low_band": [1.5, 2.0, 2.5],
+    "atr_high_band": [4.0, 5.0, 6.0],
+}
+
+METRIC_COLUMNS = ["trades", "win_rate", "avg_r", "profit_factor", "total_return_pct", "max_drawdown_pct", "sharpe"]
+RANK_METRICS = ("avg_r", "win_rate", "profit_factor", "total_return_pct", "max_drawdown_pct", "sharpe")
+
+
+def check_grid(grid: Dict[str, Sequence[Any]]):
+    """Grid anahtarları BacktestConfig alanı, değerleri boş olmayan liste olmalı (hata worker'larda değil burada)."""
+    unknown = sorted(set(grid) - {f.name for f in fields(BacktestConfig)})
+    if unknown:
+        raise ValueError(f"Bilinmeyen grid parametresi: {', '.join(unknown)} "
+                         f"(geçerli: {', '.join(f.name for f in fields(BacktestConfig))})")
+    empty = [k for k, v in grid.items() if not isinstance(v, (list, tuple)) or not v]
+    if empty:
+        raise ValueError(f"Grid değerleri boş olmayan liste olmalı: {', '.join(empty)}")
+
+
+def grid_size(grid: Dict[str, Sequence[Any]]) -> int:
+    return math.prod(len(v) for v in grid.values())
+
+
+def parameter_grid(grid: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Tüm kombinasyonlar (grid search)."""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def sample_grid(grid: Dict[str, Sequence[Any]], n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Gridden tekrarsız n rastgele kombinasyon (random search). n >= grid boyutu ise tüm grid."""
+    total = grid_size(grid)
+    if n >= total:
+        return parameter_grid(grid)
+    keys = list(grid)
+    rng = random.Random(seed)
+    picks = []
+    for flat in rng.sample(range(total), n):
+        params = {}
+        for k in reversed(keys):  # karma tabanlı indeks -> her boyutun değeri
+            flat, i = divmod(flat, len(grid[k]))
+            params[k] = grid[k][i]
+        picks.append({k: params[k] for k in keys})
+    return picks
+
+
+def save_data(data: BacktestData, path: str):
+    """Worker'ların mmap ile açacağı diziler."""
+    os.makedirs(path, exist_ok=True)
+    arrays = {"close": data.close, "high": data.high, "low": data.low, "dates": data.dates, "lengths": data.lengths}
+    arrays.update({f"ind_{k}": v for k, v in data.ind.items()})
+    for name, arr in arrays.items():
+        np.save(os.path.join(path, f"{name}.npy"), arr)
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"symbols": data.symbols, "slope_period": data.slope_period, "ind": list(data.ind)}, f)
+
+
+def load_data(path: str) -> BacktestData:
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    load = lambda name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+    return BacktestData(meta["symbols"], load("close"), load("high"), load("low"), load("dates"),
+                        np.asarray(load("lengths")), {k: load(f"ind_{k}") for k in meta["ind"]},
+                        meta["slope_period"])
+
+
+def evaluate(data: BacktestData, base: BacktestConfig, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Tek parametre setinin backtest ölçütleri."""
+    stats = simulate(data, replace(base, **params)).stats
+    row = dict(params)
+    row.update({m: stats.get(m) for m in METRIC_COLUMNS})
+    row["trades"] = stats.get("trades", 0)
+    return row
+
+
+# Worker process'te bir kez yüklenen veri
+_WORKER_DATA: Optional[BacktestData] = None
+
+
+def _init_worker(path: str):
+    global _WORKER_DATA
+    _WORKER_DATA = load_data(path)
+
+
+def _evaluate_chunk(base: Dict[str, Any], chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    config = BacktestConfig(**base)
+    return [evaluate(_WORKER_DATA, config, params) for params in chunk]
+
+
+def rank_results(rows: List[Dict[str, Any]], rank_by: str = "avg_r", min_trades: int = 30) -> pd.DataFrame:
+    """Ölçüte göre sıralar; min_trades altındaki setler (istatistiksel olarak zayıf) sona atılır."""
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return df
+    df["eligible"] = df["trades"] >= min_trades
+    # Düşüş negatif yüzde olduğundan büyük değer (sıfıra yakın) daha iyidir; tüm ölçütler azalan sıralanır
+    df = df.sort_values(["eligible", rank_by], ascending=[False, False], na_position="last", kind="stable")
+    df.insert(0, "rank", range(1, len(df) + 1))
+    return df.reset_index(drop=True)
+
+
+def run_sweep(data: BacktestData, base: BacktestConfig, param_sets: List[Dict[str, Any]],
+              workers: int = 1, chunk_size: int = 8, rank_by: str = "avg_r", min_trades: int = 30,
+              progress=None) -> pd.DataFrame:
+    """param_sets'i workers process'e dağıtır; sıralı sonuç tablosunu döner.
+    progress(tamamlanan, toplam) verilirse her parça sonunda çağrılır."""
+    if rank_by not in RANK_METRICS:
+        raise ValueError(f"rank_by şunlardan biri olmalı: {', '.join(RANK_METRICS)}")
+    check_grid({k: [v] for params in param_sets for k, v in params.items()})
+    t0 = time.perf_counter()
+    chunks = [param_sets[i:i + chunk_size] for i in range(0, len(param_sets), chunk_size)]
+    parts: List[List[Dict[str, Any]]] = [[] for _ in chunks]  # tamamlanma sırasından bağımsız, deterministik
+    done = 0
+
+    if workers <= 1:
+        for i, chunk in enumerate(chunks):
+            parts[i] = [evaluate(data, base, params) for params in chunk]
+            done += len(chunk)
+            if progress:
+                progress(done, len(param_sets))
+    else:
+        tmp = tempfile.mkdtemp(prefix="swing_opt_")
+        try:
+            save_data(data, tmp)
+            base_dict = asdict(base)
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_init_worker, initargs=(tmp,)) as pool:
+                futures = {pool.submit(_evaluate_chunk, base_dict, chunk): i for i, chunk in enumerate(chunks)}
+                for future in as_completed(futures):
+                    parts[futures[future]] = future.result()
+                    done += len(parts[futures[future]])
+                    if progress:
+                        progress(done, len(param_sets))
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    rows = [row for part in parts for row in part]
+    elapsed = time.perf_counter() - t0
+    logger.info(f"Optimizasyon: {len(param_sets)} kombinasyon, {workers} worker, {elapsed:.1f} sn "
+                f"({len(param_sets) / elapsed if elapsed > 0 else 0:.1f} kombinasyon/sn)")
+    return rank_results(rows, rank_by=rank_by, min_trades=min_trades)
@@ -0,0 +1,593 @@
+# panel_engine.py
+
+"""
+Panel (vektörel) sinyal motoru.
+
+swing_signal_engine_v2 her sembol için DataFrame kopyalayıp göstergeleri tek tek hesaplar.
+Bu modül tüm evreni tek geçişte işler:
+
+1. build_panel(): Her sembolün son barlarını sağa hizalı (bar x sembol) NumPy dizilerine dizer.
+   Hizalama takvime göre değil bar sırasına göredir; sembolün kendi geçmişi aynen korunur,
+   eksik baştaki barlar NaN ile doldurulur. Böylece EWM/rolling sonuçları sembol bazlı
+   hesaplamayla birebir aynıdır (takvim hizalaması EWM'e boşluk sokardı).
+2. compute_indicators(): indicators_v2'deki göstergeleri sütun bazında, tüm semboller için
+   aynı anda hesaplar (indicator_kernels: indicators_v2 ile aynı NumPy kernelleri). Her gösterge girdilerini, çıktılarını
+   ve ısınma barlarını bildiren bir düğümdür (INDICATORS); sadece istenen çıktıların bağımlılıkları
+   hesaplanır (IndicatorGraph).
+   Göreli güç (rs_*) düğümleri panelin karşılaştırma endeksi dizisini (build_panel(benchmark=...)) kullanır ve
+   aynı tarihteki tüm semboller arasında tek geçişte yüzdelik sıraya çevrilir.
+3. signal_masks(): Trend / Pullback / Momentum / Hacim kurallarını boolean dizi işlemleriyle uygular.
+4. scan_panel(): swing_signal_engine_v2 ile aynı (status, vals) çıktısını sembol sırasıyla üretir.
+
+Tarama yolunda panel ve gösterge dizileri her seferinde yeniden ayrılmaz: scratch (thread başına
+ScratchBuffers) verilirse çıktılar önceden ayrılmış tamponlara yazılır. Bu diziler bir sonraki
+taramada üzerine yazılır; sonuçta sadece skaler değerler (build_signal_result) kalır.
+"""
+
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from compact_cache import CompactCache
+from indicator_kernels import (ewm_mean, percentile_rank, relative_strength, rolling_mean, rolling_std, rsi_averages,
+                               rsi_from_averages, shift, slope, true_range, zscore)
+
+PRICE_COLUMNS = ['close', 'high', 'low', 'volume']  # DATA_CACHE DataFrame sütunları
+PANEL_INPUTS = PRICE_COLUMNS + ['dates', 'benchmark']  # gösterge düğümlerinin doğrudan panelden okuduğu girdiler
+RS_LOOKBACKS = (21, 63, 126)  # göreli güç dönemleri (bar): ~1, 3, 6 ay
+MIN_BARS = 200  # swing_signal_engine_v2 ile aynı: MA200 için en az 200 bar
+
+STATUS_STRONG = "GÜÇLÜ SWING SİNYALİ (Pullback+Reversal)"
+STATUS_MEDIUM = "Orta SWING SİNYALİ (Hacim Eksik)"
+STATUS_TREND = "Trend Pozitif (Giriş Kriterleri Eksik)"
+STATUS_NONE = "Uygun Değil"
+STATUS_NO_DATA = "Veri Eksik (< 200 gün)"
+
+
+# ---------- TAMPONLAR ----------
+
+class ScratchBuffers:
+    """İsimli, yeniden kullanılan diziler. Tampon istenen boyuttan büyükse baş kısmı görünüm olarak
+    verilir; sadece daha büyük bir evren gelince yeniden ayrılır. Thread'ler arasında paylaşılmaz."""
+
+    def __init__(self):
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    def take(self, name: str, shape: Tuple[int, ...], dtype=np.float64) -> np.ndarray:
+        size = int(np.prod(shape))
+        arr = self._arrays.get(name)
+        if arr is None or arr.dtype != np.dtype(dtype) or arr.size < size:
+            arr = self._arrays[name] = np.empty(size, dtype=dtype)
+        return arr[:size].reshape(shape)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in self._arrays.values())
+
+    def clear(self):
+        self._arrays.clear()
+
+
+_THREAD_SCRATCH = threading.local()
+_ALL_SCRATCH: "weakref.WeakSet[ScratchBuffers]" = weakref.WeakSet()
+
+
+def thread_scratch() -> ScratchBuffers:
+    """Çağıran thread'in tamponları (ilk kullanımda oluşturulur)."""
+    scratch = getattr(_THREAD_SCRATCH, 'buffers', None)
+    if scratch is None:
+        scratch = _THREAD_SCRATCH.buffers = ScratchBuffers()
+        _ALL_SCRATCH.add(scratch)
+    return scratch
+
+
+def scratch_nbytes() -> int:
+    """Yaşayan tüm thread tamponlarının toplam boyutu."""
+    return sum(s.nbytes for s in list(_ALL_SCRATCH))
+
+
+def _take(scratch: Optional[ScratchBuffers], name: str, shape: Tuple[int, ...], dtype=np.float64) -> Optional[np.ndarray]:
+    return None if scratch is None else scratch.take(name, shape, dtype)
+
+
+# ---------- PANEL ----------
+
+@dataclass
+class Panel:
+    symbols: List[str]
+    close: np.ndarray    # (bar, sembol)
+    high: np.ndarray
+    low: np.ndarray
+    volume: np.ndarray
+    dates: np.ndarray    # (bar, sembol) datetime64[ns], eksik barlar NaT
+    lengths: np.ndarray  # sembol başına geçerli bar sayısı
+    benchmark: Optional[np.ndarray] = None  # (bar, sembol) her barın tarihindeki endeks kapanışı (göreli güç için)
+
+    @property
+    def last_dates(self) -> np.ndarray:
+        return self.dates[-1]
+
+
+def build_panel(cache: Dict[str, pd.DataFrame], symbols: List[str], window: Optional[int] = None,
+                scratch: Optional[ScratchBuffers] = None, benchmark: Optional[str] = None) -> Panel:
+    """cache'teki sembolleri sağa hizalı (bar x sembol) dizilere dizer. Cache'te olmayan semboller
+    tamamen NaN sütun olarak yer alır (lengths=0). CompactCache dizileri DataFrame kurmadan,
+    tek bir indeksleme ile okunur. benchmark (cache'teki endeks sembolü) verilirse panel.benchmark doldurulur."""
+    panel = (_build_panel_compact(cache, symbols, window, scratch) if isinstance(cache, CompactCache)
+             else _build_panel_frames(cache, symbols, window, scratch))
+    if benchmark and benchmark in cache:
+        panel.benchmark = align_benchmark(cache, benchmark, panel.dates)
+    return panel
+
+
+def align_benchmark(cache: Dict[str, pd.DataFrame], symbol: str, dates: np.ndarray) -> np.ndarray:
+    """Endeksin her tarihteki (o gün yoksa önceki son) kapanışı; dates ile aynı biçimde. Endeks verisinden
+    önceki ve eksik (NaT) tarihler NaN."""
+    if isinstance(cache, CompactCache):
+        index_dates, index_close = cache.entry(symbol)[:2]
+    else:
+        df = cache[symbol]
+        index_dates, index_close = df.index.as_unit('ns').asi8, df['close'].to_numpy(dtype=np.float64, na_value=np.nan)
+    keys = dates.view(np.int64)
+    pos = np.searchsorted(index_dates, keys, side='right') - 1
+    out = np.asarray(index_close, dtype=np.float64)[np.maximum(pos, 0)] if len(index_dates) else np.full(dates.shape, np.nan)
+    out[(pos < 0) | np.isnat(dates)] = np.nan
+    return out
+
+
+def _build_panel_frames(cache: Dict[str, pd.DataFrame], symbols: List[str], window: Optional[int],
+                        scratch: Optional[ScratchBuffers]) -> Panel:
+    """build_panel'in sembol -> DataFrame yolu (sembol başına bir blok kopyası)."""
+    frames = [cache.get(s) for s in symbols]
+    lengths = np.array([0 if f is None else len(f) for f in frames], dtype=np.int64)
+    if window is not None:
+        lengths = np.minimum(lengths, window)
+    T = int(lengths.max()) if len(lengths) else 0
+    N = len(symbols)
+
+    def filled(name, fill, dtype=np.float64):
+        if scratch is None:
+            return np.full((T, N), fill, dtype=dtype)
+        out = scratch.take(name, (T, N), dtype)
+        out.fill(fill)
+        return out
+
+    close = filled('panel_close', np.nan)
+    high = filled('panel_high', np.nan)
+    low = filled('panel_low', np.nan)
+    volume = filled('panel_volume', np.nan)
+    dates = filled('panel_dates', np.datetime64('NaT'), 'datetime64[ns]')
+
+    for j, f in enumerate(frames):
+        n = lengths[j]
+        if n == 0:
+            continue
+        # Tek blok dönüşümü (sütun sütun erişimden çok daha ucuz)
+        cols = f if list(f.columns) == PRICE_COLUMNS else f[PRICE_COLUMNS]
+        arr = cols.to_numpy(dtype=float, na_value=np.nan)[-n:]
+        close[T - n:, j] = arr[:, 0]
+        high[T - n:, j] = arr[:, 1]
+        low[T - n:, j] = arr[:, 2]
+        volume[T - n:, j] = arr[:, 3]
+        dates[T - n:, j] = f.index.to_numpy(dtype='datetime64[ns]')[-n:]
+    return Panel(list(symbols), close, high, low, volume, dates, lengths)
+
+
+def _build_panel_compact(cache: CompactCache, symbols: List[str], window: Optional[int],
+                         scratch: Optional[ScratchBuffers]) -> Panel:
+    """build_panel'in CompactCache yolu: her panel hücresinin kaynak satırı (bar x sembol) bir indeks
+    dizisinde hesaplanır, sütunlar tek fancy-indexing ile toplanır (sembol başına döngü yok)."""
+    pos = cache.positions(symbols)
+    found = pos >= 0
+    ends = np.where(found, cache.offsets[pos + 1], 0)
+    lengths = np.where(found, ends - cache.offsets[np.maximum(pos, 0)], 0).astype(np.int64)
+    if window is not None:
+        lengths = np.minimum(lengths, window)
+    T = int(lengths.max()) if len(lengths) else 0
+    N = len(symbols)
+
+    rows = np.arange(T)[:, np.newaxis]
+    pad = rows < (T - lengths)[np.newaxis, :]  # sağa hizalamada baştaki dolgu barları
+    src = _take(scratch, 'panel_src', (T, N), np.int64)
+    src = np.add(rows, (ends - T)[np.newaxis, :], out=src)
+    np.copyto(src, 0, where=pad)
+
+    def gather(name, values):
+        out = _take(scratch, name, (T, N))
+        if out is None:
+            out = values[src].astype(np.float64)
+        else:
+            out[...] = values[src]
+        np.copyto(out, np.nan, where=pad)
+        return out
+
+    close = gather('panel_close', cache.close)
+    high = gather('panel_high', cache.high)
+    low = gather('panel_low', cache.low)
+    raw_volume = cache.volume[src]
+    volume = gather('panel_volume', cache.volume)
+    if cache.volume_missing is not None:
+        np.copyto(volume, np.nan, where=raw_volume == cache.volume_missing)
+    dates = _take(scratch, 'panel_dates', (T, N), 'datetime64[ns]')
+    if dates is None:
+        dates = np.empty((T, N), dtype='datetime64[ns]')
+    dates.view(np.int64)[...] = cache.axis[cache.date_pos[src]]
+    np.copyto(dates, np.datetime64('NaT'), where=pad)
+    return Panel(list(symbols), close, high, low, volume, dates, lengths)
+
+
+# ---------- GÖSTERGE GRAFİĞİ ----------
+
+@dataclass(frozen=True)
+class Indicator:
+    """Gösterge düğümü. inputs: fiyat sütunları veya başka düğümlerin çıktıları; lookback: ilk geçerli
+    değerden önce girdilerin üzerine gereken bar sayısı (required_bars ile yol boyunca toplanır); eğim periyoduna
+    bağlıysa lookback(slope_period) -> int.
+    fn(girdiler, buf, slope_period) çıktıları `outputs` sırasıyla döner; buf(ad) scratch tamponu
+    (scratch yoksa None: çıktı yeni dizi olarak ayrılır)."""
+    name: str
+    inputs: Tuple[str, ...]
+    outputs: Tuple[str, ...]
+    lookback: Union[int, Callable[[int], int]]
+    fn: Callable[..., Tuple[np.ndarray, ...]]
+
+    def bars(self, slope_period: int) -> int:
+        return self.lookback(slope_period) if callable(self.lookback) else self.lookback
+
+
+INDICATORS: Dict[str, Indicator] = {}  # çıktı adı -> onu üreten düğüm (kayıt sırasıyla)
+
+
+def register_indicator(name: str, inputs: Tuple[str, ...], fn: Callable[..., Tuple[np.ndarray, ...]],
+                       outputs: Optional[Tuple[str, ...]] = None,
+                       lookback: Union[int, Callable[[int], int]] = 0) -> Indicator:
+    node = Indicator(name, tuple(inputs), tuple(outputs or (name,)), lookback, fn)
+    for out in node.outputs:
+        INDICATORS[out] = node
+    return node
+
+
+def _nan_output(like: np.ndarray, out: Optional[np.ndarray]) -> np.ndarray:
+    if out is None:
+        return np.full(like.shape, np.nan)
+    out.fill(np.nan)
+    return out
+
+
+def _relative_strength(x, buf, slope_period, period):
+    out = buf(f'rs_{period}')
+    if x['benchmark'] is None:  # Panel endeks olmadan kuruldu
+        return (_nan_output(x['close'], out),)
+    return (relative_strength(x['close'], x['benchmark'], period, out=out),)
+
+
+def _rs_composite(x, buf, slope_period):
+    """Dönem sıralarının ortalaması, aynı gün yeniden yüzdelik sıraya çevrilir (herhangi bir dönem eksikse NaN)."""
+    mean = np.add.reduce([x[f'rs_rank_{n}'] for n in RS_LOOKBACKS]) / len(RS_LOOKBACKS)
+    return (percentile_rank(mean, x['dates'].view(np.int64), out=buf('rs_rank')),)
+
+
+def _rsi_averages(x, buf, slope_period):
+    return rsi_averages(x['close'], 14, out_gain=buf('rsi_avg_gain'), out_loss=buf('rsi_avg_loss'))
+
+
+def _rsi(x, buf, slope_period):
+    return (rsi_from_averages(x['rsi_avg_gain'], x['rsi_avg_loss'], out=buf('rsi')),)
+
+
+def _atr_percent(x, buf, slope_period):
+    atr_percent = np.divide(x['atr'], x['close'], out=buf('atr_percent'))
+    return (np.multiply(atr_percent, 100, out=atr_percent),)
+
+
+def _volume_zscore(x, buf, slope_period):
+    return (zscore(x['volume'], x['volume_ma'], x['volume_std'], out=buf('volume_zscore')),)
+
+
+for _w in (20, 50, 200):
+    register_indicator(f'ma{_w}', ('close',), lambda x, buf, sp, w=_w: (rolling_mean(x['close'], w, out=buf(f'ma{w}')),),
+                       lookback=_w - 1)
+register_indicator('rsi_avg', ('close',), _rsi_averages, outputs=('rsi_avg_gain', 'rsi_avg_loss'), lookback=14)
+register_indicator('rsi', ('rsi_avg_gain', 'rsi_avg_loss'), _rsi)
+# MACD (calculate_macd)
+register_indicator('ema_fast', ('close',), lambda x, buf, sp: (ewm_mean(x['close'], 2.0 / (12 + 1), out=buf('ema_fast')),))
+register_indicator('ema_slow', ('close',), lambda x, buf, sp: (ewm_mean(x['close'], 2.0 / (26 + 1), out=buf('ema_slow')),))
+register_indicator('macd', ('ema_fast', 'ema_slow'),
+                   lambda x, buf, sp: (np.subtract(x['ema_fast'], x['ema_slow'], out=buf('macd')),))
+register_indicator('macd_signal_line', ('macd',),
+                   lambda x, buf, sp: (ewm_mean(x['macd'], 2.0 / (9 + 1), out=buf('macd_signal_line')),))
+register_indicator('macd_hist', ('macd', 'macd_signal_line'),
+                   lambda x, buf, sp: (np.subtract(x['macd'], x['macd_signal_line'], out=buf('macd_hist')),))
+# ATR (calculate_atr)
+register_indicator('tr', ('high', 'low', 'close'),
+                   lambda x, buf, sp: (true_range(x['high'], x['low'], x['close'], out=buf('tr')),), lookback=1)
+register_indicator('atr', ('tr',), lambda x, buf, sp: (ewm_mean(x['tr'], 2.0 / (14 + 1), min_periods=14, out=buf('atr')),),
+                   lookback=13)
+register_indicator('atr_percent', ('atr', 'close'), _atr_percent)
+register_indicator('volume_ma', ('volume',), lambda x, buf, sp: (rolling_mean(x['volume'], 20, out=buf('volume_ma')),),
+                   lookback=19)
+register_indicator('volume_std', ('volume',), lambda x, buf, sp: (rolling_std(x['volume'], 20, out=buf('volume_std')),),
+                   lookback=19)
+register_indicator('volume_zscore', ('volume', 'volume_ma', 'volume_std'), _volume_zscore)
+# MA20 eğimi (calculate_ma_slope); lookback grafiğin eğim periyodu kadar
+register_indicator('ma20_slope', ('ma20',),
+                   lambda x, buf, sp: (slope(x['ma20'], sp, out=buf('ma20_slope')),), lookback=lambda sp: sp)
+# Göreli güç: endekse göre getiri ve aynı gündeki semboller arasında yüzdelik sıra (0-100, 100 en güçlü)
+for _n in RS_LOOKBACKS:
+    register_indicator(f'rs_{_n}', ('close', 'benchmark'),
+                       lambda x, buf, sp, n=_n: _relative_strength(x, buf, sp, n), lookback=_n)
+    register_indicator(f'rs_rank_{_n}', (f'rs_{_n}', 'dates'),
+                       lambda x, buf, sp, n=_n: (percentile_rank(x[f'rs_{n}'], x['dates'].view(np.int64),
+                                                                 out=buf(f'rs_rank_{n}')),))
+register_indicator('rs_rank', tuple(f'rs_rank_{n}' for n in RS_LOOKBACKS) + ('dates',), _rs_composite)
+
+
+def resolve_indicators(outputs: Iterable[str]) -> List[Indicator]:
+    """İstenen çıktılar için gereken düğümler, bağımlılık sırasıyla (her düğüm bir kez)."""
+    order: List[Indicator] = []
+    seen = set()
+
+    def visit(name: str):
+        if name in PANEL_INPUTS:
+            return
+        node = INDICATORS.get(name)
+        if node is None:
+            raise KeyError(f"Bilinmeyen gösterge: {name}")
+        if node.name in seen:
+            return
+        seen.add(node.name)
+        for dep in node.inputs:
+            visit(dep)
+        order.append(node)
+
+    for name in outputs:
+        visit(name)
+    return order
+
+
+def required_bars(outputs: Iterable[str], slope_period: int = 5) -> int:
+    """Çıktıların ilk geçerli değeri için gereken en az bar sayısı (bağımlılık yolu boyunca)."""
+    memo: Dict[str, int] = {}
+
+    def bars(name: str) -> int:
+        if name in PANEL_INPUTS:
+            return 0
+        node = INDICATORS[name]
+        if node.name not in memo:
+            memo[node.name] = node.bars(slope_period) + max((bars(d) for d in node.inputs), default=0)
+        return memo[node.name]
+
+    return 1 + max((bars(n) for n in outputs), default=0)
+
+
+class IndicatorGraph:
+    """Bir panel üzerinde gösterge grafiği. graph['rsi'] sadece RSI'ın ihtiyaç duyduğu düğümleri hesaplar
+    (tembel); her düğüm bir kez hesaplanır ve sonucu saklanır. evaluate(outputs) istenenleri toplu hesaplar
+    ve istenmeyen ara dizileri son tüketicilerinden hemen sonra bırakır."""
+
+    def __init__(self, panel: Panel, slope_period: int = 5, scratch: Optional[ScratchBuffers] = None):
+        self.panel = panel
+        self.slope_period = slope_period
+        self.scratch = scratch
+        self.values: Dict[str, np.ndarray] = {}
+        self.computed: List[str] = []  # hesaplanan düğümler (sırasıyla)
+        self._lock = threading.RLock()
+
+    def _buf(self, name: str) -> Optional[np.ndarray]:
+        return _take(self.scratch, name, self.panel.close.shape)
+
+    def _input(self, name: str) -> np.ndarray:
+        return getattr(self.panel, name) if name in PANEL_INPUTS else self.values[name]
+
+    def _run(self, node: Indicator):
+        outs = node.fn({d: self._input(d) for d in node.inputs}, self._buf, self.slope_period)
+        self.values.update(zip(node.outputs, outs))
+        self.computed.append(node.name)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        if name in PANEL_INPUTS:
+            return getattr(self.panel, name)
+        with self._lock:
+            if name not in self.values:
+                for node in resolve_indicators([name]):
+                    if any(o not in self.values for o in node.outputs):
+                        self._run(node)
+            return self.values[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in PANEL_INPUTS or name in INDICATORS
+
+    def required_bars(self, outputs: Iterable[str]) -> int:
+        """required_bars bu grafiğin eğim periyoduyla."""
+        return required_bars(outputs, self.slope_period)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(v.nbytes for v in self.values.values())
+
+    def evaluate(self, outputs: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+        """İstenen çıktılar (None: tümü) -> dizi. Ara çıktılar kalan tüketici sayısı sıfıra inince bırakılır."""
+        wanted = list(dict.fromkeys(outputs if outputs is not None else INDICATORS))
+        order = resolve_indicators(wanted)
+        pending: Dict[str, int] = {}
+        for node in order:
+            for dep in node.inputs:
+                if dep not in PANEL_INPUTS:
+                    pending[dep] = pending.get(dep, 0) + 1
+        keep = set(wanted)
+        with self._lock:
+            for node in order:
+                if any(o not in self.values for o in node.outputs):
+                    self._run(node)
+                for dep in node.inputs:
+                    if dep in pending:
+                        pending[dep] -= 1
+                        if pending[dep] == 0 and dep not in keep:
+                            self.values.pop(dep, None)
+            for name in [k for k in self.values if k not in keep]:
+                del self.values[name]  # çok çıktılı düğümlerin istenmeyen çıktıları
+            return {k: self.values[k] for k in wanted}
+
+
+def compute_indicators(panel: Panel, slope_period: int = 5, scratch: Optional[ScratchBuffers] = None,
+                       outputs: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+    """indicators_v2 + MA'ları tüm semboller için sütun bazında hesaplar.
+    Anahtarlar swing_signal_engine_v2'deki DataFrame sütun adlarıyla aynıdır. outputs verilirse sadece
+    onlar (ve bağımlılıkları) hesaplanır, sonuçta sadece onlar döner (None: tüm göstergeler).
+    scratch verilirse sonuç dizileri tamponlara yazılır (bir sonraki çağrıda üzerine yazılır)."""
+    return IndicatorGraph(panel, slope_period, scratch).evaluate(outputs)
+
+
+def signal_masks(close: np.ndarray, ind: Dict[str, np.ndarray], volume_z_threshold: float = 1.0,
+                 pullback_band: float = 0.02, rsi_max: float = 55.0) -> Dict[str, np.ndarray]:
+    """V2 kurallarını tüm barlar ve semboller için boolean dizilere çevirir (NaN karşılaştırmaları False)."""
+    ma20, ma50, ma200 = ind['ma20'], ind['ma50'], ind['ma200']
+    rsi, hist = ind['rsi'], ind['macd_hist']
+    prev_rsi, prev_hist = shift(rsi, 1), shift(hist, 1)
+    with np.errstate(invalid='ignore'):
+        m = {
+            'is_trend_ok': (close > ma20) & (ma20 > ma50) & (ma50 > ma200),
+            'is_ma20_up': ind['ma20_slope'] > 0,
+            'is_pullback_ok': (close >= ma20 * (1 - pullback_band)) & (close <= ma20 * (1 + pullback_band)),
+            'is_rsi_reversal': (rsi < rsi_max) & (rsi > prev_rsi),
+            'is_macd_reversal': (hist > 0) & (prev_hist < 0),
+            'is_volume_spike': ind['volume_zscore'] >= volume_z_threshold,
+        }
+    m['is_momentum_ok'] = m['is_rsi_reversal'] | m['is_macd_reversal']
+    m['is_strong'] = m['is_trend_ok'] & m['is_ma20_up'] & m['is_pullback_ok'] & m['is_momentum_ok'] & m['is_volume_spike']
+    m['is_medium'] = m['is_trend_ok'] & m['is_pullback_ok'] & m['is_momentum_ok']
+    return m
+
+
+def dynamic_atr_multiplier(atr_percent: np.ndarray, low_band: float = 2.0, high_band: float = 5.0) -> np.ndarray:
+    """get_dynamic_atr_multiplier'ın vektörel hali (NaN -> 1.5, skaler sürümle aynı).
+    low_band / high_band: ATR% bant sınırları (optimizasyon için parametrik)."""
+    with np.errstate(invalid='ignore'):
+        return np.where(atr_percent < low_band, 2.5, np.where(atr_percent > high_band, 1.0, 1.5))
+
+
+def position_size(price: float, atr: float, multiplier: float,
+                  risk_per_trade: float, portfolio_size: float) -> Tuple[float, Any]:
+    """Dinamik SL ve önerilen lot (swing_signal_engine_v2 ile aynı kurallar). Dönüş: (stop_loss, lot)."""
+    stop_loss = np.nan
+    recommended_lot = np.nan
+    if pd.notna(atr) and atr > 0:
+        stop_loss = round(price - (multiplier * atr), 2)
+        risk_amount = portfolio_size * risk_per_trade
+        risk_per_lot = price - stop_loss
+        MIN_RISK_PER_LOT = 0.01
+        if risk_per_lot > MIN_RISK_PER_LOT:
+            recommended_lot = int(risk_amount / risk_per_lot)
+        else:
+            recommended_lot = 0
+    return stop_loss, recommended_lot
+
+
+def describe_signal(flags: Dict[str, bool], volume_z_threshold: float) -> Tuple[str, List[str]]:
+    """Kural bayraklarından durum metni ve neden listesini üretir (swing_signal_engine_v2 metinleri)."""
+    reason = []
+    if not flags['is_trend_ok']:
+        reason.append("Trend: MA'lar doğru sıralanmamış.")
+    if flags['is_trend_ok'] and flags['is_ma20_up']:
+        reason.append("Trend: **MA Sıralaması ve MA20 Eğimi Pozitif.**")
+    if flags['is_pullback_ok']:
+        reason.append("Pullback: **Fiyat, MA20 Destek Aralığında.**")
+    else:
+        reason.append("Pullback: Fiyat MA20'den uzak.")
+    if flags['is_momentum_ok']:
+        if flags['is_rsi_reversal']: reason.append("Momentum: **RSI Dönüşü Onayı.**")
+        if flags['is_macd_reversal']: reason.append("Momentum: **MACD 0 Çizgisi Kırılımı.**")
+    else:
+        reason.append("Momentum: Dönüş sinyali yok.")
+    if flags['is_volume_spike']:
+        reason.append(f"Hacim: **İstatistiksel Yükseliş (Z>{volume_z_threshold}).**")
+    else:
+        reason.append("Hacim: Normal seviyede.")
+
+    if flags['is_strong']:
+        status = STATUS_STRONG
+    elif flags['is_medium']:
+        status = STATUS_MEDIUM
+    elif flags['is_trend_ok']:
+        status = STATUS_TREND
+    else:
+        status = STATUS_NONE
+    return status, reason
+
+
+VALUE_COLUMNS = ["ma20", "ma50", "ma200", "rsi", "macd_hist", "volume_zscore", "ma20_slope", "atr", "atr_percent"]
+SIGNAL_OUTPUTS = tuple(VALUE_COLUMNS)  # compute_signals / signal_masks'in ihtiyaç duyduğu göstergeler
+FLAG_COLUMNS = ["is_trend_ok", "is_ma20_up", "is_pullback_ok", "is_rsi_reversal", "is_macd_reversal",
+                "is_momentum_ok", "is_volume_spike", "is_strong", "is_medium"]
+
+
+def build_signal_result(symbol: str, price: float, values: Dict[str, float], flags: Dict[str, bool],
+                        analysis_date: str, volume_z_threshold: float) -> Tuple[str, Dict[str, Any]]:
+    """Tek sembolün son bar değerleri ve kural bayraklarından (status, vals) üretir (lot hariç)."""
+    status, reason = describe_signal(flags, volume_z_threshold)
+    vals = {"symbol": symbol, "price": price}
+    vals.update({k: values[k] for k in VALUE_COLUMNS[:7]})
+    vals.update({
+        "atr": values['atr'],
+        "atr_percent": values['atr_percent'],
+        "dynamic_multiplier": float(dynamic_atr_multiplier(values['atr_percent'])),
+        "analysis_date": analysis_date,
+        "signal_reason": " | ".join(reason),
+        "is_strong_signal": flags['is_strong'],
+    })
+    return status, vals
+
+
+def compute_signals(panel: Panel, volume_z_threshold: float = 1.0, slope_period: int = 5,
+                    min_bars: int = MIN_BARS,
+                    ind: Optional[Dict[str, np.ndarray]] = None) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+    """Tüm evreni tek geçişte değerlendirir. Sonuçlar sadece fiyat verisine bağlıdır; stop_loss ve
+    recommended_lot (risk ayarına bağlı) apply_position_sizing ile sonradan eklenir.
+    ind verilirse (önceden hesaplanmış göstergeler) tekrar hesaplanmaz."""
+    if panel.close.shape[0] == 0:
+        return [(STATUS_NO_DATA, None) for _ in panel.symbols]
+
+    if ind is None:
+        ind = compute_indicators(panel, slope_period=slope_period, outputs=SIGNAL_OUTPUTS)
+    # Bayraklar sadece son bar için gerekir; kurallar en fazla bir önceki bara baktığından son iki bar yeter
+    masks = signal_masks(panel.close[-2:], {k: v[-2:] for k, v in ind.items()},
+                         volume_z_threshold=volume_z_threshold)
+    last_vals = {k: ind[k][-1] for k in VALUE_COLUMNS}
+    last_flags = {k: masks[k][-1] for k in FLAG_COLUMNS}
+    price = panel.close[-1]
+    last_dates = panel.last_dates
+
+    results = []
+    for j, symbol in enumerate(panel.symbols):
+        if panel.lengths[j] < min_bars:
+            results.append((STATUS_NO_DATA, None))
+            continue
+        results.append(build_signal_result(
+            symbol, price[j],
+            {k: v[j] for k, v in last_vals.items()},
+            {k: bool(v[j]) for k, v in last_flags.items()},
+            str(pd.Timestamp(last_dates[j]).date()), volume_z_threshold))
+    return results
+
+
+def apply_position_sizing(vals: Dict[str, Any], risk_per_trade: float, portfolio_size: float) -> Dict[str, Any]:
+    """Önbellekteki (paylaşılan) sonucu değiştirmeden, risk ayarına göre stop_loss/lot eklenmiş kopyasını döner."""
+    stop_loss, lot = position_size(vals["price"], vals["atr"], vals["dynamic_multiplier"],
+                                   risk_per_trade, portfolio_size)
+    sized = dict(vals)
+    sized["stop_loss"] = stop_loss
+    sized["recommended_lot"] = lot
+    return sized
+
+
+def scan_panel(panel: Panel, risk_per_trade: float, portfolio_size: float,
+               volume_z_threshold: float = 1.0, slope_period: int = 5,
+               min_bars: int = MIN_BARS) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+    """Tüm evreni tek geçişte tarar. Çıktı sembol sırasıyla swing_signal_engine_v2'nin
+    (status, vals) sonuçlarıyla aynıdır."""
+    return [(status, apply_position_sizing(vals, risk_per_trade, portfolio_size) if vals is not None else None)
+            for status, vals in compute_signals(panel, volume_z_threshold, slope_period, min_bars)]
@@ -0,0 +1,238 @@
+# price_store.py
+
+"""
+prices tablosu için toplu (bulk) yazıcı.
+
+pandas.to_sql(method='multi') yerine executemany + INSERT ... ON CONFLICT DO UPDATE kullanır:
+* Tek bir UNIQUE(symbol, date) çakışması artık tüm eklemeyi düşürmez; mevcut bar güncellenir.
+* Birden çok sembolün satırları tek bir transaction içinde yazılır.
+* Eklenen / güncellenen / atlanan satır sayıları ve satır/sn verimi raporlanır.
+
+Okuma tarafında read_windows() her sembolün sadece son K barını tek sorguda getirir.
+"""
+
+import sqlite3
+import time
+from dataclasses import dataclass
+from itertools import repeat
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import pandas as pd
+
+from metrics import counter, observe_stage
+
+# Değerler değişmediyse satır güncellenmez (atlandı sayılır)
+UPSERT_SQL = """
+    INSERT INTO prices (symbol, date, close, high, low, volume)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(symbol, date) DO UPDATE SET
+        close = excluded.close,
+        high = excluded.high,
+        low = excluded.low,
+        volume = excluded.volume
+    WHERE prices.close IS NOT excluded.close
+       OR prices.high IS NOT excluded.high
+       OR prices.low IS NOT excluded.low
+       OR prices.volume IS NOT excluded.volume
+"""
+
+# Sembol başına son K bar: her sembol için başlangıç tarihi UNIQUE(symbol, date) indeksinde
+# K adım geriye inilerek bulunur (OFFSET K-1), sonra aynı indeks üzerinden aralık taraması yapılır.
+# Tam geçmiş hiç okunmaz. K'dan az barı olan sembolde alt sorgu NULL döner -> tüm barlar.
+# Üst sınır (date < ?) geçmiş tarihli (as_of) okumalar içindir; varsayılan sınır tüm barları kapsar.
+WINDOW_SQL = """
+    WITH wanted(symbol) AS (VALUES {placeholders}),
+    cut(symbol, start) AS (
+        SELECT symbol,
+               COALESCE((SELECT q.date FROM prices q WHERE q.symbol = wanted.symbol AND q.date < ?
+                         ORDER BY q.date DESC LIMIT 1 OFFSET ?), '')
+        FROM wanted
+    )
+    SELECT p.symbol, p.date, p.close, p.high, p.low, p.volume
+    FROM cut JOIN prices p ON p.symbol = cut.symbol AND p.date >= cut.start AND p.date < ?
+    ORDER BY p.symbol, p.date
+"""
+NO_END = "9999-12-31"
+
+WINDOW_CHUNK = 500  # sorgu başına sembol (SQLite parametre sınırının çok altında)
+
+PriceRow = Tuple[str, str, float, Optional[float], Optional[float], Optional[int]]
+
+ROWS_WRITTEN = counter("swing_db_rows_total", "prices tablosuna yazılan satırlar (sonuca göre).", ("result",))
+
+
+def apply_pragmas(conn: sqlite3.Connection):
+    """Yazma ağırlıklı iş yükü için SQLite ayarları (WAL + synchronous=NORMAL)."""
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-65536")  # ~64 MB sayfa önbelleği
+
+
+def connect(db_file: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_file, check_same_thread=False)
+    apply_pragmas(conn)
+    return conn
+
+
+@dataclass
+class WriteStats:
+    symbols: int = 0
+    attempted: int = 0
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.attempted / self.seconds if self.seconds > 0 else 0.0
+
+    def add(self, other: "WriteStats"):
+        self.symbols += other.symbols
+        self.attempted += other.attempted
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.skipped += other.skipped
+        self.seconds += other.seconds
+
+    def __str__(self):
+        return (f"{self.symbols} sembol, {self.attempted} satır: "
+                f"eklenen={self.inserted}, güncellenen={self.updated}, atlanan={self.skipped} "
+                f"({self.rows_per_sec:,.0f} satır/sn)")
+
+
+def frame_to_rows(ticker: str, df: pd.DataFrame) -> Tuple[List[PriceRow], int]:
+    """DataProvider.fetch formatındaki DataFrame'i (date, close, high, low, volume) satır listesine çevirir.
+    Geçersiz (close/date eksik) satırları atar ve atılan sayısını döner."""
+    valid = df['date'].notna() & df['close'].notna()
+    dropped = int((~valid).sum())
+    if dropped:
+        df = df[valid]
+    rows = list(zip(
+        repeat(ticker),
+        df['date'].astype(str).tolist(),
+        df['close'].astype(float).tolist(),
+        df['high'].astype(float).tolist(),
+        df['low'].astype(float).tolist(),
+        [None if v != v else int(v) for v in df['volume'].tolist()],  # NaN -> NULL
+    ))
+    return rows, dropped
+
+
+class PriceWriter:
+    """Birden çok sembolün satırlarını biriktirip tek transaction ile upsert eder.
+
+    Kullanım:
+        writer = PriceWriter(DB_FILE)
+        writer.add("THYAO.IS", df2)
+        ...
+        stats = writer.flush()   # tek transaction
+        writer.close()
+    """
+
+    def __init__(self, db_file: str):
+        self.conn = connect(db_file)
+        self.conn.isolation_level = None  # transaction sınırlarını flush() yönetir
+        self._pending: List[PriceRow] = []
+        self._pending_symbols = 0
+        self._pending_dropped = 0
+        self.totals = WriteStats()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        self.close()
+
+    @property
+    def pending_rows(self) -> int:
+        return len(self._pending)
+
+    def add(self, ticker: str, df: pd.DataFrame):
+        rows, dropped = frame_to_rows(ticker, df)
+        self._pending.extend(rows)
+        self._pending_symbols += 1
+        self._pending_dropped += dropped
+
+    def flush(self) -> WriteStats:
+        """Bekleyen tüm satırları tek transaction içinde yazar. Hata olursa batch geri alınır."""
+        stats = WriteStats(symbols=self._pending_symbols,
+                           attempted=len(self._pending) + self._pending_dropped,
+                           skipped=self._pending_dropped)
+        if not self._pending:
+            self._reset()
+            return stats
+
+        t0 = time.perf_counter()
+        cur = self.conn.cursor()
+        try:
+            # IMMEDIATE: yazma kilidi MAX(id) okunmadan alınır; araya başka bir yazıcı giremez
+            # (WAL'da ertelenmiş BEGIN ile yazma anında SQLITE_BUSY_SNAPSHOT ya da yanlış inserted sayısı)
+            cur.execute("BEGIN IMMEDIATE")
+            row = cur.execute("SELECT COALESCE(MAX(id), 0) FROM prices").fetchone()
+            max_id_before = row[0]
+            changes_before = self.conn.total_changes
+            cur.executemany(UPSERT_SQL, self._pending)
+            changed = self.conn.total_changes - changes_before
+            # AUTOINCREMENT: yeni eklenen satırlar önceki en büyük id'nin üzerinde yer alır
+            inserted = cur.execute("SELECT COUNT(*) FROM prices WHERE id > ?", (max_id_before,)).fetchone()[0]
+            cur.execute("COMMIT")
+        except Exception:
+            if self.conn.in_transaction:
+                cur.execute("ROLLBACK")
+            self._reset()
+            raise
+
+        stats.inserted = inserted
+        stats.updated = changed - inserted
+        stats.skipped += len(self._pending) - changed
+        stats.seconds = time.perf_counter() - t0
+        self.totals.add(stats)
+        observe_stage("db_write", stats.seconds)
+        ROWS_WRITTEN.inc(stats.inserted, result="inserted")
+        ROWS_WRITTEN.inc(stats.updated, result="updated")
+        ROWS_WRITTEN.inc(stats.skipped, result="skipped")
+        self._reset()
+        return stats
+
+    def _reset(self):
+        self._pending = []
+        self._pending_symbols = 0
+        self._pending_dropped = 0
+
+    def close(self):
+        self.conn.close()
+
+
+def read_windows(conn: sqlite3.Connection, tickers: Sequence[str], bars: int,
+                 chunk: int = WINDOW_CHUNK, end: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+    """Her ticker'ın son `bars` barını okur ve ticker -> DataFrame (date indeksli, close/high/low/volume)
+    olarak gruplanmış döner. Verisi olmayan ticker sonuçta yer almaz.
+    end (YYYY-MM-DD) verilirse sadece o güne kadarki (dahil) barlar dikkate alınır."""
+    end_exclusive = (pd.Timestamp(end) + pd.Timedelta(days=1)).strftime('%Y-%m-%d') if end else NO_END
+    out: Dict[str, pd.DataFrame] = {}
+    for i in range(0, len(tickers), chunk):
+        part = list(tickers[i:i + chunk])
+        sql = WINDOW_SQL.format(placeholders=", ".join("(?)" for _ in part))
+        rows = conn.execute(sql, (*part, end_exclusive, max(bars, 1) - 1, end_exclusive)).fetchall()
+        if not rows:
+            continue
+        symbols, dates, close, high, low, volume = zip(*rows)
+        frame = pd.DataFrame({
+            'close': np.array(close, dtype=np.float64),
+            'high': np.array(high, dtype=np.float64),
+            'low': np.array(low, dtype=np.float64),
+            'volume': np.array(volume, dtype=np.float64),  # NULL -> NaN
+        }, index=pd.DatetimeIndex(pd.to_datetime(dates, format='ISO8601'), name='date'))
+        # Satırlar sembole göre sıralı geldi: grup sınırları tek geçişte bulunur
+        symbols = np.array(symbols, dtype=object)
+        starts = np.flatnonzero(np.r_[True, symbols[1:] != symbols[:-1]])
+        ends = np.r_[starts[1:], len(symbols)]
+        for a, b in zip(starts, ends):
+            out[symbols[a]] = frame.iloc[a:b]
+    return out
@@ -0,0 +1,185 @@
+# scan_api.py
+
+"""
+Tarama sonuçlarının programatik erişimi (/api/scan) için satır biçimi, sorgu (filtre / sıralama /
+sayfalama), ETag ve NDJSON yardımcıları.
+
+* Sonuçlar kompakt satırlara (ROW_FIELDS) bir kez çevrilir ve RowCache'te (veri sürümü + sembol
+  listesi + risk ayarı) anahtarıyla saklanır; sıralama/filtre/sayfa istekleri sadece bu listeyi işler.
+* ETag veri sürümünden ve sorgudan üretilir; sonucu hesaplamadan önce bilinir. If-None-Match
+  eşleşirse tarama hiç çalıştırılmadan 304 döner.
+"""
+
+import hashlib
+import json
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import astuple, dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from panel_engine import STATUS_MEDIUM, STATUS_STRONG
+
+NUMERIC_FIELDS = ["price", "ma20", "ma50", "ma200", "ma20_slope", "rsi", "macd_hist", "volume_zscore", "atr",
+                  "atr_percent", "dynamic_multiplier", "stop_loss"]
+BULK_FIELDS = ["rs_rank"]  # sinyal motorundan değil, evrenin tamamı üzerinden toplu hesaplanan sütunlar
+ROW_FIELDS = ["symbol", "status", *NUMERIC_FIELDS, *BULK_FIELDS, "recommended_lot", "is_strong_signal", "pullback",
+              "reversal", "signal_reason", "analysis_date", "error"]
+SORT_FIELDS = ("symbol", "status", "price", "ma20_slope", "rsi", "macd_hist", "volume_zscore", "atr_percent",
+               "rs_rank", "stop_loss", "recommended_lot")
+FILTERS = ("strong", "signal")  # strong: sadece güçlü; signal: güçlü + orta
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 5000
+
+_PULLBACK_TEXT = "Pullback: **Fiyat, MA20 Destek Aralığında.**"
+_NO_REVERSAL_TEXT = "Momentum: Dönüş sinyali yok."
+
+
+def nullable_float(v) -> Optional[float]:
+    """NaN/None -> None (JSON null / SQL NULL); numpy skalerleri düz float'a. signal_history ve
+    screener_rules de bunu kullanır."""
+    if v is None:
+        return None
+    v = float(v)
+    return None if math.isnan(v) else v
+
+
+def to_row(symbol: str, status: str, vals: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """(status, vals) tarama sonucunu JSON'a hazır kompakt satıra çevirir."""
+    if vals is None:
+        row = dict.fromkeys(ROW_FIELDS)
+        row.update(symbol=symbol, status=status, error=status, is_strong_signal=False)
+        return row
+    reason = vals["signal_reason"]
+    lot = vals.get("recommended_lot")
+    return {
+        "symbol": vals["symbol"], "status": status,
+        **{k: nullable_float(vals.get(k)) for k in NUMERIC_FIELDS},
+        **dict.fromkeys(BULK_FIELDS),
+        "recommended_lot": None if nullable_float(lot) is None else int(lot),
+        "is_strong_signal": bool(vals["is_strong_signal"]),
+        "pullback": _PULLBACK_TEXT in reason,
+        "reversal": _NO_REVERSAL_TEXT not in reason,
+        "signal_reason": reason,
+        "analysis_date": vals["analysis_date"],
+        "error": None,
+    }
+
+
+def build_rows(symbols: List[str], results: Iterable[Tuple[str, Optional[Dict[str, Any]]]],
+               columns: Optional[Dict[str, Sequence[Any]]] = None) -> List[Dict[str, Any]]:
+    """columns: BULK_FIELDS alanı -> sembol sırasıyla değerler (ör. göreli güç sırası); hatalı satırlar boş kalır."""
+    rows = [to_row(s, status, vals) for s, (status, vals) in zip(symbols, results)]
+    for field, values in (columns or {}).items():
+        for row, v in zip(rows, values):
+            if row["error"] is None:
+                row[field] = nullable_float(v)
+    return rows
+
+
+def summarize(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Filtreden bağımsız özet: toplam sembol, güçlü / orta sinyal sayısı ve son analiz tarihi."""
+    dates = [r["analysis_date"] for r in rows if r["analysis_date"]]
+    return {
+        "total_symbols": len(rows),
+        "strong_signals": sum(1 for r in rows if r["is_strong_signal"]),
+        "medium_signals": sum(1 for r in rows if r["status"] == STATUS_MEDIUM),
+        "analysis_date": max(dates) if dates else None,
+    }
+
+
+@dataclass(frozen=True)
+class ScanQuery:
+    filter: Optional[str] = None
+    sort_by: Optional[str] = None
+    sort_order: str = "desc"
+    q: Optional[str] = None
+    offset: int = 0
+    limit: int = DEFAULT_LIMIT
+
+    def key(self) -> Tuple:
+        return astuple(self)
+
+
+def parse_query(args) -> ScanQuery:
+    """request.args benzeri eşlemeden sorgu. Geçersiz değerlerde ValueError.
+    page/page_size (HTML sayfası) veya offset/limit (API istemcileri) kabul edilir."""
+    filter_param = args.get("filter") or None
+    if filter_param is not None and filter_param not in FILTERS:
+        raise ValueError(f"filter şunlardan biri olmalı: {', '.join(FILTERS)}")
+    sort_by = args.get("sort_by") or None
+    if sort_by is not None and sort_by not in SORT_FIELDS:
+        raise ValueError(f"sort_by şunlardan biri olmalı: {', '.join(SORT_FIELDS)}")
+    sort_order = args.get("sort_order", "desc")
+    if sort_order not in ("asc", "desc"):
+        raise ValueError("sort_order: asc veya desc")
+    limit = int(args.get("limit", args.get("page_size", DEFAULT_LIMIT)))
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ValueError(f"limit 1 ile {MAX_LIMIT} arasında olmalı")
+    if "offset" in args:
+        offset = int(args["offset"])
+    else:
+        offset = (int(args.get("page", 1)) - 1) * limit
+    if offset < 0:
+        raise ValueError("offset >= 0 olmalı")
+    q = (args.get("q") or "").strip().upper() or None
+    return ScanQuery(filter_param, sort_by, sort_order, q, offset, limit)
+
+
+def apply_query(rows: List[Dict[str, Any]], query: ScanQuery) -> Tuple[List[Dict[str, Any]], int]:
+    """Filtre + sıralama + sayfa. Dönüş: (sayfadaki satırlar, filtre sonrası toplam)."""
+    if query.filter == "strong":
+        rows = [r for r in rows if r["is_strong_signal"]]
+    elif query.filter == "signal":
+        rows = [r for r in rows if r["status"] in (STATUS_STRONG, STATUS_MEDIUM)]
+    if query.q:
+        rows = [r for r in rows if query.q in r["symbol"]]
+    if query.sort_by:
+        # Değeri olmayan (NaN / veri eksik) satırlar sıralama yönünden bağımsız olarak sona gider
+        present = [r for r in rows if r[query.sort_by] is not None and r["error"] is None]
+        missing = [r for r in rows if r[query.sort_by] is None or r["error"] is not None]
+        rows = sorted(present, key=lambda r: r[query.sort_by], reverse=query.sort_order == "desc") + missing
+    return rows[query.offset:query.offset + query.limit], len(rows)
+
+
+def make_etag(*parts: Any) -> str:
+    """Veri sürümü ve sorgu parçalarından zayıf olmayan (strong) ETag değeri."""
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:20]
+
+
+def dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def ndjson_lines(meta: Dict[str, Any], rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """İlk satır {"meta": ...}, ardından her sembol için bir satır."""
+    yield dumps({"meta": meta}) + "\n"
+    for row in rows:
+        yield dumps(row) + "\n"
+
+
+class RowCache:
+    """anahtar -> kompakt satır listesi; küçük, thread-safe LRU. Hesaplama kilit dışında yapılır."""
+
+    def __init__(self, maxsize: int = 16):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Any, List[Dict[str, Any]]]" = OrderedDict()
+
+    def get(self, key: Any, build: Callable[[], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._entries.get(key)
+            if rows is not None:
+                self._entries.move_to_end(key)
+                return rows
+        rows = build()
+        with self._lock:
+            self._entries[key] = rows
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return rows
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,119 @@
+# scan_cache.py
+
+"""
+Gösterge / sinyal sonuç önbelleği.
+
+Göstergeler sadece fiyat verisine bağlıdır; bu yüzden sembol başına, o sembolün veri sürümüyle
+(data_version) anahtarlanarak saklanır. Sadece barları değişen semboller yeniden hesaplanır.
+Risk ayarına bağlı lot hesabı önbelleğe girmez; her istekte ucuz bir son adım olarak uygulanır.
+
+Aynı cache nesli (generation) ve sembol listesi için birleştirilmiş sonuç listesi de saklanır;
+tekrarlanan GET / sıralama / filtre istekleri hesaplama yapmadan döner. Hesaplama tek kilit
+altında yapılır: eşzamanlı kullanıcılar aynı işi birden çok kez yapmaz.
+"""
+
+import itertools
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+SignalResult = Tuple[str, Optional[Dict[str, Any]]]
+
+_VERSIONS = itertools.count(1)
+
+
+def next_version() -> int:
+    return next(_VERSIONS)
+
+
+def stamp_version(df: pd.DataFrame) -> pd.DataFrame:
+    """Cache'e giren DataFrame'e yeni bir veri sürümü atar (barlar her değiştiğinde çağrılmalı)."""
+    df.attrs['data_version'] = next_version()
+    return df
+
+
+def data_version(df: Optional[pd.DataFrame]) -> Any:
+    if df is None:
+        return None
+    return df.attrs.get('data_version', id(df))
+
+
+def symbol_version(cache, symbol: str) -> Any:
+    """Sembolün cache'teki veri sürümü. Kompakt cache'te DataFrame kurmadan okunur."""
+    version = getattr(cache, 'version', None)
+    if version is not None:
+        return version(symbol)
+    return data_version(cache.get(symbol))
+
+
+class SignalCache:
+    """compute_fn(cache, symbols) -> [SignalResult] sonuçlarını sembol/sürüm bazında saklar."""
+
+    def __init__(self, compute_fn: Callable[[Dict[str, pd.DataFrame], List[str]], List[SignalResult]],
+                 max_sized: int = 32):
+        self.compute_fn = compute_fn
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[Any, SignalResult]] = {}
+        self._universe: Optional[Tuple[Any, List[SignalResult]]] = None
+        # (nesil, semboller, risk ayarı) -> lot eklenmiş sonuçlar; sıralama/filtre tekrarları için küçük LRU
+        self._sized: "OrderedDict[Any, List[SignalResult]]" = OrderedDict()
+        self.max_sized = max_sized
+        self.hits = 0
+        self.recomputed = 0
+
+    def get(self, cache: Dict[str, pd.DataFrame], symbols: List[str],
+            generation: Optional[int] = None) -> List[SignalResult]:
+        """symbols sırasıyla sonuçları döner. generation verilirse (yayınlanmış cache nesli)
+        aynı nesil + sembol listesi için hazır liste doğrudan döner."""
+        key = (generation, tuple(symbols)) if generation is not None else None
+        universe = self._universe
+        if key is not None and universe is not None and universe[0] == key:
+            self.hits += 1
+            return universe[1]
+
+        with self._lock:
+            universe = self._universe
+            if key is not None and universe is not None and universe[0] == key:
+                self.hits += 1
+                return universe[1]
+
+            versions = {s: symbol_version(cache, s) for s in symbols}
+            stale = [s for s in dict.fromkeys(symbols)
+                     if s not in self._entries or self._entries[s][0] != versions[s]]
+            if stale:
+                for s, res in zip(stale, self.compute_fn(cache, stale)):
+                    self._entries[s] = (versions[s], res)
+                self.recomputed += len(stale)
+
+            results = [self._entries[s][1] for s in symbols]
+            if key is not None:
+                self._universe = (key, results)
+            return results
+
+    def get_sized(self, cache: Dict[str, pd.DataFrame], symbols: List[str], generation: Optional[int],
+                  settings: Tuple, size_fn: Callable[[Dict[str, Any]], Dict[str, Any]]) -> List[SignalResult]:
+        """get() sonuçlarına size_fn'i (risk ayarına göre lot) uygular. Aynı nesil ve ayarlar için
+        hazır liste döner; böylece aynı kullanıcının sıralama/filtre istekleri hesap yapmaz."""
+        base = self.get(cache, symbols, generation)
+        if generation is None:
+            return [(st, size_fn(v) if v is not None else None) for st, v in base]
+        key = (generation, tuple(symbols), settings)
+        with self._lock:
+            sized = self._sized.get(key)
+            if sized is not None:
+                self._sized.move_to_end(key)
+                return sized
+        sized = [(st, size_fn(v) if v is not None else None) for st, v in base]
+        with self._lock:
+            self._sized[key] = sized
+            while len(self._sized) > self.max_sized:
+                self._sized.popitem(last=False)
+        return sized
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._universe = None
+            self._sized.clear()
@@ -0,0 +1,107 @@
+# scan_events.py
+
+"""
+Canlı tarama ilerlemesi için Server-Sent Events (SSE) kanalları.
+
+* Üretici (tarama / güncelleme işi) olayları EventChannel'a yazar; yazma hiçbir zaman bloklamaz.
+* Olaylar sabit boyutlu bir halka tamponda (deque, maxlen) artan id'lerle tutulur. Her istemci kendi
+  imlecini (son okunan id) taşır; tampon istemciye göre değil kanal başına tek kopyadır.
+* Yavaş bir istemci tamponun gerisine düşerse worker'lar beklemez: istemciye kaç olayın atlandığını
+  bildiren bir "gap" olayı gönderilir ve akış en eski mevcut olaydan devam eder.
+* Tarayıcı bağlantısı koparsa Last-Event-ID ile kaldığı yerden devam edebilir.
+"""
+
+import itertools
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Iterator, List, Optional, Tuple
+
+Event = Tuple[int, str, Any]  # (id, olay adı, veri)
+
+END_EVENTS = ("done", "failed")
+
+
+def format_sse(event: str, data: Any, event_id: Optional[int] = None) -> str:
+    """Tek SSE mesajı. Veri tek satır JSON olarak yazılır."""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, ensure_ascii=False, separators=(',', ':'))}\n\n"
+
+
+class EventChannel:
+    """Tek bir canlı tarama koşusunun olay tamponu (çok okuyuculu, tek/çok yazıcılı)."""
+
+    def __init__(self, run_id: int, maxlen: int = 1000):
+        self.run_id = run_id
+        self.created_at = time.time()
+        self._events: "deque[Event]" = deque(maxlen=maxlen)
+        self._ids = itertools.count(1)
+        self._last_id = 0
+        self._cond = threading.Condition()
+        self.closed = False
+
+    def publish(self, event: str, data: Any) -> int:
+        with self._cond:
+            event_id = next(self._ids)
+            self._events.append((event_id, event, data))
+            self._last_id = event_id
+            if event in END_EVENTS:
+                self.closed = True
+            self._cond.notify_all()
+        return event_id
+
+    def read(self, after: int, timeout: float) -> Tuple[List[Event], int, bool]:
+        """after'dan sonraki olaylar; yoksa timeout kadar bekler.
+        Dönüş: (olaylar, tampondan düşmüş atlanan olay sayısı, kanal bitti ve hepsi okundu mu)."""
+        with self._cond:
+            if self._last_id <= after and not self.closed:
+                self._cond.wait(timeout)
+            if not self._events:
+                return [], 0, self.closed
+            first = self._events[0][0]
+            skipped = max(0, first - after - 1)
+            start = max(0, after + 1 - first)  # id'ler ardışık: indeks doğrudan hesaplanır
+            events = list(itertools.islice(self._events, start, None))
+            return events, skipped, self.closed and (not events or events[-1][0] == self._last_id)
+
+
+class EventHub:
+    """run_id -> EventChannel; son max_runs koşu saklanır (bitenler yeniden bağlanma için kısa süre tutulur)."""
+
+    def __init__(self, max_runs: int = 8, buffer: int = 1000):
+        self.max_runs = max_runs
+        self.buffer = buffer
+        self._lock = threading.Lock()
+        self._channels: "OrderedDict[int, EventChannel]" = OrderedDict()
+
+    def channel(self, run_id: int) -> EventChannel:
+        """run_id'nin kanalı; yoksa açılır (üretici ve istek thread'i hangisi önce gelirse)."""
+        with self._lock:
+            channel = self._channels.get(run_id)
+            if channel is None:
+                channel = self._channels[run_id] = EventChannel(run_id, self.buffer)
+                while len(self._channels) > self.max_runs:
+                    self._channels.popitem(last=False)
+            return channel
+
+    def get(self, run_id: int) -> Optional[EventChannel]:
+        with self._lock:
+            return self._channels.get(run_id)
+
+
+def sse_stream(channel: EventChannel, last_id: int = 0, heartbeat: float = 15.0) -> Iterator[str]:
+    """Kanalı SSE metni olarak akıtır; bitiş olayı gönderilince sonlanır. Boşta kalınca yorum satırı
+    (keepalive) gönderilir: proxy'ler bağlantıyı kapatmaz, kopan istemci de yield'de fark edilir."""
+    yield "retry: 2000\n\n"
+    while True:
+        events, skipped, finished = channel.read(last_id, heartbeat)
+        if skipped:
+            yield format_sse("gap", {"skipped": skipped})
+        for event_id, event, data in events:
+            yield format_sse(event, data, event_id)
+            last_id = event_id
+        if finished:
+            return
+        if not events and not skipped:
+            yield ": keepalive\n\n"
@@ -0,0 +1,151 @@
+# scan_executor.py
+
+"""
+Tarama yürütücüsü: serial / thread / process arka uçları.
+
+* Sembol listesi ardışık parçalara (shard) bölünür, her parça bir worker'da panel motoruyla hesaplanır.
+* Sonuçlar parçaların sırasıyla birleştirilir: çıktı her zaman sembol listesinin sırasındadır.
+* process arka ucunda fiyat verisi DataFrame pickle'lanarak gönderilmez; worker'lar cache'in
+  sütunsal snapshot'ını (snapshot_store) mmap ile açar ve kendi parçalarının görünümlerini kurar.
+  Worker'a giden tek şey snapshot yolu, damgası (token) ve sembol adlarıdır.
+"""
+
+import math
+import multiprocessing
+import os
+import threading
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from panel_engine import MIN_BARS, SIGNAL_OUTPUTS, build_panel, compute_indicators, compute_signals, thread_scratch
+from scan_cache import SignalResult
+from snapshot_store import load_snapshot, write_snapshot
+
+logger = logging.getLogger('SwingScanner')
+
+BACKENDS = ("serial", "thread", "process")
+
+ComputeFn = Callable[[Dict[str, pd.DataFrame], List[str]], List[SignalResult]]
+
+
+def panel_signals(cache: Dict[str, pd.DataFrame], symbols: List[str], window: Optional[int] = None,
+                  volume_z_threshold: float = 1.0, slope_period: int = 5,
+                  min_bars: int = MIN_BARS) -> List[SignalResult]:
+    """Bir sembol parçası için panel motoru (lot hesabı hariç). Modül seviyesinde olduğu için
+    functools.partial ile sarılıp process worker'larına gönderilebilir. Ara diziler çağıran
+    thread'in tamponlarına yazılır."""
+    scratch = thread_scratch()
+    panel = build_panel(cache, symbols, window=window, scratch=scratch)
+    ind = (compute_indicators(panel, slope_period=slope_period, scratch=scratch, outputs=SIGNAL_OUTPUTS)
+           if panel.close.shape[0] else None)
+    return compute_signals(panel, volume_z_threshold=volume_z_threshold,
+                           slope_period=slope_period, min_bars=min_bars, ind=ind)
+
+
+# Worker process içinde açık snapshot (yol -> (token, snapshot)); aynı snapshot tekrar eşlenmez
+_WORKER_SNAPSHOTS: Dict[str, Tuple[Any, Any]] = {}
+
+
+def _run_shard(path: str, token: Any, symbols: List[str], compute: ComputeFn) -> List[SignalResult]:
+    cached = _WORKER_SNAPSHOTS.get(path)
+    if cached is None or cached[0] != token:
+        snap = load_snapshot(path)
+        if snap is None or snap.meta.get('created_at') != token:
+            raise RuntimeError(f"Snapshot değişmiş veya okunamadı: {path}")
+        cached = _WORKER_SNAPSHOTS[path] = (token, snap)
+    frames = cached[1].frames(symbols)
+    return compute(frames, symbols)
+
+
+class ScanExecutor:
+    """compute(cache, semboller) fonksiyonunu sembol parçaları üzerinde seçilen arka uçla çalıştırır.
+
+    process arka ucu için compute picklable olmalıdır (modül fonksiyonu veya partial'ı).
+    Snapshot: share() ile kaydedilen (cache, yol, meta) varsa o kullanılır; yoksa tarama için
+    snapshot_dir'e cache'in bir kopyası yazılır (cache nesnesi değişene kadar tekrar yazılmaz)."""
+
+    def __init__(self, backend: str = "serial", workers: Optional[int] = None,
+                 shards_per_worker: int = 2, snapshot_dir: str = "scan_snapshot", window: int = 300):
+        if backend not in BACKENDS:
+            raise ValueError(f"Bilinmeyen tarama arka ucu: {backend} ({', '.join(BACKENDS)})")
+        self.backend = backend
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.shards_per_worker = max(1, shards_per_worker)
+        self.snapshot_dir = snapshot_dir
+        self.window = window
+        self._pool = None
+        self._lock = threading.Lock()
+        self._shared: Optional[Tuple[Dict[str, pd.DataFrame], str, Any]] = None
+
+    @property
+    def parallel(self) -> bool:
+        return self.backend != "serial" and self.workers > 1
+
+    def shards(self, symbols: Sequence[str]) -> List[List[str]]:
+        """Sembolleri ardışık, yaklaşık eşit parçalara böler (sıra korunur)."""
+        if not symbols:
+            return []
+        count = min(len(symbols), self.workers * self.shards_per_worker)
+        size = math.ceil(len(symbols) / count)
+        return [list(symbols[i:i + size]) for i in range(0, len(symbols), size)]
+
+    def share(self, cache: Dict[str, pd.DataFrame], path: str, meta: Dict[str, Any]):
+        """cache'in içeriği `path` snapshot'ıyla aynı; process worker'ları bunu doğrudan eşleyebilir."""
+        with self._lock:
+            self._shared = (cache, path, meta.get('created_at'))
+
+    def _snapshot_for(self, cache: Dict[str, pd.DataFrame]) -> Tuple[str, Any]:
+        with self._lock:
+            if self._shared is not None and self._shared[0] is cache:
+                return self._shared[1], self._shared[2]
+            meta = write_snapshot(self.snapshot_dir, cache, self.window, source_stamp=-1)
+            self._shared = (cache, self.snapshot_dir, meta['created_at'])
+            return self.snapshot_dir, meta['created_at']
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: Flask/ingest thread'leri varken fork güvenli değil; havuz bir kez kurulur
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def run(self, cache: Dict[str, pd.DataFrame], symbols: Sequence[str], compute: ComputeFn) -> List[SignalResult]:
+        """Sonuçları symbols sırasıyla döner."""
+        symbols = list(symbols)
+        if not self.parallel or len(symbols) < 2:
+            return compute(cache, symbols)
+
+        t0 = time.perf_counter()
+        shards = self.shards(symbols)
+        if self.backend == "thread":
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scan") as pool:
+                parts = list(pool.map(lambda shard: compute(cache, shard), shards))
+        else:
+            path, token = self._snapshot_for(cache)
+            pool = self._process_pool()
+            try:
+                futures = [pool.submit(_run_shard, path, token, shard, compute) for shard in shards]
+                parts = [f.result() for f in futures]
+            except BrokenProcessPool:
+                # Bir worker öldü: havuz bir sonraki taramada yeniden kurulur
+                with self._lock:
+                    if self._pool is pool:
+                        self._pool = None
+                raise
+
+        results = [r for part in parts for r in part]
+        logger.info(f"Tarama ({self.backend}, {self.workers} worker, {len(shards)} parça): "
+                    f"{len(symbols)} sembol, {time.perf_counter() - t0:.2f} sn")
+        return results
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+                self._pool = None
@@ -0,0 +1,606 @@
+# screener_rules.py
+
+"""
+Bildirimsel tarama kuralları (screener): küçük bir kural dili, vektörel derleyici ve kayıtlı taramalar.
+
+Kural metni satır satır yazılır; her satır bir parametre ya da adlandırılmış bir kuraldır:
+
+    # Yorum
+    param rsi_max = 55
+    trend    = close > ma20 > ma50 > ma200
+    momentum = rsi < rsi_max and rising(rsi)
+    match    = trend and (momentum or crosses_above(macd, macd_signal_line))
+
+* İfadeler Python sözdizimindedir ve ast ile ayrıştırılır (eval kullanılmaz): karşılaştırmalar (zincirli
+  olabilir), + - * /, and / or / not, sayılar, parametreler, gösterge sütunları (COLUMNS) ve daha önce
+  tanımlanmış kurallar. Girintili satır bir önceki satırın devamıdır.
+* Fonksiyonlar: prev(x, n=1), rising(x, n=1), falling(x, n=1), crosses_above(a, b), crosses_below(a, b),
+  between(x, alt, üst), abs(x), min(a, b), max(a, b). NaN içeren karşılaştırmalar False'tur.
+* Göreli güç: rs_21 / rs_63 / rs_126 endekse göre getiri (0.1: endeksten %10 iyi), rs_rank_<n> aynı gündeki
+  evren içinde yüzdelik sırası (0-100), rs_rank dönemlerin birleşik sırası (ör. rs_rank >= 80). Sıralar
+  değerlendirilen evrenin tamamı üzerinden tek geçişte hesaplanır; endeks ScreenData.build(benchmark=...) ile verilir.
+* Üst zaman dilimi sütunları `weekly.<sütun>` / `monthly.<sütun>` ile kullanılır (ör. weekly.close > weekly.ma20).
+  Bunlar günlük cache'ten türetilen dönem barları üzerinde hesaplanır (timeframes); son bar içinde bulunulan
+  dönemdir (bugüne kadarki günler). prev(weekly.x) bir önceki haftadır: geriye bakış her sütunun kendi zaman
+  diliminde yapılır.
+* Eşleşme kuralı `match` tanımlıysa odur, değilse son kuraldır.
+* Her kural (bar, sembol) dizileri üzerinde numpy ifadelerine derlenir ve tüm evren için tek geçişte
+  değerlendirilir. Kurallar sadece son TAIL_BARS bara bakar (prev derinliği en fazla MAX_LOOKBACK).
+* Göstergeler gösterge grafiğinden (panel_engine.IndicatorGraph) tembel olarak istenir: sadece trend
+  kontrol eden bir tarama RSI, MACD ve ATR'yi hiç hesaplamaz.
+* Alt ifadeler metinden bağımsız bir anahtarla (ör. `(col:close>col:ma20)`) bir değerlendirme bağlamında
+  (EvalContext) bir kez hesaplanır: aynı kriterleri paylaşan birçok tarama, tek tarama maliyetine yakındır.
+* Mevcut V2 stratejisi yerleşik kural seti olarak gelir (V2_RULES); kural adları panel_engine.FLAG_COLUMNS
+  ile aynıdır ve sonuçları signal_masks ile birebir aynıdır. V2_WEEKLY_RULES aynı kriterlere haftalık
+  ortalama dizilimi teyidini ekler.
+"""
+
+import ast
+import functools
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from compact_cache import CompactCache
+from panel_engine import (MIN_BARS, RS_LOOKBACKS, STATUS_MEDIUM, STATUS_NONE, STATUS_STRONG, STATUS_TREND,
+                          IndicatorGraph, Panel, build_panel, required_bars)
+from scan_api import nullable_float
+from timeframes import TIMEFRAMES, resample
+
+PRICE_COLUMNS = ("close", "high", "low", "volume")
+INDICATOR_COLUMNS = ("ma20", "ma50", "ma200", "rsi", "macd", "macd_signal_line", "macd_hist", "ema_fast", "ema_slow",
+                     "tr", "atr", "atr_percent", "volume_ma", "volume_std", "volume_zscore", "ma20_slope",
+                     *(f"rs_{n}" for n in RS_LOOKBACKS), *(f"rs_rank_{n}" for n in RS_LOOKBACKS), "rs_rank")
+COLUMNS = PRICE_COLUMNS + INDICATOR_COLUMNS
+MAX_LOOKBACK = 5  # prev(x, n) ile en fazla bu kadar bar geriye bakılabilir
+TAIL_BARS = MAX_LOOKBACK + 1
+MATCH_RULE = "match"
+BUILTIN_SCREEN = "v2"
+WEEKLY_SCREEN = "v2_weekly"
+RESERVED_SCREEN_NAMES = (BUILTIN_SCREEN, WEEKLY_SCREEN, "run")  # /api/screens/run ile çakışmasın
+SCREEN_NAME_RE = re.compile(r"^[A-Za-z0-9_-]{1,40}$")
+_IDENT_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_RESERVED = set(COLUMNS) | set(TIMEFRAMES) | {"prev", "rising", "falling", "crosses_above", "crosses_below", "between", "abs", "min",
+                            "max", "param", "True", "False"}
+
+V2_RULES = """
+# V2 (Pullback + Reversal): swing_signal_engine_v2 / panel_engine.signal_masks ile aynı kriterler
+param volume_z_threshold = 1.0
+param pullback_band = 0.02
+param rsi_max = 55
+
+is_trend_ok      = close > ma20 > ma50 > ma200
+is_ma20_up       = ma20_slope > 0
+is_pullback_ok   = between(close, ma20 * (1 - pullback_band), ma20 * (1 + pullback_band))
+is_rsi_reversal  = rsi < rsi_max and rising(rsi)
+is_macd_reversal = macd_hist > 0 and prev(macd_hist) < 0
+is_momentum_ok   = is_rsi_reversal or is_macd_reversal
+is_volume_spike  = volume_zscore >= volume_z_threshold
+is_strong        = is_trend_ok and is_ma20_up and is_pullback_ok and is_momentum_ok and is_volume_spike
+is_medium        = is_trend_ok and is_pullback_ok and is_momentum_ok
+"""
+# Durum metni: ilk eşleşen seviye (yoksa STATUS_NONE); describe_signal ile aynı öncelik
+V2_LEVELS = (("is_strong", STATUS_STRONG), ("is_medium", STATUS_MEDIUM), ("is_trend_ok", STATUS_TREND))
+
+V2_WEEKLY_RULES = V2_RULES + """
+# Haftalık teyit: haftalık kapanış 20 haftalık, 20 haftalık 50 haftalık ortalamanın üstünde
+is_weekly_trend  = weekly.close > weekly.ma20 > weekly.ma50
+is_strong_weekly = is_strong and is_weekly_trend
+is_medium_weekly = is_medium and is_weekly_trend
+"""
+V2_WEEKLY_LEVELS = (("is_strong_weekly", STATUS_STRONG), ("is_medium_weekly", STATUS_MEDIUM),
+                    ("is_trend_ok", STATUS_TREND))
+
+
+def split_column(name: str) -> Tuple[Optional[str], str]:
+    """'weekly.ma20' -> ('weekly', 'ma20'); günlük sütunlar (None, ad)."""
+    timeframe, sep, column = name.partition(".")
+    return (timeframe, column) if sep else (None, name)
+
+
+class RuleError(ValueError):
+    """Kural metni ayrıştırılamadı / derlenemedi (satır numarasıyla)."""
+
+    def __init__(self, message: str, line: Optional[int] = None):
+        super().__init__(f"Satır {line}: {message}" if line else message)
+        self.line = line
+
+
+# ---------- Derleme ----------
+
+class _Node:
+    """Derlenmiş ifade: anahtar (ortak alt ifadeler için), tür (num/bool), geriye bakış ve hesap fonksiyonu."""
+    __slots__ = ("key", "kind", "lookback", "fn")
+
+    def __init__(self, key: str, kind: str, lookback: int, fn: Callable[["EvalContext"], Any]):
+        self.key = key
+        self.kind = kind
+        self.lookback = lookback
+        self.fn = fn
+
+    @property
+    def constant(self) -> bool:
+        return self.key.startswith("const:")
+
+
+def _const(value: Any) -> _Node:
+    kind = "bool" if isinstance(value, (bool, np.bool_)) else "num"
+    value = bool(value) if kind == "bool" else float(value)
+    return _Node(f"const:{value!r}", kind, 0, lambda ctx: value)
+
+
+def _shift(x: Any, n: int, fill: Any) -> Any:
+    """Bar ekseninde n bar kaydırma (ilk n bar fill). Skalerler olduğu gibi döner."""
+    if np.ndim(x) == 0:
+        return x
+    out = np.empty_like(x)
+    out[:n] = fill
+    out[n:] = x[:len(x) - n]
+    return out
+
+
+_COMPARE = {ast.Gt: (">", np.greater), ast.GtE: (">=", np.greater_equal), ast.Lt: ("<", np.less),
+            ast.LtE: ("<=", np.less_equal), ast.Eq: ("==", np.equal), ast.NotEq: ("!=", np.not_equal)}
+_ARITH = {ast.Add: ("+", np.add), ast.Sub: ("-", np.subtract), ast.Mult: ("*", np.multiply),
+          ast.Div: ("/", np.divide)}
+
+
+class _Compiler:
+    def __init__(self, params: Dict[str, float]):
+        self.params = params
+        self.rules: Dict[str, _Node] = {}
+        self.columns: List[str] = []
+        self.line: Optional[int] = None
+
+    def error(self, message: str) -> RuleError:
+        return RuleError(message, self.line)
+
+    # Yardımcı düğüm kurucular (rising/crosses gibi fonksiyonlar bunlarla ifade edilir)
+
+    def column(self, name: str) -> _Node:
+        if name not in self.columns:
+            self.columns.append(name)
+        return _Node(f"col:{name}", "num", 0, lambda ctx: ctx.column(name))
+
+    def compare(self, op: type, a: _Node, b: _Node) -> _Node:
+        if a.kind != "num" or b.kind != "num":
+            raise self.error("Karşılaştırma sadece sayısal değerler arasında yapılabilir.")
+        sym, fn = _COMPARE[op]
+
+        def run(ctx):
+            with np.errstate(invalid='ignore'):
+                return fn(ctx.value(a), ctx.value(b))
+        return _Node(f"({a.key}{sym}{b.key})", "bool", max(a.lookback, b.lookback), run)
+
+    def logical(self, op: str, nodes: Sequence[_Node]) -> _Node:
+        if any(n.kind != "bool" for n in nodes):
+            raise self.error(f"'{op}' sadece koşullar arasında kullanılabilir (sayı değil).")
+        fn = np.logical_and if op == "and" else np.logical_or
+        return _Node(f"({f' {op} '.join(n.key for n in nodes)})", "bool", max(n.lookback for n in nodes),
+                     lambda ctx: functools.reduce(fn, (ctx.value(n) for n in nodes)))
+
+    def prev(self, x: _Node, n: int) -> _Node:
+        if x.constant:
+            return x
+        lookback = x.lookback + n
+        if lookback > MAX_LOOKBACK:
+            raise self.error(f"prev derinliği en fazla {MAX_LOOKBACK} bar olabilir ({lookback}).")
+        fill = False if x.kind == "bool" else np.nan
+        return _Node(f"prev({x.key},{n})", x.kind, lookback, lambda ctx: _shift(ctx.value(x), n, fill))
+
+    def arith(self, sym: str, fn: Callable, nodes: Sequence[_Node]) -> _Node:
+        if any(n.kind != "num" for n in nodes):
+            raise self.error(f"'{sym}' sadece sayısal değerlerle kullanılabilir.")
+
+        def run(ctx):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return fn(*(ctx.value(n) for n in nodes))
+        node = _Node(f"{sym}({','.join(n.key for n in nodes)})", "num", max(n.lookback for n in nodes), run)
+        if all(n.constant for n in nodes):
+            return _const(node.fn(EvalContext(None)))  # sabit ifadeler derlemede hesaplanır
+        return node
+
+    # AST -> düğüm
+
+    def compile(self, expr: ast.AST) -> _Node:
+        if isinstance(expr, ast.Constant):
+            if isinstance(expr.value, bool) or isinstance(expr.value, (int, float)):
+                return _const(expr.value)
+            raise self.error(f"Desteklenmeyen sabit: {expr.value!r}")
+        if isinstance(expr, ast.Name):
+            return self.name(expr.id)
+        if isinstance(expr, ast.Attribute):
+            return self.timeframe_column(expr)
+        if isinstance(expr, ast.BoolOp):
+            return self.logical("and" if isinstance(expr.op, ast.And) else "or", [self.compile(v) for v in expr.values])
+        if isinstance(expr, ast.UnaryOp):
+            x = self.compile(expr.operand)
+            if isinstance(expr.op, ast.Not):
+                if x.kind != "bool":
+                    raise self.error("'not' sadece koşullarla kullanılabilir.")
+                return _Node(f"not({x.key})", "bool", x.lookback, lambda ctx: np.logical_not(ctx.value(x)))
+            if isinstance(expr.op, ast.USub):
+                return self.arith("neg", np.negative, [x])
+            if isinstance(expr.op, ast.UAdd):
+                return x
+        if isinstance(expr, ast.BinOp) and type(expr.op) in _ARITH:
+            sym, fn = _ARITH[type(expr.op)]
+            return self.arith(sym, fn, [self.compile(expr.left), self.compile(expr.right)])
+        if isinstance(expr, ast.Compare):
+            operands = [self.compile(expr.left)] + [self.compile(c) for c in expr.comparators]
+            for op in expr.ops:
+                if type(op) not in _COMPARE:
+                    raise self.error("Desteklenmeyen karşılaştırma (sadece < <= > >= == !=).")
+            # a > b > c -> (a > b) and (b > c)
+            parts = [self.compare(type(op), operands[i], operands[i + 1]) for i, op in enumerate(expr.ops)]
+            return parts[0] if len(parts) == 1 else self.logical("and", parts)
+        if isinstance(expr, ast.Call):
+            return self.call(expr)
+        raise self.error(f"Desteklenmeyen ifade: {ast.unparse(expr)}")
+
+    def name(self, name: str) -> _Node:
+        if name in self.params:
+            return _const(self.params[name])
+        if name in self.rules:
+            return self.rules[name]
+        if name in COLUMNS:
+            return self.column(name)
+        if name in TIMEFRAMES:
+            raise self.error(f"{name} tek başına kullanılamaz: {name}.<sütun> yazın (ör. {name}.ma20).")
+        raise self.error(f"Bilinmeyen ad: {name} (sütunlar: {', '.join(COLUMNS)})")
+
+    def timeframe_column(self, expr: ast.Attribute) -> _Node:
+        if not isinstance(expr.value, ast.Name) or expr.value.id not in TIMEFRAMES:
+            raise self.error(f"Desteklenmeyen ifade: {ast.unparse(expr)} "
+                             f"(üst zaman dilimleri: {', '.join(t + '.<sütun>' for t in TIMEFRAMES)})")
+        if expr.attr not in COLUMNS:
+            raise self.error(f"Bilinmeyen sütun: {ast.unparse(expr)} (sütunlar: {', '.join(COLUMNS)})")
+        return self.column(f"{expr.value.id}.{expr.attr}")
+
+    def call(self, expr: ast.Call) -> _Node:
+        if not isinstance(expr.func, ast.Name) or expr.keywords:
+            raise self.error(f"Desteklenmeyen fonksiyon çağrısı: {ast.unparse(expr)}")
+        fname, args = expr.func.id, expr.args
+
+        def arity(*counts):
+            if len(args) not in counts:
+                raise self.error(f"{fname}: {' veya '.join(map(str, counts))} argüman bekleniyor.")
+
+        def bars(i: int) -> int:
+            if len(args) <= i:
+                return 1
+            n = args[i]
+            if not (isinstance(n, ast.Constant) and type(n.value) is int and 1 <= n.value <= MAX_LOOKBACK):
+                raise self.error(f"{fname}: bar sayısı 1-{MAX_LOOKBACK} arası tam sayı olmalı.")
+            return n.value
+
+        if fname == "prev":
+            arity(1, 2)
+            return self.prev(self.compile(args[0]), bars(1))
+        if fname in ("rising", "falling"):
+            arity(1, 2)
+            x = self.compile(args[0])
+            return self.compare(ast.Gt if fname == "rising" else ast.Lt, x, self.prev(x, bars(1)))
+        if fname in ("crosses_above", "crosses_below"):
+            arity(2)
+            a, b = self.compile(args[0]), self.compile(args[1])
+            now, before = (ast.Gt, ast.LtE) if fname == "crosses_above" else (ast.Lt, ast.GtE)
+            return self.logical("and", [self.compare(now, a, b), self.compare(before, self.prev(a, 1), self.prev(b, 1))])
+        if fname == "between":
+            arity(3)
+            x, lo, hi = (self.compile(a) for a in args)
+            return self.logical("and", [self.compare(ast.GtE, x, lo), self.compare(ast.LtE, x, hi)])
+        if fname == "abs":
+            arity(1)
+            return self.arith("abs", np.abs, [self.compile(args[0])])
+        if fname in ("min", "max"):
+            arity(2)
+            return self.arith(fname, np.minimum if fname == "min" else np.maximum, [self.compile(a) for a in args])
+        raise self.error(f"Bilinmeyen fonksiyon: {fname}")
+
+
+def _logical_lines(text: str) -> Iterable[Tuple[int, str]]:
+    """(satır no, satır) çiftleri; yorumlar atılır, girintili satırlar öncekine eklenir."""
+    current: Optional[List[Any]] = None
+    for lineno, raw in enumerate(text.splitlines(), 1):
+        line = raw.split("#", 1)[0].rstrip()
+        if not line.strip():
+            continue
+        if line[0].isspace() and current is not None:
+            current[1] += " " + line.strip()
+            continue
+        if current is not None:
+            yield current[0], current[1]
+        current = [lineno, line.strip()]
+    if current is not None:
+        yield current[0], current[1]
+
+
+def _parse_expr(source: str, line: int) -> ast.AST:
+    try:
+        return ast.parse(source, mode="eval").body
+    except SyntaxError as e:
+        raise RuleError(f"Sözdizimi hatası: {e.msg}", line) from None
+
+
+class Screen:
+    """Derlenmiş kural seti. rules: kural adı -> düğüm (tanım sırasıyla)."""
+
+    def __init__(self, name: str, text: str, params: Dict[str, float], rules: Dict[str, _Node],
+                 columns: List[str], levels: Tuple[Tuple[str, str], ...] = (), description: str = "",
+                 builtin: bool = False):
+        self.name = name
+        self.text = text
+        self.params = params
+        self.rules = rules
+        self.columns = columns
+        self.levels = levels
+        self.description = description
+        self.builtin = builtin
+        self.match = MATCH_RULE if MATCH_RULE in rules else list(rules)[-1]
+        self.lookback = max(n.lookback for n in rules.values())
+        self.digest = hashlib.sha1(repr((text, sorted(params.items()), levels)).encode("utf-8")).hexdigest()[:12]
+
+    def evaluate(self, ctx: "EvalContext") -> Dict[str, np.ndarray]:
+        """Kural adı -> son bardaki (sembol,) boolean dizi. Yeterli verisi olmayan semboller False."""
+        valid = ctx.data.valid
+        return {name: np.broadcast_to(ctx.value(node), ctx.data.shape)[-1] & valid for name, node in self.rules.items()}
+
+    def level_labels(self, flags: Dict[str, np.ndarray]) -> Optional[np.ndarray]:
+        """levels tanımlıysa her sembol için ilk eşleşen seviyenin etiketi (yoksa STATUS_NONE)."""
+        if not self.levels:
+            return None
+        return np.select([flags[rule] for rule, _ in self.levels], [label for _, label in self.levels],
+                         default=STATUS_NONE)
+
+    def timeframe_columns(self, timeframe: Optional[str]) -> List[str]:
+        """Taramanın bir zaman diliminde (None: günlük) kullandığı sütunlar."""
+        return [c for tf, c in map(split_column, self.columns) if tf == timeframe]
+
+    def to_dict(self, slope_period: int = 5) -> Dict[str, Any]:
+        """JSON'a uygun tanım; ısınma bar sayıları verilen eğim periyoduyla (ma20_slope'un lookback'i)."""
+        return {"name": self.name, "description": self.description, "builtin": self.builtin, "rules": self.text,
+                "params": self.params, "match": self.match, "rule_names": list(self.rules), "columns": self.columns,
+                "lookback": self.lookback, "warmup_bars": required_bars(self.timeframe_columns(None), slope_period),
+                "timeframe_warmup_bars": {tf: required_bars(self.timeframe_columns(tf), slope_period) for tf in TIMEFRAMES
+                                          if self.timeframe_columns(tf)},
+                "digest": self.digest}
+
+
+def compile_screen(text: str, name: str = "", params: Optional[Dict[str, float]] = None,
+                   levels: Sequence[Tuple[str, str]] = (), description: str = "", builtin: bool = False) -> Screen:
+    """Kural metnini derler; params tanımlı parametrelerin varsayılanlarını değiştirir. Hatalarda RuleError."""
+    return _compile(text, name, tuple(sorted((params or {}).items())), tuple(levels), description, builtin)
+
+
+@functools.lru_cache(maxsize=256)
+def _compile(text: str, name: str, overrides: Any, levels: Tuple[Tuple[str, str], ...],
+             description: str, builtin: bool) -> Screen:
+    overrides = dict(overrides)
+    params: Dict[str, float] = {}
+    compiler = _Compiler(params)
+    for line, source in _logical_lines(text):
+        compiler.line = line
+        is_param = source.startswith("param ")
+        target, sep, expr_source = source[6:].partition("=") if is_param else source.partition("=")
+        target = target.strip()
+        if not sep or expr_source.startswith("="):
+            raise RuleError("'ad = ifade' veya 'param ad = sayı' bekleniyor.", line)
+        if not _IDENT_RE.match(target) or target in _RESERVED:
+            raise RuleError(f"Geçersiz veya ayrılmış ad: {target!r}", line)
+        if target in params or target in compiler.rules:
+            raise RuleError(f"{target} iki kez tanımlanmış.", line)
+        node = compiler.compile(_parse_expr(expr_source.strip(), line))
+        if is_param:
+            if not node.constant or node.kind != "num":
+                raise RuleError(f"param {target}: sabit bir sayı olmalı.", line)
+            # Verilen değer varsayılanın yerine geçer; sonraki ifadelerde sabit olarak katlanır
+            params[target] = float(overrides.get(target, node.fn(EvalContext(None))))
+        else:
+            if node.kind != "bool":
+                raise RuleError(f"{target}: kural bir koşul olmalı (ör. rsi < 30), sayı değil.", line)
+            compiler.rules[target] = node
+    if not compiler.rules:
+        raise RuleError("En az bir kural tanımlanmalı.")
+    unknown = [k for k in overrides if k not in params]
+    if unknown:
+        raise RuleError(f"Tanımsız parametre: {', '.join(unknown)}")
+    for rule, _ in levels:
+        if rule not in compiler.rules:
+            raise RuleError(f"Seviye kuralı tanımsız: {rule}")
+    return Screen(name, text, params, dict(compiler.rules), compiler.columns, levels, description, builtin)
+
+
+def builtin_screens(volume_z_threshold: float = 1.0) -> Dict[str, Screen]:
+    """Yerleşik kural setleri (uygulama ayarlarıyla)."""
+    v2 = compile_screen(V2_RULES, BUILTIN_SCREEN, {"volume_z_threshold": volume_z_threshold}, V2_LEVELS,
+                        "V2 (Pullback + Reversal) stratejisi", builtin=True)
+    weekly = compile_screen(V2_WEEKLY_RULES, WEEKLY_SCREEN, {"volume_z_threshold": volume_z_threshold},
+                            V2_WEEKLY_LEVELS, "V2 + haftalık ortalama dizilimi teyidi", builtin=True)
+    return {v2.name: v2, weekly.name: weekly}
+
+
+# ---------- Değerlendirme ----------
+
+class ScreenData:
+    """Kuralların değerlendirildiği veri: cache'in bir nesli için panel ve tembel gösterge grafiği.
+    Göstergeler ilk istendiklerinde hesaplanır (sadece taramaların kullandığı sütunlar ve bağımlılıkları),
+    her biri veri sürümü başına bir kez. valid: en az min_bars barı olan semboller (diğerleri hiçbir kurala uymaz).
+    timeframes: zaman dilimi -> dönem barları (CompactCache) veren fonksiyon; üst zaman dilimi verisi
+    (aynı semboller, kendi paneli ve gösterge grafiği) ilk weekly./monthly. sütunu istendiğinde kurulur.
+    benchmark: göreli güç sütunlarının karşılaştırıldığı endeks sembolü (cache'te olmalı)."""
+
+    def __init__(self, panel: Panel, graph: IndicatorGraph, valid: np.ndarray, tail: int = TAIL_BARS,
+                 stamp: Any = None, timeframes: Optional[Callable[[str], CompactCache]] = None,
+                 benchmark: Optional[str] = None):
+        self.panel = panel
+        self.graph = graph
+        self.symbols = panel.symbols
+        self.valid = valid
+        self.tail = tail
+        self.stamp = stamp
+        self.timeframes = timeframes
+        self.benchmark = benchmark
+        self._higher: Dict[str, "ScreenData"] = {}
+        self._lock = threading.Lock()
+        T = panel.close.shape[0]
+        self.last_dates = panel.last_dates if T else np.full(len(self.symbols), np.datetime64('NaT'), 'datetime64[ns]')
+        self.shape = (max(1, min(T, tail)), len(self.symbols))
+
+    @classmethod
+    def build(cls, cache: Dict[str, pd.DataFrame], symbols: List[str], window: Optional[int] = None,
+              slope_period: int = 5, min_bars: int = MIN_BARS, tail: int = TAIL_BARS, stamp: Any = None,
+              timeframes: Optional[Callable[[str], CompactCache]] = None,
+              benchmark: Optional[str] = None) -> "ScreenData":
+        # Tampon (scratch) kullanılmaz: diziler nesil boyunca taramalar arasında paylaşılır
+        panel = build_panel(cache, symbols, window=window, benchmark=benchmark)
+        if timeframes is None:  # Saklanan görünüm yoksa dönem barları bu cache'ten baştan türetilir
+            timeframes = lambda tf: resample(cache if isinstance(cache, CompactCache) else CompactCache.build(cache), tf)
+        return cls(panel, IndicatorGraph(panel, slope_period), panel.lengths >= min_bars, tail, stamp, timeframes,
+                   benchmark)
+
+    def higher(self, timeframe: str) -> "ScreenData":
+        """Üst zaman dilimi verisi (aynı semboller ve sıra); ilk istendiğinde kurulur."""
+        with self._lock:
+            data = self._higher.get(timeframe)
+            if data is None:
+                data = self._higher[timeframe] = ScreenData.build(
+                    self.timeframes(timeframe), self.symbols, slope_period=self.graph.slope_period, min_bars=0,
+                    tail=self.tail, timeframes=self.timeframes, benchmark=self.benchmark)
+            return data
+
+    def last_values(self, name: str) -> np.ndarray:
+        """Sütunun her sembol için son bardaki değeri (sembol,) (ör. tarama tablosunun rs_rank sütunu)."""
+        return self.column(name)[-1]
+
+    def column(self, name: str) -> np.ndarray:
+        """Sütunun son `tail` barı (bar, sembol); gösterge henüz hesaplanmadıysa şimdi hesaplanır.
+        Üst zaman dilimi sütunları kendi son barlarıdır (az bar varsa baştan NaN ile tamamlanır)."""
+        timeframe, column = split_column(name)
+        if timeframe is not None:
+            values = self.higher(timeframe).column(column)[-self.shape[0]:]
+            if len(values) < self.shape[0]:
+                values = np.vstack([np.full((self.shape[0] - len(values), self.shape[1]), np.nan), values])
+            return values
+        if self.panel.close.shape[0] == 0:
+            return np.full(self.shape, np.nan)
+        return self.graph[name][-self.tail:]
+
+    @property
+    def computed(self) -> List[str]:
+        return list(self.graph.computed) + [f"{tf}.{name}" for tf, data in self._higher.items() for name in data.computed]
+
+    @property
+    def nbytes(self) -> int:
+        p = self.panel
+        return (p.close.nbytes + p.high.nbytes + p.low.nbytes + p.volume.nbytes + p.dates.nbytes + self.graph.nbytes
+                + sum(data.nbytes for data in self._higher.values()))
+
+
+class EvalContext:
+    """Tek değerlendirme geçişi: alt ifade anahtarı -> sonuç (taramalar arasında paylaşılır)."""
+
+    def __init__(self, data: Optional[ScreenData]):
+        self.data = data
+        self._memo: Dict[str, Any] = {}
+        self.evaluated = 0
+
+    def column(self, name: str) -> np.ndarray:
+        return self.data.column(name)
+
+    def value(self, node: _Node) -> Any:
+        try:
+            return self._memo[node.key]
+        except KeyError:
+            self.evaluated += 1
+            v = self._memo[node.key] = node.fn(self)
+            return v
+
+
+class ScreenResult:
+    def __init__(self, screen: Screen, data: ScreenData, flags: Dict[str, np.ndarray]):
+        self.screen = screen
+        self.data = data
+        self.flags = flags
+        self.matched = flags[screen.match]
+
+    def symbols(self) -> List[str]:
+        return [s for s, m in zip(self.data.symbols, self.matched) if m]
+
+    def to_dict(self, details: bool = False) -> Dict[str, Any]:
+        out = {"name": self.screen.name, "match": self.screen.match, "digest": self.screen.digest,
+               "count": int(self.matched.sum()), "symbols": self.symbols()}
+        if details:
+            labels = self.screen.level_labels(self.flags)
+            rows = []
+            for j in np.flatnonzero(self.matched):
+                row = {"symbol": self.data.symbols[j],
+                       "analysis_date": str(pd.Timestamp(self.data.last_dates[j]).date()),
+                       "flags": {k: bool(v[j]) for k, v in self.flags.items()},
+                       "values": {c: nullable_float(self.data.column(c)[-1, j]) for c in self.screen.columns}}
+                if labels is not None:
+                    row["level"] = str(labels[j])
+                rows.append(row)
+            out["rows"] = rows
+        return out
+
+
+def run_screens(screens: Sequence[Screen], data: ScreenData) -> Dict[str, ScreenResult]:
+    """Tüm taramaları tek bağlamda değerlendirir (ortak alt ifadeler bir kez hesaplanır)."""
+    ctx = EvalContext(data)
+    return {screen.name: ScreenResult(screen, data, screen.evaluate(ctx)) for screen in screens}
+
+
+# ---------- Kayıtlı taramalar (screens tablosu) ----------
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS screens (
+        name TEXT PRIMARY KEY,
+        rules TEXT NOT NULL,
+        description TEXT NOT NULL DEFAULT '',
+        updated_at REAL NOT NULL
+    ) WITHOUT ROWID;
+"""
+
+
+def init_screens(conn: sqlite3.Connection):
+    conn.executescript(SCHEMA)
+
+
+def validate_name(name: str):
+    if not SCREEN_NAME_RE.match(name or ""):
+        raise RuleError("Tarama adı 1-40 karakter olmalı (harf, rakam, _ ve -).")
+    if name in RESERVED_SCREEN_NAMES:
+        raise RuleError(f"'{name}' ayrılmış bir tarama adıdır.")
+
+
+def save_screen(conn: sqlite3.Connection, name: str, text: str, description: str = "") -> Screen:
+    """Kuralı derleyip (hatalıysa RuleError) kaydeder; aynı adlı tarama güncellenir."""
+    validate_name(name)
+    screen = compile_screen(text, name, description=description)
+    with conn:
+        conn.execute("INSERT INTO screens (name, rules, description, updated_at) VALUES (?, ?, ?, ?) "
+                     "ON CONFLICT(name) DO UPDATE SET rules = excluded.rules, description = excluded.description, "
+                     "updated_at = excluded.updated_at", (name, text, description, time.time()))
+    return screen
+
+
+def load_screen(conn: sqlite3.Connection, name: str) -> Optional[Screen]:
+    row = conn.execute("SELECT rules, description FROM screens WHERE name = ?", (name,)).fetchone()
+    return None if row is None else compile_screen(row[0], name, description=row[1])
+
+
+def list_screens(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    rows = conn.execute("SELECT name, rules, description, updated_at FROM screens ORDER BY name").fetchall()
+    return [{"name": n, "rules": r, "description": d, "updated_at": u, "builtin": False} for n, r, d, u in rows]
+
+
+def delete_screen(conn: sqlite3.Connection, name: str) -> bool:
+    with conn:
+        return conn.execute("DELETE FROM screens WHERE name = ?", (name,)).rowcount > 0
@@ -0,0 +1,169 @@
+# shared_cache.py
+
+"""
+Çok süreçli (multi-worker WSGI) kurulum için paylaşılan RAM cache.
+
+Tek bir yükleyici (loader) süreç kompakt cache dizilerini (CompactCache) sürüm numaralı bir klasöre
+.npy dosyaları olarak yayınlar; worker süreçleri bunları np.load(mmap_mode='r') ile salt okunur eşler.
+Sayfalar işletim sisteminin sayfa önbelleğinde tek kopyadır: N worker verinin tek kopyasını paylaşır.
+Klasörü /dev/shm altında seçmek diske hiç yazmadan aynı sonucu verir.
+
+    <dizin>/
+      CURRENT              # {"version": "v000000012", "generation": 12} (os.replace ile atomik)
+      v000000012/          # meta.json + offsets/axis/date_pos/close/high/low/volume.npy
+      v000000011/          # bir önceki sürüm (henüz geçiş yapmamış worker'lar için tutulur)
+
+* Yayınlama: sürüm klasörü geçici adla yazılır, yerine taşınır, sonra CURRENT değiştirilir. Okuyucu
+  hiçbir zaman yarım yazılmış bir sürüm görmez. Eşzamanlı yayınlar dosya kilidiyle sıralanır.
+* Nesil (generation) yükleyici yeniden başlasa da artmaya devam eder (CURRENT'tan okunur); worker'lar
+  nesli cache nesli olarak kullandığından ETag'ler ve sonuç önbellek anahtarları tüm worker'larda aynıdır.
+* Sembol veri sürümleri, yükleyicinin oturum kimliğiyle (origin) birlikte saklanır; yükleyici yeniden
+  başlayıp sayaç sıfırlansa da eski sürümle çakışmaz.
+* Eski sürümler silinirken onları eşlemiş worker'lar etkilenmez (POSIX: açık mmap dosyayı tutar).
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from compact_cache import CompactCache
+
+try:
+    import fcntl
+except ImportError:  # Windows: süreçler arası kilit yok (tek yükleyici varsayılır)
+    fcntl = None
+
+logger = logging.getLogger('SwingScanner')
+
+SHARED_FORMAT = 1
+ARRAYS = ('offsets', 'axis', 'date_pos', 'close', 'high', 'low', 'volume')
+CURRENT_FILE = 'CURRENT'
+LOCK_FILE = '.lock'
+
+# Bu sürecin yayınladığı sembol veri sürümlerinin kimliği (sayaç süreç başına sıfırdan başlar)
+ORIGIN = uuid.uuid4().hex[:12]
+
+
+class SharedCacheStore:
+    """Paylaşılan cache klasörü: publish() yükleyici tarafında, poll()/attach() worker tarafında."""
+
+    def __init__(self, path: str, keep: int = 3):
+        self.path = path
+        self.keep = max(2, keep)
+        self._current_stat: Optional[Tuple[int, int, int]] = None
+        self._current: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    # ---------- Okuma (worker) ----------
+
+    def current(self) -> Optional[Dict[str, Any]]:
+        """CURRENT içeriği; dosya değişmediyse (mtime/boyut) tekrar okunmaz."""
+        current_file = os.path.join(self.path, CURRENT_FILE)
+        try:
+            st = os.stat(current_file)
+        except FileNotFoundError:
+            return None
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)  # os.replace yeni inode üretir
+        with self._lock:
+            if key == self._current_stat:
+                return self._current
+        try:
+            with open(current_file, encoding='utf-8') as f:
+                current = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Paylaşılan cache CURRENT okunamadı: {e}")
+            return None
+        with self._lock:
+            self._current_stat, self._current = key, current
+        return current
+
+    def attach(self, current: Optional[Dict[str, Any]] = None) -> Optional[Tuple[CompactCache, int]]:
+        """Güncel sürümü salt okunur eşler. Dönüş: (cache, nesil); sürüm yoksa / okunamazsa None."""
+        current = current or self.current()
+        if current is None:
+            return None
+        version_dir = os.path.join(self.path, current['version'])
+        try:
+            with open(os.path.join(version_dir, 'meta.json'), encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('format') != SHARED_FORMAT:
+                logger.warning(f"Paylaşılan cache formatı uyumsuz ({meta.get('format')}), yok sayılıyor.")
+                return None
+            arrays = {name: np.load(os.path.join(version_dir, f'{name}.npy'), mmap_mode='r') for name in ARRAYS}
+        except (OSError, ValueError, KeyError) as e:
+            # Sürüm arada temizlenmiş olabilir: bir sonraki yoklamada yenisi denenir
+            logger.warning(f"Paylaşılan cache sürümü {current['version']} eşlenemedi: {e}")
+            return None
+        origin = meta['origin']
+        cache = CompactCache(list(meta['symbols']), np.asarray(arrays['offsets']), arrays['axis'],
+                             arrays['date_pos'], arrays['close'], arrays['high'], arrays['low'], arrays['volume'],
+                             meta['volume_missing'], [(origin, v) for v in meta['versions']])
+        return cache, int(current['generation'])
+
+    def poll(self, generation: Optional[int]) -> Optional[Tuple[CompactCache, int]]:
+        """Yayınlanmış nesil `generation`'dan farklıysa yeni sürümü eşleyip döner; değilse None."""
+        current = self.current()
+        if current is None or int(current['generation']) == generation:
+            return None
+        return self.attach(current)
+
+    # ---------- Yazma (yükleyici) ----------
+
+    def publish(self, cache: CompactCache, generation: int) -> int:
+        """cache'i yeni bir sürüm olarak yayınlar ve CURRENT'ı ona çevirir. Yayınlanan nesli döner
+        (en az generation; CURRENT'taki nesilden her zaman büyük)."""
+        t0 = time.perf_counter()
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, LOCK_FILE), 'a+') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                current = self.current()
+                if current is not None:
+                    generation = max(generation, int(current['generation']) + 1)
+                version = f"v{generation:09d}"
+                self._write_version(os.path.join(self.path, version), cache)
+                tmp = os.path.join(self.path, CURRENT_FILE + '.tmp')
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump({'version': version, 'generation': generation, 'published_at': time.time()}, f)
+                os.replace(tmp, os.path.join(self.path, CURRENT_FILE))
+                self._cleanup(version)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+        logger.info(f"Paylaşılan cache yayınlandı: nesil {generation}, {len(cache)} sembol, "
+                    f"{cache.nbytes / 2**20:.1f} MB ({time.perf_counter() - t0:.3f} sn).")
+        return generation
+
+    def _write_version(self, version_dir: str, cache: CompactCache):
+        tmp = version_dir + '.tmp'
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for name in ARRAYS:
+            np.save(os.path.join(tmp, f'{name}.npy'), getattr(cache, name))
+        meta = {
+            'format': SHARED_FORMAT,
+            'origin': ORIGIN,
+            'symbols': list(cache.symbols),
+            'versions': [int(v) for v in cache.versions],  # yükleyicinin kendi sayacı (stamp_version)
+            'volume_missing': cache.volume_missing,
+            'created_at': time.time(),
+        }
+        with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        shutil.rmtree(version_dir, ignore_errors=True)
+        os.replace(tmp, version_dir)
+
+    def _cleanup(self, current_version: str):
+        """En yeni `keep` sürüm dışındakileri siler (eşlemiş worker'lar açık dosyaları kullanmaya devam eder)."""
+        versions = sorted(d for d in os.listdir(self.path)
+                          if d.startswith('v') and not d.endswith('.tmp') and d != current_version)
+        for d in versions[:max(0, len(versions) - (self.keep - 1))]:
+            shutil.rmtree(os.path.join(self.path, d), ignore_errors=True)
@@ -0,0 +1,153 @@
+# signal_history.py
+
+"""
+Tarama sonuçlarının kalıcı geçmişi (signal_history tablosu) ve taramalar arası farklar.
+
+Her taramada sembol başına tek satır yazılır: (analysis_date, symbol) anahtarlı, aynı gün tekrar
+taranırsa satır güncellenir. Durum metni yerine küçük bir tamsayı kodu saklanır
+(0: Uygun Değil, 1: Trend Pozitif, 2: Orta, 3: Güçlü) ve kodlar sıralı olduğu için
+"yükselme / düşme" karşılaştırması doğrudan yapılır.
+
+Fark ("dünden bu yana ne değişti") motoru tekrar çalıştırmaz; iki tarihin satırları
+birincil anahtar üzerinden birleştirilir. Sembol bazlı geçmiş (symbol, analysis_date) indeksini kullanır.
+"""
+
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from panel_engine import STATUS_MEDIUM, STATUS_NONE, STATUS_STRONG, STATUS_TREND
+from scan_api import nullable_float
+
+STATUS_CODES = {STATUS_NONE: 0, STATUS_TREND: 1, STATUS_MEDIUM: 2, STATUS_STRONG: 3}
+STATUS_NAMES = {v: k for k, v in STATUS_CODES.items()}
+SIGNAL_CODE = STATUS_CODES[STATUS_MEDIUM]  # bu kod ve üstü "sinyal" sayılır
+STRONG_CODE = STATUS_CODES[STATUS_STRONG]
+
+METRIC_COLUMNS = ("price", "rsi", "macd_hist", "volume_zscore", "ma20_slope", "atr_percent")
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS signal_history (
+        analysis_date TEXT NOT NULL,
+        symbol TEXT NOT NULL,
+        status_code INTEGER NOT NULL,
+        is_strong INTEGER NOT NULL,
+        price REAL,
+        rsi REAL,
+        macd_hist REAL,
+        volume_zscore REAL,
+        ma20_slope REAL,
+        atr_percent REAL,
+        recorded_at REAL NOT NULL,
+        PRIMARY KEY (analysis_date, symbol)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_signal_history_symbol ON signal_history (symbol, analysis_date);
+"""
+
+UPSERT_SQL = f"""
+    INSERT INTO signal_history (analysis_date, symbol, status_code, is_strong, {", ".join(METRIC_COLUMNS)}, recorded_at)
+    VALUES (?, ?, ?, ?, {", ".join("?" for _ in METRIC_COLUMNS)}, ?)
+    ON CONFLICT(analysis_date, symbol) DO UPDATE SET
+        status_code = excluded.status_code,
+        is_strong = excluded.is_strong,
+        {", ".join(f"{c} = excluded.{c}" for c in METRIC_COLUMNS)},
+        recorded_at = excluded.recorded_at
+"""
+
+
+def init_history(conn: sqlite3.Connection):
+    conn.executescript(SCHEMA)
+
+
+def history_rows(results: Iterable[Tuple[str, Optional[Dict[str, Any]]]], recorded_at: float) -> List[tuple]:
+    """Tarama sonuçlarını (status, vals) tablo satırlarına çevirir. Verisi olmayan / hatalı semboller atlanır."""
+    rows = []
+    for status, vals in results:
+        code = STATUS_CODES.get(status)
+        if vals is None or code is None:
+            continue
+        rows.append((vals["analysis_date"], vals["symbol"], code, int(bool(vals["is_strong_signal"])),
+                     *(nullable_float(vals.get(c)) for c in METRIC_COLUMNS), recorded_at))
+    return rows
+
+
+def record_scan(conn: sqlite3.Connection, results: Iterable[Tuple[str, Optional[Dict[str, Any]]]]) -> int:
+    """Sonuçları tek transaction'da yazar (aynı gün + sembol güncellenir). Yazılan satır sayısını döner."""
+    rows = history_rows(results, time.time())
+    if rows:
+        with conn:
+            conn.executemany(UPSERT_SQL, rows)
+    return len(rows)
+
+
+def recorded_dates(conn: sqlite3.Connection, before: Optional[str] = None, limit: int = 2) -> List[str]:
+    """En yeni kayıtlı analiz tarihleri (azalan). before verilirse o tarihten öncekiler."""
+    if before:
+        cur = conn.execute("SELECT DISTINCT analysis_date FROM signal_history WHERE analysis_date < ? "
+                           "ORDER BY analysis_date DESC LIMIT ?", (before, limit))
+    else:
+        cur = conn.execute("SELECT DISTINCT analysis_date FROM signal_history "
+                           "ORDER BY analysis_date DESC LIMIT ?", (limit,))
+    return [r[0] for r in cur.fetchall()]
+
+
+def diff_signals(conn: sqlite3.Connection, date: Optional[str] = None,
+                 previous: Optional[str] = None) -> Dict[str, Any]:
+    """İki kayıt günü arasındaki değişiklikler: yeni güçlü sinyaller, düşen sinyaller, yükselen/düşen durumlar.
+    date verilmezse son kayıt günü, previous verilmezse ondan önceki kayıt günü kullanılır."""
+    if date is None:
+        dates = recorded_dates(conn, limit=1)
+        if not dates:
+            return {"date": None, "previous": None, "new_strong": [], "dropped": [], "upgrades": [], "downgrades": []}
+        date = dates[0]
+    if previous is None:
+        prev = recorded_dates(conn, before=date, limit=1)
+        previous = prev[0] if prev else None
+
+    # Her iki günün satırları birincil anahtar (analysis_date, symbol) üzerinden birleştirilir;
+    # önceki günde olup bugün olmayan semboller (veri kesilmesi) de düşen sinyal sayılır
+    rows = conn.execute("""
+        SELECT c.symbol, c.status_code, p.status_code FROM signal_history c
+        LEFT JOIN signal_history p ON p.analysis_date = ? AND p.symbol = c.symbol
+        WHERE c.analysis_date = ?
+        UNION ALL
+        SELECT p.symbol, NULL, p.status_code FROM signal_history p
+        WHERE p.analysis_date = ? AND p.status_code >= ?
+          AND NOT EXISTS (SELECT 1 FROM signal_history c WHERE c.analysis_date = ? AND c.symbol = p.symbol)
+    """, (previous, date, previous, SIGNAL_CODE, date)).fetchall()
+
+    out: Dict[str, Any] = {"date": date, "previous": previous,
+                           "new_strong": [], "dropped": [], "upgrades": [], "downgrades": []}
+    for symbol, cur, prev in sorted(rows):
+        if cur is not None and cur >= STRONG_CODE and (prev is None or prev < STRONG_CODE):
+            out["new_strong"].append(symbol)
+        if prev is not None and prev >= SIGNAL_CODE and (cur is None or cur < SIGNAL_CODE):
+            out["dropped"].append({"symbol": symbol, "from": STATUS_NAMES[prev],
+                                   "to": STATUS_NAMES[cur] if cur is not None else None})
+        if prev is not None and cur is not None and cur != prev:
+            change = {"symbol": symbol, "from": STATUS_NAMES[prev], "to": STATUS_NAMES[cur]}
+            out["upgrades" if cur > prev else "downgrades"].append(change)
+    return out
+
+
+def symbol_history(conn: sqlite3.Connection, symbol: str, since: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Bir sembolün kayıtlı sinyal geçmişi (tarih artan)."""
+    cols = ["analysis_date", "status_code", "is_strong", *METRIC_COLUMNS]
+    rows = conn.execute(f"SELECT {', '.join(cols)} FROM signal_history WHERE symbol = ? AND analysis_date >= ? "
+                        "ORDER BY analysis_date", (symbol, since or "")).fetchall()
+    out = []
+    for row in rows:
+        item = dict(zip(cols, row))
+        item["status"] = STATUS_NAMES[item["status_code"]]
+        item["is_strong"] = bool(item["is_strong"])
+        out.append(item)
+    return out
+
+
+def signal_counts(conn: sqlite3.Connection, since: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Gün bazında güçlü / orta sinyal sayıları (sinyal trendi)."""
+    rows = conn.execute("""
+        SELECT analysis_date, SUM(status_code = ?), SUM(status_code = ?), COUNT(*) FROM signal_history
+        WHERE analysis_date >= ? GROUP BY analysis_date ORDER BY analysis_date
+    """, (STRONG_CODE, SIGNAL_CODE, since or "")).fetchall()
+    return [{"date": d, "strong": s, "medium": m, "symbols": n} for d, s, m, n in rows]
@@ -0,0 +1,109 @@
+# signal_index.py
+
+"""
+Geçmiş tarihli (as_of) taramalar için önceden hesaplanmış tarih bazlı sinyal/gösterge indeksi.
+
+Son N yılın geçmişi tek panelde işlenir; her (bar, sembol) hücresi için tarama çıktısında kullanılan
+gösterge değerleri (VALUE_COLUMNS) ve kural bayrakları (FLAG_COLUMNS) saklanır. Göstergeler nedensel
+olduğundan (rolling/EWM sadece geçmiş barları kullanır) t barındaki değerler sadece t'ye kadarki
+barlarla hesaplanmış olur.
+
+scan(as_of) her sembol için as_of'a kadarki son barın satırını ikili arama ile bulur ve sonuçları
+normal taramayla aynı (status, vals) biçiminde üretir; maliyeti normal bir taramayla aynı düzeydedir.
+
+Not: Canlı motor son CACHE_WINDOW barla çalışır; indeks daha uzun geçmişle ısındığı için EWM tabanlı
+değerler (RSI/MACD/ATR) çok küçük farklar gösterebilir.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from panel_engine import (FLAG_COLUMNS, MIN_BARS, SIGNAL_OUTPUTS, STATUS_NO_DATA, VALUE_COLUMNS, build_panel,
+                          build_signal_result, compute_indicators, signal_masks)
+
+_NAT = np.iinfo(np.int64).min  # datetime64 NaT'nin int64 karşılığı (sıralamada en başta)
+
+
+class SignalIndex:
+    """(bar x sembol) gösterge/bayrak dizileri ve tarihleri. Yapılış: SignalIndex.build(...)."""
+
+    def __init__(self, symbols: List[str], dates: np.ndarray, price: np.ndarray,
+                 values: Dict[str, np.ndarray], flags: Dict[str, np.ndarray], bars_seen: np.ndarray,
+                 volume_z_threshold: float, slope_period: int, min_bars: int = MIN_BARS, stamp: Any = None):
+        self.symbols = list(symbols)
+        self.dates = dates.view(np.int64)  # NaT en küçük int64: sütun içinde artan sıralı
+        self.price = price
+        self.values = values
+        self.flags = flags
+        self.bars_seen = bars_seen
+        self.volume_z_threshold = volume_z_threshold
+        self.slope_period = slope_period
+        self.min_bars = min_bars
+        self.stamp = stamp  # kaynak verinin damgası (ör. DB MAX(id)); eskime kontrolü için
+        valid = self.dates[self.dates != _NAT]
+        self.first_date = pd.Timestamp(valid.min()) if valid.size else None
+        self.last_date = pd.Timestamp(valid.max()) if valid.size else None
+
+    @classmethod
+    def build(cls, frames: Dict[str, pd.DataFrame], symbols: List[str], start: Optional[str] = None,
+              volume_z_threshold: float = 1.0, slope_period: int = 5, min_bars: int = MIN_BARS,
+              stamp: Any = None) -> "SignalIndex":
+        """frames: sembol -> date indeksli close/high/low/volume (start öncesinde ısınma barları dahil).
+        start verilirse sadece bu tarihten sonraki satırlar saklanır (bellek)."""
+        panel = build_panel(frames, symbols)
+        T = panel.close.shape[0]
+        ind = compute_indicators(panel, slope_period=slope_period, outputs=SIGNAL_OUTPUTS) if T else {}
+        masks = signal_masks(panel.close, ind, volume_z_threshold=volume_z_threshold) if T else {}
+        bars_seen = np.arange(1, T + 1)[:, None] - (T - panel.lengths)[None, :]
+
+        first = 0
+        if start and T:
+            # Tüm sembollerde start'tan önce kalan satırlar atılır
+            before = (panel.dates < np.datetime64(pd.Timestamp(start))) | np.isnat(panel.dates)
+            first = int(np.argmin(before.all(axis=1))) if not before.all() else T
+        keep = slice(first, T)
+        return cls(panel.symbols, panel.dates[keep].copy(), panel.close[keep].copy(),
+                   {k: ind[k][keep].copy() for k in VALUE_COLUMNS} if T else {},
+                   {k: masks[k][keep].copy() for k in FLAG_COLUMNS} if T else {},
+                   bars_seen[keep].copy(), volume_z_threshold, slope_period, min_bars, stamp)
+
+    def covers(self, as_of) -> bool:
+        return self.first_date is not None and self.first_date <= pd.Timestamp(as_of)
+
+    def rows_for(self, as_of) -> np.ndarray:
+        """Her sembol için as_of günü (dahil) ve öncesindeki son barın satır indeksi; yoksa -1."""
+        cutoff = pd.Timestamp(as_of).normalize() + pd.Timedelta(days=1)
+        key = np.int64(cutoff.value)
+        rows = np.empty(len(self.symbols), dtype=np.int64)
+        for j in range(len(self.symbols)):
+            rows[j] = np.searchsorted(self.dates[:, j], key, side='left') - 1
+        valid = rows >= 0
+        rows[valid & (self.dates[np.maximum(rows, 0), np.arange(len(rows))] == _NAT)] = -1
+        return rows
+
+    def scan(self, as_of) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+        """as_of gününde tarayıcının göstereceği sonuçlar (lot hariç), sembol sırasıyla."""
+        rows = self.rows_for(as_of)
+        results = []
+        for j, symbol in enumerate(self.symbols):
+            t = rows[j]
+            if t < 0 or self.bars_seen[t, j] < self.min_bars:
+                results.append((STATUS_NO_DATA, None))
+                continue
+            results.append(build_signal_result(
+                symbol, self.price[t, j],
+                {k: v[t, j] for k, v in self.values.items()},
+                {k: bool(v[t, j]) for k, v in self.flags.items()},
+                str(pd.Timestamp(self.dates[t, j]).date()), self.volume_z_threshold))
+        return results
+
+    def trading_days(self) -> List[str]:
+        """İndeksteki işlem günleri (en az bir sembolün barı olan günler)."""
+        days = np.unique(self.dates[self.dates != _NAT])
+        return [str(pd.Timestamp(d).date()) for d in days]
+
+    def nbytes(self) -> int:
+        arrays = [self.dates, self.price, self.bars_seen, *self.values.values(), *self.flags.values()]
+        return int(sum(a.nbytes for a in arrays))
@@ -0,0 +1,168 @@
+# snapshot_store.py
+
+"""
+RAM Cache için sütunsal (columnar) disk snapshot'ı.
+
+Başlangıçta sembol başına read_sql + parse_dates yerine, cache penceresi tek bir klasörde
+bitişik diziler olarak tutulur ve np.load(mmap_mode='r') ile eşlenir:
+
+    snapshot/
+      meta.json      # format, pencere, kaynak DB damgası (MAX(id)), sembol listesi
+      offsets.npy    # int64, len = sembol + 1; i. sembolün satırları offsets[i]:offsets[i+1]
+      dates.npy      # int64 (datetime64[ns])
+      close.npy high.npy low.npy              # float32 (RAM cache ile aynı hassasiyet)
+      volume.npy                              # float64 (NULL hacim -> NaN)
+
+RAM cache (CompactCache) bu dizilerden DataFrame kurmadan oluşturulur; process worker'ları
+snapshot'ı doğrudan eşler (frames(): kopyasız, salt okunur görünümler).
+SQLite her zaman asıl kaynaktır; snapshot eskiyse yeniden kurulur.
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from compact_cache import CompactCache, PRICE_DTYPE
+
+logger = logging.getLogger('SwingScanner')
+
+SNAPSHOT_FORMAT = 2
+COLUMNS = ('close', 'high', 'low', 'volume')
+COLUMN_DTYPES = {'close': PRICE_DTYPE, 'high': PRICE_DTYPE, 'low': PRICE_DTYPE, 'volume': np.float64}
+
+_WRITE_LOCK = threading.Lock()
+
+
+def db_stamp(db_file: str) -> int:
+    """DB'nin snapshot'a göre güncelliğini belirlemek için ucuz damga: MAX(id) (rowid üzerinden O(log n)).
+    prices tablosu AUTOINCREMENT olduğundan her yeni satır damgayı artırır."""
+    conn = sqlite3.connect(db_file, check_same_thread=False)
+    try:
+        return int(conn.execute("SELECT COALESCE(MAX(id), 0) FROM prices").fetchone()[0])
+    finally:
+        conn.close()
+
+
+@dataclass
+class Snapshot:
+    symbols: List[str]
+    offsets: np.ndarray
+    dates: np.ndarray
+    columns: Dict[str, np.ndarray]
+    meta: Dict[str, Any]
+
+    @property
+    def window(self) -> int:
+        return int(self.meta.get('window', 0))
+
+    @property
+    def source_stamp(self) -> int:
+        return int(self.meta.get('source_stamp', -1))
+
+    def frame(self, i: int) -> pd.DataFrame:
+        """i. sembolün barlarını kopyasız DataFrame görünümü olarak döner."""
+        a, b = int(self.offsets[i]), int(self.offsets[i + 1])
+        index = pd.DatetimeIndex(self.dates[a:b].view('datetime64[ns]'), name='date')
+        return pd.DataFrame({c: self.columns[c][a:b] for c in COLUMNS}, index=index, copy=False)
+
+    def frames(self, symbols: Optional[Iterable[str]] = None) -> Dict[str, pd.DataFrame]:
+        """Sembol -> DataFrame görünümü. symbols verilirse sadece snapshot'ta olanlar döner."""
+        pos = {s: i for i, s in enumerate(self.symbols)}
+        wanted = self.symbols if symbols is None else [s for s in symbols if s in pos]
+        return {s: self.frame(pos[s]) for s in wanted if self.offsets[pos[s] + 1] > self.offsets[pos[s]]}
+
+
+def write_snapshot(path: str, cache: Dict[str, pd.DataFrame], window: int, source_stamp: int) -> Dict[str, Any]:
+    """Cache'i sütunsal snapshot olarak yazar. Önce geçici klasöre yazılır, sonra yer değiştirilir;
+    okuyucular yarım yazılmış bir snapshot görmez (mevcut mmap'ler eski dosyaları tutmaya devam eder)."""
+    t0 = time.perf_counter()
+    if isinstance(cache, CompactCache):
+        symbols, offsets, dates, columns = cache.export(window)
+    else:
+        symbols, offsets, dates, columns = _frame_columns(cache, window)
+    total = int(offsets[-1])
+
+    meta = {
+        'format': SNAPSHOT_FORMAT,
+        'window': window,
+        'source_stamp': source_stamp,
+        'rows': total,
+        'created_at': time.time(),
+        'symbols': symbols,
+    }
+
+    with _WRITE_LOCK:
+        tmp, old = path + '.tmp', path + '.old'
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        np.save(os.path.join(tmp, 'offsets.npy'), offsets)
+        np.save(os.path.join(tmp, 'dates.npy'), dates)
+        for c in COLUMNS:
+            np.save(os.path.join(tmp, f'{c}.npy'), columns[c])
+        with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+        shutil.rmtree(old, ignore_errors=True)
+        if os.path.isdir(path):
+            os.replace(path, old)
+        os.replace(tmp, path)
+        shutil.rmtree(old, ignore_errors=True)
+
+    logger.info(f"Snapshot yazıldı: {len(symbols)} sembol, {total} satır ({time.perf_counter() - t0:.3f} sn).")
+    return meta
+
+
+def _frame_columns(cache: Dict[str, pd.DataFrame], window: int):
+    symbols = [s for s, df in cache.items() if df is not None and not df.empty]
+    frames = [cache[s].tail(window) for s in symbols]
+    lengths = np.fromiter((len(df) for df in frames), dtype=np.int64, count=len(frames))
+    offsets = np.zeros(len(frames) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+
+    total = int(offsets[-1])
+    dates = np.empty(total, dtype=np.int64)
+    columns = {c: np.empty(total, dtype=COLUMN_DTYPES[c]) for c in COLUMNS}
+    for df, a, b in zip(frames, offsets[:-1], offsets[1:]):
+        dates[a:b] = df.index.as_unit('ns').asi8
+        block = df[list(COLUMNS)].to_numpy(dtype=np.float64)
+        for k, c in enumerate(COLUMNS):
+            columns[c][a:b] = block[:, k]
+    return symbols, offsets, dates, columns
+
+
+def load_snapshot(path: str) -> Optional[Snapshot]:
+    """Snapshot'ı bellek eşlemeli (mmap) açar. Yoksa veya format uyumsuzsa None döner."""
+    meta_file = os.path.join(path, 'meta.json')
+    if not os.path.exists(meta_file):
+        return None
+    try:
+        with open(meta_file, encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('format') != SNAPSHOT_FORMAT:
+            logger.warning(f"Snapshot formatı uyumsuz ({meta.get('format')}), yok sayılıyor.")
+            return None
+        load = lambda name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+        snap = Snapshot(
+            symbols=list(meta['symbols']),
+            offsets=np.asarray(load('offsets')),
+            dates=load('dates'),
+            columns={c: load(c) for c in COLUMNS},
+            meta=meta,
+        )
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Snapshot okunamadı, yok sayılıyor: {e}")
+        return None
+
+    if len(snap.offsets) != len(snap.symbols) + 1 or int(snap.offsets[-1]) != len(snap.dates):
+        logger.warning("Snapshot bozuk (offset/satır sayısı uyuşmuyor), yok sayılıyor.")
+        return None
+    return snap
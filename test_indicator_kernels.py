@@ -0,0 +1,305 @@
+# test_indicator_kernels.py
+
+"""
+indicator_kernels (NumPy) ile önceki pandas hesaplarının eşitlik testleri.
+
+Her kernel 1-D (tek sembol) ve 2-D (bar x sembol) girdiyle pandas karşılığına karşı doğrulanır; girdiler
+hizalama dolgusu (baştaki NaN), aradaki NaN boşlukları, sabit pencereler (std = 0) ve pencereden kısa
+seriler içerir. indicators_v2 fonksiyonları da önceki pandas sürümleriyle karşılaştırılır.
+
+    python -m pytest -q test_indicator_kernels.py
+    python -m unittest test_indicator_kernels
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+import indicator_kernels as kernels
+from indicators_v2 import calculate_atr, calculate_ma_slope, calculate_macd, calculate_rsi, calculate_volume_zscore
+
+RTOL = 1e-9  # göreli tolerans (|değer| < 1 için mutlak); benchmarks.KERNEL_RTOL ile aynı
+BARS = 260
+
+
+def _prices(seed: int = 0, bars: int = BARS) -> np.ndarray:
+    """(bar, sembol) kapanışlar; sütunlar farklı uç durumlar içerir."""
+    rng = np.random.default_rng(seed)
+    walk = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.02, (bars, 6)), axis=0))
+    walk[:40, 1] = np.nan                   # hizalama dolgusu (sembolün verisi geç başlıyor)
+    walk[100:103, 2] = np.nan               # aradaki NaN boşluğu
+    walk[60:120, 3] = walk[59, 3]           # sabit pencereler
+    walk[:, 4] = 1e6 + rng.normal(0.0, 1e-3, bars)  # ortalamaya göre çok küçük varyans
+    walk[:bars - 10, 5] = np.nan            # pencereden kısa seri
+    return walk
+
+
+WELL_CONDITIONED = [0, 1, 2, 5]  # pandas rolling().std()'un kendi hatasının RTOL altında kaldığı sütunlar
+
+
+def _volumes(seed: int = 1, bars: int = BARS) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    vol = rng.integers(1_000, 50_000, (bars, 6)).astype(float)
+    vol[:40, 1] = np.nan
+    vol[100:103, 2] = np.nan
+    vol[60:120, 3] = 7_000.0
+    vol[:bars - 10, 5] = np.nan
+    return vol
+
+
+class KernelTestCase(unittest.TestCase):
+
+    def assertMatches(self, actual, expected, msg: str = ""):
+        actual = np.asarray(actual, dtype=float)
+        expected = np.asarray(expected, dtype=float)
+        self.assertEqual(actual.shape, expected.shape, msg)
+        nan_a, nan_e = np.isnan(actual), np.isnan(expected)
+        self.assertTrue(np.array_equal(nan_a, nan_e),
+                        f"{msg}: NaN konumları farklı ({int((nan_a != nan_e).sum())} hücre)")
+        both = ~nan_e
+        diff = np.abs(actual[both] - expected[both]) / np.maximum(1.0, np.abs(expected[both]))
+        self.assertLessEqual(float(diff.max(initial=0.0)), RTOL, msg)
+
+    def assertBothShapes(self, kernel, reference, *inputs: np.ndarray, msg: str = ""):
+        """kernel(*inputs) -> reference(*DataFrame'ler); önce 2-D panel, sonra her sütun 1-D seri olarak."""
+        self.assertMatches(kernel(*inputs), reference(*(pd.DataFrame(x) for x in inputs)).to_numpy(), f"{msg} 2-D")
+        for j in range(inputs[0].shape[1]):
+            self.assertMatches(kernel(*(x[:, j].copy() for x in inputs)),
+                               reference(*(pd.Series(x[:, j]) for x in inputs)).to_numpy(), f"{msg} 1-D sütun {j}")
+
+
+class TestEwmMean(KernelTestCase):
+
+    def test_matches_pandas(self):
+        close = _prices()
+        for alpha, adjust, min_periods in [(2.0 / 27, False, 0), (2.0 / 15, False, 14), (1.0 / 14, True, 14),
+                                           (0.5, True, 0)]:
+            self.assertBothShapes(lambda x: kernels.ewm_mean(x, alpha, adjust=adjust, min_periods=min_periods),
+                                  lambda x: x.ewm(alpha=alpha, adjust=adjust, min_periods=min_periods).mean(),
+                                  close, msg=f"alpha={alpha:.4f} adjust={adjust} min_periods={min_periods}")
+
+    def test_in_place(self):
+        close = _prices()
+        expected = pd.DataFrame(close).ewm(alpha=0.1, adjust=False).mean().to_numpy()
+        self.assertMatches(kernels.ewm_mean(close, 0.1, out=close), expected)
+
+    def test_shorter_than_min_periods(self):
+        x = np.array([1.0, 2.0, 3.0])
+        self.assertTrue(np.isnan(kernels.ewm_mean(x, 1.0 / 14, adjust=True, min_periods=14)).all())
+
+
+class TestRolling(KernelTestCase):
+
+    def test_mean_and_std_match_pandas(self):
+        for data in (_prices(), _volumes()):
+            for window in (5, 20, 50):
+                self.assertBothShapes(lambda x: kernels.rolling_mean(x, window), lambda x: x.rolling(window).mean(),
+                                      data, msg=f"rolling_mean({window})")
+                self.assertBothShapes(lambda x: kernels.rolling_std(x, window), lambda x: x.rolling(window).std(),
+                                      data[:, WELL_CONDITIONED], msg=f"rolling_std({window})")
+
+    def test_std_matches_two_pass(self):
+        # Sabit dönemden çıkan (3) ve büyük ortalamalı (4) sütunlarda pandas'ın kayan algoritması ~1e-6 sapar;
+        # kernel iki geçişli (kesin) hesapla karşılaştırılır
+        def two_pass(x, window):
+            out = np.full(x.shape, np.nan)
+            if len(x) >= window:
+                out[window - 1:] = sliding_window_view(x, window, axis=0).std(axis=-1, ddof=1)
+            return pd.DataFrame(out) if x.ndim == 2 else pd.Series(out)
+
+        for window in (5, 20, 50):
+            self.assertBothShapes(lambda x: kernels.rolling_std(x, window),
+                                  lambda x: two_pass(x.to_numpy(), window), _prices(), msg=f"rolling_std({window})")
+
+    def test_constant_windows_are_exact(self):
+        close = _prices()
+        const = slice(60 + 19, 120)  # tamamı sabit 20 barlık pencereler
+        self.assertTrue((kernels.rolling_std(close, 20)[const, 3] == 0.0).all())
+        self.assertTrue((kernels.rolling_mean(close, 20)[const, 3] == close[59, 3]).all())
+
+    def test_shorter_than_window(self):
+        x = np.arange(10, dtype=float)
+        for fn in (kernels.rolling_mean, kernels.rolling_std):
+            self.assertTrue(np.isnan(fn(x, 20)).all())
+            self.assertTrue(np.isnan(fn(x.reshape(5, 2), 20)).all())
+
+
+def _pandas_rsi_averages(close, window: int = 14):
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0).mask(close.isna())
+    loss = (-delta.where(delta < 0, 0)).mask(close.isna())
+    return (gain.ewm(com=window - 1, min_periods=window).mean(),
+            loss.ewm(com=window - 1, min_periods=window).mean())
+
+
+class TestRsiAverages(KernelTestCase):
+
+    def test_matches_pandas(self):
+        close = _prices()
+        for part in (0, 1):
+            self.assertBothShapes(lambda x: kernels.rsi_averages(x)[part], lambda x: _pandas_rsi_averages(x)[part],
+                                  close, msg=("avg_gain", "avg_loss")[part])
+
+    def test_rsi_zero_loss_is_nan(self):
+        close = np.arange(1.0, 31.0)  # sürekli yükseliş: kayıp 0, RS sonsuz
+        rsi = kernels.rsi_from_averages(*kernels.rsi_averages(close))
+        self.assertTrue(np.isnan(rsi).all())
+
+
+class TestZscore(KernelTestCase):
+
+    def test_matches_pandas(self):
+        def reference(volume):
+            mean, std = volume.rolling(20).mean(), volume.rolling(20).std()
+            z = (volume - mean) / std
+            z[std == 0] = 0
+            return z.fillna(0)
+
+        def kernel(volume):
+            return kernels.zscore(volume, kernels.rolling_mean(volume, 20), kernels.rolling_std(volume, 20))
+
+        self.assertBothShapes(kernel, reference, _volumes(), msg="volume_zscore")
+
+    def test_zero_std_is_zero(self):
+        z = kernels.zscore(np.array([5.0, 5.0]), np.array([5.0, 4.0]), np.array([0.0, 0.0]))
+        self.assertTrue((z == 0.0).all())
+
+
+class TestRelativeStrength(KernelTestCase):
+
+    def test_matches_pandas(self):
+        close = _prices()
+        benchmark = np.repeat(_prices(seed=7)[:, :1], close.shape[1], axis=1)
+        benchmark[150:152] = np.nan  # endekste eksik günler
+        for period in (21, 63, 126):
+            self.assertBothShapes(
+                lambda c, b: kernels.relative_strength(c, b, period),
+                lambda c, b: ((c / c.shift(period)) / (b / b.shift(period)) - 1).replace([np.inf, -np.inf], np.nan),
+                close, benchmark, msg=f"rs_{period}")
+
+    def test_shorter_than_period(self):
+        x = np.linspace(1.0, 2.0, 10)
+        self.assertTrue(np.isnan(kernels.relative_strength(x, x, 21)).all())
+
+
+def _pandas_percentile_rank(x: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    long = pd.DataFrame({"g": groups.ravel(), "v": x.ravel()})
+    return (long.groupby("g")["v"].rank(pct=True) * 100).to_numpy().reshape(x.shape)
+
+
+class TestPercentileRank(KernelTestCase):
+
+    def _returns(self) -> np.ndarray:
+        close = _prices()
+        return kernels.relative_strength(close, np.ones_like(close), 21)
+
+    def test_aligned_dates(self):
+        x = self._returns()
+        days = np.repeat(np.arange(x.shape[0])[:, np.newaxis], x.shape[1], axis=1)
+        self.assertMatches(kernels.percentile_rank(x, days), _pandas_percentile_rank(x, days))
+        self.assertMatches(kernels.percentile_rank(x, days),
+                           pd.DataFrame(x).rank(axis=1, pct=True).to_numpy() * 100, "rank(axis=1)")
+
+    def test_misaligned_dates(self):
+        x = self._returns()
+        days = np.repeat(np.arange(x.shape[0])[:, np.newaxis], x.shape[1], axis=1)
+        days[:, 2] -= 3  # tarihi geride kalan sembol (sağa hizalı panel)
+        days[:, 4] -= 1
+        self.assertMatches(kernels.percentile_rank(x, days), _pandas_percentile_rank(x, days))
+
+    def test_ties(self):
+        x = np.round(self._returns(), 2)  # yuvarlanmış değerlerde eşitler ortalama sıra alır
+        x[:, 3] = x[:, 0]
+        days = np.repeat(np.arange(x.shape[0])[:, np.newaxis], x.shape[1], axis=1)
+        self.assertMatches(kernels.percentile_rank(x, days), _pandas_percentile_rank(x, days))
+
+    def test_one_dimensional(self):
+        x = self._returns()[:, 0]
+        days = np.arange(len(x))
+        self.assertMatches(kernels.percentile_rank(x, days), _pandas_percentile_rank(x, days))
+
+    def test_all_nan(self):
+        x = np.full((5, 3), np.nan)
+        self.assertTrue(np.isnan(kernels.percentile_rank(x, np.zeros((5, 3), dtype=np.int64))).all())
+
+
+# Önceki (kernel öncesi) pandas göstergeleri: indicators_v2 bunlarla aynı sonucu vermeli
+
+def _old_rsi(df, window=14):
+    delta = df['close'].diff()
+    gain = delta.where(delta > 0, 0)
+    loss = -delta.where(delta < 0, 0)
+    avg_gain = gain.ewm(com=window - 1, min_periods=window).mean()
+    avg_loss = loss.ewm(com=window - 1, min_periods=window).mean()
+    rs = (avg_gain / avg_loss).replace([np.inf, -np.inf], np.nan)
+    df['rsi'] = 100 - (100 / (1 + rs))
+    return df
+
+
+def _old_macd(df, fast=12, slow=26, signal=9):
+    df['ema_fast'] = df['close'].ewm(span=fast, adjust=False).mean()
+    df['ema_slow'] = df['close'].ewm(span=slow, adjust=False).mean()
+    df['macd'] = df['ema_fast'] - df['ema_slow']
+    df['macd_signal_line'] = df['macd'].ewm(span=signal, adjust=False).mean()
+    df['macd_hist'] = df['macd'] - df['macd_signal_line']
+    return df
+
+
+def _old_atr(df, window=14):
+    high_low = df['high'] - df['low']
+    high_close = np.abs(df['high'] - df['close'].shift(1))
+    low_close = np.abs(df['low'] - df['close'].shift(1))
+    df['tr'] = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
+    df['atr'] = df['tr'].ewm(span=window, adjust=False, min_periods=window).mean()
+    df['atr_percent'] = (df['atr'] / df['close']) * 100
+    return df
+
+
+def _old_volume_zscore(df, window=20):
+    df['volume_ma'] = df['volume'].rolling(window=window).mean()
+    df['volume_std'] = df['volume'].rolling(window=window).std()
+    zscore = (df['volume'] - df['volume_ma']) / df['volume_std']
+    zscore[df['volume_std'] == 0] = 0
+    df['volume_zscore'] = zscore.fillna(0)
+    return df
+
+
+def _old_ma_slope(df, ma_period=20, slope_period=5):
+    ma_col = f'ma{ma_period}'
+    df[f'{ma_col}_slope'] = df[ma_col] - df[ma_col].shift(slope_period)
+    return df
+
+
+class TestIndicatorsV2(KernelTestCase):
+
+    CASES = [
+        (_old_rsi, calculate_rsi, ('rsi',)),
+        (_old_macd, calculate_macd, ('ema_fast', 'ema_slow', 'macd', 'macd_signal_line', 'macd_hist')),
+        (_old_atr, calculate_atr, ('tr', 'atr', 'atr_percent')),
+        (_old_volume_zscore, calculate_volume_zscore, ('volume_ma', 'volume_std', 'volume_zscore')),
+        (_old_ma_slope, calculate_ma_slope, ('ma20_slope',)),
+    ]
+
+    def _frames(self):
+        close, volume = _prices(), _volumes()
+        rng = np.random.default_rng(3)
+        for j in (0, 3, 4):  # indicators_v2 DB'den gelen (NaN'sız) sembol serileriyle çalışır
+            for length in (BARS, 15):  # 15 bar: göstergelerin pencerelerinden kısa
+                c = pd.Series(close[-length:, j])
+                spread = np.abs(rng.normal(0.0, 0.01, length)) * c
+                df = pd.DataFrame({'close': c, 'high': c + spread, 'low': c - spread, 'volume': volume[-length:, j]})
+                df['ma20'] = df['close'].rolling(window=20).mean()
+                yield j, length, df
+
+    def test_matches_old_pandas(self):
+        for j, length, df in self._frames():
+            for reference, fn, columns in self.CASES:
+                expected, actual = reference(df.copy()), fn(df.copy())
+                for col in columns:
+                    self.assertMatches(actual[col], expected[col], f"{fn.__name__}.{col} sütun {j}, {length} bar")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,245 @@
+# timeframes.py
+
+"""
+Üst zaman dilimi (haftalık / aylık) OHLCV görünümleri.
+
+Görünümler günlük RAM cache'ten (CompactCache) türetilir; ek veri indirilmez:
+
+    close   dönemin son günlük kapanışı
+    high    dönemdeki en yüksek, low en düşük (NaN'lar atlanır)
+    volume  dönem toplamı (NULL hacimler atlanır; dönemde hiç hacim yoksa NULL)
+    tarih   dönemin cache'teki son günlük barının tarihi
+
+Haftalar Pazartesi başlar, aylar takvim ayıdır. İçinde bulunulan dönemin barı o güne kadarki günlerle kuruludur
+(ör. Çarşamba günü haftalık bar Pazartesi-Çarşamba barlarından oluşur).
+
+* İlk kurulum tüm evren için tek geçişte vektörel yapılır (resample_entries: dönem sınırlarında reduceat).
+* TimeframeStore sembol başına dönem barlarını günlük veri sürümüyle saklar. Yeni günlük bar geldiğinde
+  (merge_into_cache -> on_merge) sadece son dönem güncellenir ya da yeni dönem eklenir; pencere başından düşen
+  günler yüzünden ilk dönem de günlük barlardan yeniden kurulur. Aradaki tamamlanmış dönemlere dokunulmaz ve
+  sonuç güncel pencerenin baştan resample edilmesiyle birebir aynıdır (verify_timeframes).
+* Görünüm bir CompactCache'tir (sürümler günlük veriyle aynı): build_panel / IndicatorGraph doğrudan üzerinde
+  çalışır, screener_rules'ta weekly.<sütun> / monthly.<sütun> olarak kullanılır.
+
+Not: Cache son CACHE_WINDOW günlük barı tuttuğu için ilk dönem eksik olabilir (close doğrudur; high/low/volume
+sadece penceredeki günlerden). 300 günlük pencere ~60 hafta / ~14 ay eder: 50 haftalık ortalama hesaplanır,
+aylık göstergelerin uzun olanları NaN kalır (NaN içeren kurallar eşleşmez).
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from compact_cache import COLUMNS, CompactCache, Entry
+from scan_cache import data_version, stamp_version
+
+logger = logging.getLogger('SwingScanner')
+
+TIMEFRAMES = ("weekly", "monthly")
+
+# (tarihler int64 ns, close, high, low, volume) float64
+Rows = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+def check_timeframe(timeframe: str):
+    if timeframe not in TIMEFRAMES:
+        raise ValueError(f"Bilinmeyen zaman dilimi: {timeframe} (geçerli: {', '.join(TIMEFRAMES)})")
+
+
+def period_ids(dates: np.ndarray, timeframe: str) -> np.ndarray:
+    """int64 ns tarihler -> artan dönem numarası (aynı hafta / ay aynı numara)."""
+    days = np.asarray(dates, dtype=np.int64).view('datetime64[ns]').astype('datetime64[D]')
+    if timeframe == "weekly":
+        return (days.astype(np.int64) + 3) // 7  # 1970-01-01 Perşembe: +3 ile haftalar Pazartesi başlar
+    if timeframe == "monthly":
+        return days.astype('datetime64[M]').astype(np.int64)
+    check_timeframe(timeframe)
+
+
+def _resample_rows(segments: np.ndarray, rows: Rows, timeframe: str) -> Tuple[np.ndarray, Rows]:
+    """Segmentlere (sembol) göre sıralı günlük barlar -> dönem barları. Dönüş: (dönem barlarının segmenti, barlar)."""
+    dates, close, high, low, volume = rows
+    n = len(dates)
+    if n == 0:
+        return segments[:0], rows
+    pid = period_ids(dates, timeframe)
+    first = np.ones(n, dtype=bool)
+    first[1:] = (pid[1:] != pid[:-1]) | (segments[1:] != segments[:-1])
+    starts = np.flatnonzero(first)
+    last = np.empty_like(starts)
+    last[:-1] = starts[1:] - 1
+    last[-1] = n - 1
+    present = ~np.isnan(volume)
+    vol = np.add.reduceat(np.where(present, volume, 0.0), starts)
+    vol[~np.logical_or.reduceat(present, starts)] = np.nan
+    bars = (dates[last], close[last], np.fmax.reduceat(high, starts), np.fmin.reduceat(low, starts), vol)
+    return segments[starts], bars
+
+
+def _frame_rows(df: pd.DataFrame) -> Rows:
+    return (df.index.as_unit('ns').asi8, *(df[c].to_numpy(dtype=np.float64, na_value=np.nan) for c in COLUMNS))
+
+
+def resample_frame(df: pd.DataFrame, timeframe: str) -> Entry:
+    """Tek sembolün günlük barları (DataFrame) -> dönem barları (veri sürümü df'inki)."""
+    rows = _frame_rows(df)
+    _, bars = _resample_rows(np.zeros(len(rows[0]), dtype=np.int64), rows, timeframe)
+    return bars + (data_version(df),)
+
+
+def resample_entries(cache: CompactCache, timeframe: str,
+                     symbols: Optional[Sequence[str]] = None) -> Dict[str, Entry]:
+    """Cache'teki sembollerin (None: tümü) dönem barları, tek vektörel geçişte. Sürümler cache'inkidir."""
+    check_timeframe(timeframe)
+    symbols = [s for s in (cache.symbols if symbols is None else symbols) if s in cache]
+    pos = cache.positions(symbols)
+    starts, ends = cache.offsets[pos], cache.offsets[pos + 1]
+    lengths = ends - starts
+    # Seçilen sembollerin satırları (sembol sırasıyla) tek indeks dizisiyle okunur
+    segments = np.repeat(np.arange(len(symbols)), lengths)
+    idx = np.arange(int(lengths.sum()), dtype=np.int64) + np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    rows = (cache.axis[cache.date_pos[idx]], cache.close[idx].astype(np.float64), cache.high[idx].astype(np.float64),
+            cache.low[idx].astype(np.float64), cache.decode_volume(cache.volume[idx]))
+    bar_segments, bars = _resample_rows(segments, rows, timeframe)
+    bounds = np.searchsorted(bar_segments, np.arange(len(symbols) + 1))
+    return {s: tuple(a[bounds[i]:bounds[i + 1]] for a in bars) + (cache.versions[p],)
+            for i, (s, p) in enumerate(zip(symbols, pos))}
+
+
+def resample(cache: CompactCache, timeframe: str) -> CompactCache:
+    """Cache'in dönem barları görünümü (artımlı saklama olmadan, baştan)."""
+    entries = resample_entries(cache, timeframe)
+    return CompactCache.from_entries(list(entries), list(entries.values()))
+
+
+def extend_entry(entry: Entry, merged: pd.DataFrame, timeframe: str) -> Entry:
+    """Eski penceresinin dönem barları (entry) + sona bar eklenmiş yeni pencere (merged) -> yeni dönem barları.
+    Sadece ilk dönem (pencere başı kaymış olabilir) ve eski son dönemden itibaren olanlar günlük barlardan
+    kurulur; aradaki tamamlanmış dönemler aynen alınır."""
+    rows = _frame_rows(merged)
+    version = data_version(merged)
+    old_pid = period_ids(entry[0], timeframe)
+    new_pid = period_ids(rows[0], timeframe)
+    first, last = new_pid[0], old_pid[-1]
+    if first >= last:  # Arada korunacak dönem yok
+        return resample_frame(merged, timeframe)
+    head = int(np.searchsorted(new_pid, first, side='right'))
+    tail = int(np.searchsorted(new_pid, last, side='left'))
+    keep = (old_pid > first) & (old_pid < last)
+    zeros = np.zeros(len(new_pid), dtype=np.int64)
+    parts = (_resample_rows(zeros[:head], tuple(a[:head] for a in rows), timeframe)[1],
+             tuple(a[keep] for a in entry[:5]),
+             _resample_rows(zeros[tail:], tuple(a[tail:] for a in rows), timeframe)[1])
+    return tuple(np.concatenate(cols) for cols in zip(*parts)) + (version,)
+
+
+class TimeframeStore:
+    """Zaman dilimi -> sembol -> dönem barları (Entry; son eleman günlük veri sürümü).
+    view() bir cache için görünümü kurar: sürümü tutan semboller saklanan barları kullanır, diğerleri tek
+    geçişte resample edilir. on_merge() yeni günlük barlarla sadece baş/son dönemi günceller."""
+
+    def __init__(self, timeframes: Iterable[str] = TIMEFRAMES):
+        self._bars: Dict[str, Dict[str, Entry]] = {}
+        for tf in timeframes:
+            check_timeframe(tf)
+            self._bars[tf] = {}
+        self._views: Dict[str, Tuple[Any, CompactCache]] = {}  # zaman dilimi -> (anahtar, görünüm)
+        self._lock = threading.Lock()
+        self.resampled = 0  # baştan resample edilen sembol sayısı (kümülatif)
+        self.extended = 0   # artımlı güncellenen sembol sayısı (kümülatif)
+
+    def entry(self, symbol: str, timeframe: str) -> Optional[Entry]:
+        return self._bars[timeframe].get(symbol)
+
+    def view(self, cache: CompactCache, timeframe: str, key: Any = None) -> CompactCache:
+        """cache'in `timeframe` görünümü. key (ör. cache nesli) verilirse görünüm o anahtar için saklanır."""
+        check_timeframe(timeframe)
+        with self._lock:
+            cached = self._views.get(timeframe)
+            if key is not None and cached is not None and cached[0] == key:
+                return cached[1]
+            bars = self._bars.setdefault(timeframe, {})
+            stale = [s for s, v in zip(cache.symbols, cache.versions)
+                     if s not in bars or bars[s][5] != v]
+        fresh = resample_entries(cache, timeframe, stale) if stale else {}
+        with self._lock:
+            bars.update(fresh)
+            self.resampled += len(fresh)
+            if len(bars) > len(cache):  # Cache'ten çıkan semboller
+                for s in [s for s in bars if s not in cache]:
+                    del bars[s]
+            entries = [bars[s] for s in cache.symbols]
+        view = CompactCache.from_entries(cache.symbols, entries)
+        if key is not None:
+            with self._lock:
+                self._views[timeframe] = (key, view)
+        return view
+
+    def on_merge(self, symbol: str, old_version: Any, merged: pd.DataFrame, appended: Optional[pd.DataFrame]):
+        """Cache girdisi değişti (merged: yeni pencere). Sadece sona bar eklendiyse dönem barları güncellenir;
+        geçmiş değiştiyse sembol düşürülür (sonraki view() baştan resample eder)."""
+        with self._lock:
+            current = {tf: bars.get(symbol) for tf, bars in self._bars.items()}
+        updated: Dict[str, Optional[Entry]] = {}
+        for tf, entry in current.items():
+            if entry is None:
+                continue
+            if appended is None or appended.empty or entry[5] != old_version or merged.empty:
+                updated[tf] = None
+            else:
+                updated[tf] = extend_entry(entry, merged, tf)
+        with self._lock:
+            for tf, entry in updated.items():
+                if entry is None:
+                    self._bars[tf].pop(symbol, None)
+                else:
+                    self._bars[tf][symbol] = entry
+                    self.extended += 1
+
+    def drop_all(self):
+        with self._lock:
+            for bars in self._bars.values():
+                bars.clear()
+            self._views.clear()
+
+    def __len__(self):
+        return sum(len(bars) for bars in self._bars.values())
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            entries = sum(a.nbytes for bars in self._bars.values() for e in bars.values() for a in e[:5])
+            return entries + sum(v.nbytes for _, v in self._views.values())
+
+
+def verify_timeframes(cache: CompactCache, symbols: List[str], replay: int = 5) -> Dict[str, int]:
+    """Doğrulama modu: her sembolün son `replay` barı hariç penceresinden dönem barları kurulur, kalan barlar
+    on_merge ile tek tek eklenir (pencere her adımda bir bar kayar, ilk dönem de değişir) ve sonuç son
+    pencerenin baştan resample edilmesiyle karşılaştırılır. Dönüş: zaman dilimi -> farklı çıkan sembol sayısı."""
+    frames = {s: cache[s] for s in symbols if cache.length(s) > replay}
+    windows = {s: stamp_version(df.iloc[:-replay].copy()) for s, df in frames.items()}
+    store = TimeframeStore()
+    for tf in TIMEFRAMES:
+        store.view(CompactCache.build(windows), tf)
+    for i in range(replay):
+        for s, df in frames.items():
+            end = len(df) - replay + i + 1
+            merged = stamp_version(df.iloc[i + 1:end].copy())
+            store.on_merge(s, data_version(windows[s]), merged, df.iloc[end - 1:end])
+            windows[s] = merged
+    final = CompactCache.build(windows)
+    mismatches: Dict[str, int] = {}
+    for tf in TIMEFRAMES:
+        expected = resample_entries(final, tf)
+        bad = 0
+        for s, want in expected.items():
+            got = store.entry(s, tf)
+            if got is None or got[5] != want[5] or not all(
+                    np.array_equal(a, b, equal_nan=True) for a, b in zip(got[:5], want[:5])):
+                bad += 1
+                logger.warning(f"Zaman dilimi doğrulama {s} ({tf}): artımlı barlar baştan hesaplanandan farklı")
+        mismatches[tf] = bad
+    return mismatches